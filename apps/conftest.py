@@ -1,6 +1,10 @@
+from collections.abc import Iterator
+
 import pytest
+from django.core.cache import cache
 from django.core.management import call_command
 
+from apps.papers import reindex
 from apps.users.models import User
 from apps.users.tests.factories import UserFactory
 
@@ -45,3 +49,19 @@ def admin(user: User) -> User:
 @pytest.fixture(autouse=True)
 def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
+    settings.ML_MODELS_LOCAL_DIR = tmpdir.join("ml-models").strpath
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> Iterator[None]:
+    """Clear the cache after each test, as the local memory one outlives them."""
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reindex_papers_right_away(monkeypatch) -> None:
+    """Schedule the papers reindexing on write, as the tests transactions are never
+    committed.
+    """
+    monkeypatch.setattr(reindex, "on_commit", lambda func: func())
@@ -24,6 +24,6 @@ class ExportContentTypeListFilter(admin.filters.SimpleListFilter):
 
 @admin.register(models.Export)
 class ExportAdmin(admin.ModelAdmin):
-    list_display = ["filename", "created", "content_type", "latest"]
+    list_display = ["filename", "created", "content_type", "latest", "rows", "size"]
     list_filter = ["latest", ExportContentTypeListFilter, "created"]
     search_fields = ["id"]
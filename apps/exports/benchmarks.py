@@ -0,0 +1,71 @@
+"""Benchmarks of the datasets exports."""
+
+import itertools
+import pathlib
+import tempfile
+import time
+from typing import TypedDict
+
+from django.db.models import QuerySet
+
+from apps.exports import writers
+from apps.exports.models import EXPORT_CHUNK_SIZE
+
+
+class ExportBenchmarkResult(TypedDict):
+    """Throughput of an export backend."""
+
+    backend: str
+    rows: int
+    size: int
+    seconds: float
+    rows_per_second: float
+
+
+def benchmark_export(
+    queryset: QuerySet,
+    fieldnames: list[str],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> list[ExportBenchmarkResult]:
+    """Compares the ORM and the `COPY` CSV exports of a queryset.
+
+    The files are written to a temporary directory and never uploaded, so only
+    the database read and the file write are measured.
+
+    Args:
+        queryset (QuerySet): A values queryset with the `fieldnames` columns.
+        fieldnames (list[str]): The columns to export.
+        chunk_size (int, optional): The number of rows fetched at a time by the
+        ORM backend. Defaults to `EXPORT_CHUNK_SIZE`.
+
+    Returns:
+        list[ExportBenchmarkResult]: The results of the ORM backend, followed by
+        the results of the `COPY` backend when the database supports it.
+    """
+    backends = {
+        "orm": lambda path: writers.write_csv(
+            path,
+            itertools.batched(queryset.iterator(chunk_size=chunk_size), chunk_size),
+            fieldnames,
+        )
+    }
+    if writers.can_copy(queryset):
+        backends["copy"] = lambda path: writers.copy_csv(path, queryset, fieldnames)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for backend, write in backends.items():
+            path = pathlib.Path(directory) / f"{backend}.csv"
+            start = time.perf_counter()
+            rows = write(path)
+            seconds = time.perf_counter() - start
+            results.append(
+                ExportBenchmarkResult(
+                    backend=backend,
+                    rows=rows,
+                    size=path.stat().st_size,
+                    seconds=seconds,
+                    rows_per_second=rows / seconds if seconds else 0.0,
+                )
+            )
+    return results
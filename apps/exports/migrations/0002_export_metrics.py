@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='export',
+            name='duration',
+            field=models.DurationField(blank=True, help_text='Time spent writing the exported file', null=True),
+        ),
+        migrations.AddField(
+            model_name='export',
+            name='rows',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Number of exported rows', null=True),
+        ),
+        migrations.AddField(
+            model_name='export',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size of the exported file, in bytes', null=True),
+        ),
+    ]
@@ -1,19 +1,25 @@
-import csv
+import itertools
 import pathlib
 import tempfile
+import time
 import uuid
-from collections.abc import Iterable
-from typing import Any, Self
+from collections.abc import Callable, Iterable
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Self
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.files import File
 from django.db import models
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
 
-from apps.exports import managers
+from apps.exports import managers, writers
 from apps.exports.utils import save
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 def export_file_handler(instance: "Export", filename):
     ext = pathlib.Path(filename).suffix
@@ -33,7 +39,14 @@ def export_file_handler(instance: "Export", filename):
     return base / timezone.now().strftime("%Y-%m-%d") / new_filename
 
 
+EXPORT_CHUNK_SIZE = 2000
+
+
 class Export(TimeStampedModel, models.Model):
+    class FormatChoices(models.TextChoices):
+        CSV = "csv", "CSV"
+        PARQUET = "parquet", "Parquet"
+
     id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     file = models.FileField(blank=True, null=True, upload_to=export_file_handler)
     content_type = models.ForeignKey(
@@ -42,6 +55,15 @@ class Export(TimeStampedModel, models.Model):
         null=True,
     )
     latest = models.BooleanField(default=True)
+    rows = models.PositiveBigIntegerField(
+        help_text=_("Number of exported rows"), null=True, blank=True
+    )
+    size = models.PositiveBigIntegerField(
+        help_text=_("Size of the exported file, in bytes"), null=True, blank=True
+    )
+    duration = models.DurationField(
+        help_text=_("Time spent writing the exported file"), null=True, blank=True
+    )
 
     objects: managers.ExportManager = managers.ExportManager()
 
@@ -57,6 +79,7 @@ class Export(TimeStampedModel, models.Model):
             path = export_file_handler(self, self.filename)
             folder = path.parent.parent
             save(folder / f"latest{path.suffix}", self.file, overwrite=True)
+            self.file.close()
             Export.objects.filter(content_type=self.content_type).exclude(
                 pk=self.pk
             ).update(latest=False)
@@ -65,36 +88,95 @@ class Export(TimeStampedModel, models.Model):
     def filename(self):
         return pathlib.Path(self.file.name).name
 
+    @property
+    def file_format(self) -> FormatChoices:
+        """The format of the exported file."""
+        return self.FormatChoices(pathlib.Path(self.file.name).suffix.lstrip("."))
+
+    @property
+    def rows_per_second(self) -> float | None:
+        """The export throughput, in rows per second."""
+        if self.rows is None or not self.duration:
+            return None
+        return self.rows / self.duration.total_seconds()
+
     def delete(self, *args, **kwargs):
         if self.file and self.file.storage.exists(self.file.name):
             self.file.delete(save=False)
         super().delete(*args, **kwargs)
 
     @classmethod
-    def from_dataset(
+    def from_dataset(  # noqa: PLR0913
         cls,
         dataset: Iterable[Any],
         fieldnames: list[str],
         filename: str,
         content_type: ContentType | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        file_format: FormatChoices = FormatChoices.CSV,
+        schema: "pa.Schema | None" = None,
+        *,
+        use_copy: bool | None = None,
     ) -> Self:
-        """Exports a dataset to a CSV file.
+        """Exports a dataset to a file.
+
+        The dataset is streamed to a temporary file in chunks, so the memory used
+        does not depend on its size. Querysets are iterated with `iterator`, which
+        uses a server-side cursor on PostgreSQL. CSV exports of PostgreSQL
+        querysets skip the ORM and use the `COPY` command instead. The file is then
+        uploaded to the storage, which S3 does with a multipart upload.
 
         Args:
-            dataset (list[dict[str, Any]]): The dataset to export.
+            dataset (Iterable[dict[str, Any]]): The dataset to export.
             fieldnames (list[str]): The field names of the dataset.
-            filename (str): A name for the destination file.
+            filename (str): A name for the destination file, with no extension.
             content_type (ContentType | None, optional): The content type of the
             dataset model. Defaults to None.
+            chunk_size (int, optional): The number of rows fetched and written at a
+            time. Defaults to `EXPORT_CHUNK_SIZE`.
+            file_format (FormatChoices, optional): The file format.
+            Defaults to CSV.
+            schema (pyarrow.Schema | None, optional): The types of the fields,
+            required by the Parquet format. Defaults to None.
+            use_copy (bool | None, optional): If the `COPY` command is used.
+            Defaults to whenever it is possible.
 
         Returns:
-            Export: The created export instance.
+            Export: The created export instance, with the number of rows, the file
+            size and the time spent writing it.
         """
-        with tempfile.NamedTemporaryFile(mode="r+") as tmp:
-            writer = csv.DictWriter(tmp, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(dataset)
-            tmp.seek(0)
-            export: Export = Export.objects.create(content_type=content_type)
-            export.file.save((filename + ".csv"), File(tmp))
+        can_copy = file_format == cls.FormatChoices.CSV and writers.can_copy(dataset)
+        if use_copy is None:
+            use_copy = can_copy
+        elif use_copy and not can_copy:
+            msg = "Only CSV exports of PostgreSQL querysets can use COPY."
+            raise ValueError(msg)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / f"{filename}.{file_format}"
+            start = time.perf_counter()
+            if use_copy:
+                rows = writers.copy_csv(path, dataset, fieldnames)  # type: ignore[arg-type]
+            else:
+                if isinstance(dataset, models.QuerySet):
+                    dataset = dataset.iterator(chunk_size=chunk_size)
+                write: Callable[..., int] = EXPORT_WRITERS[file_format]
+                rows = write(
+                    path, itertools.batched(dataset, chunk_size), fieldnames, schema
+                )
+
+            export: Export = Export.objects.create(
+                content_type=content_type,
+                rows=rows,
+                size=path.stat().st_size,
+                duration=timedelta(seconds=time.perf_counter() - start),
+            )
+            with path.open("rb") as f:
+                export.file.save(path.name, File(f))
             return export
+
+
+EXPORT_WRITERS: dict[Export.FormatChoices, Callable[..., int]] = {
+    Export.FormatChoices.CSV: writers.write_csv,
+    Export.FormatChoices.PARQUET: writers.write_parquet,
+}
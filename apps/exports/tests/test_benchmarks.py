@@ -0,0 +1,16 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from apps.exports.benchmarks import benchmark_export
+
+
+@pytest.mark.django_db()
+class DescribeBenchmarkExport:
+    def it_only_benchmarks_the_orm_without_postgresql(self):
+        queryset = ContentType.objects.values("app_label", "model")
+
+        results = benchmark_export(queryset, ["app_label", "model"])
+
+        assert [result["backend"] for result in results] == ["orm"]
+        assert results[0]["rows"] == queryset.count()
+        assert results[0]["size"] > 0
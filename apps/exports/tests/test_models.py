@@ -0,0 +1,77 @@
+import csv
+import io
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from apps.exports.models import Export
+
+
+@pytest.mark.django_db()
+class DescribeExport:
+    def it_exports_a_dataset_in_chunks(self):
+        dataset = [{"id": i, "name": f"name-{i}"} for i in range(25)]
+
+        export = Export.from_dataset(
+            dataset, fieldnames=["id", "name"], filename="names", chunk_size=10
+        )
+
+        with export.file.open("rb") as f:
+            content = f.read()
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        assert rows == [{"id": str(i), "name": f"name-{i}"} for i in range(25)]
+        assert export.rows == len(dataset)
+        assert export.size == len(content)
+        assert export.rows_per_second
+
+    def it_streams_querysets(self):
+        queryset = ContentType.objects.values("app_label", "model")
+
+        export = Export.from_dataset(
+            queryset, fieldnames=["app_label", "model"], filename="content_types"
+        )
+
+        assert export.rows == queryset.count()
+
+    def it_exports_parquet_files_with_a_schema(self):
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        schema = pa.schema([pa.field("id", pa.int64()), pa.field("name", pa.string())])
+        dataset = [{"id": i, "name": f"name-{i}"} for i in range(25)]
+
+        export = Export.from_dataset(
+            dataset,
+            fieldnames=["id", "name"],
+            filename="names",
+            chunk_size=10,
+            file_format=Export.FormatChoices.PARQUET,
+            schema=schema,
+        )
+
+        with export.file.open("rb") as f:
+            table = pq.read_table(f)
+        assert export.file_format == Export.FormatChoices.PARQUET
+        assert table.schema == schema
+        assert table.to_pylist() == dataset
+
+    def it_requires_a_schema_for_parquet_files(self):
+        pytest.importorskip("pyarrow")
+
+        with pytest.raises(ValueError, match="schema is required"):
+            Export.from_dataset(
+                [],
+                fieldnames=["id"],
+                filename="empty",
+                file_format=Export.FormatChoices.PARQUET,
+            )
+
+    def it_requires_postgresql_to_use_copy(self):
+        queryset = ContentType.objects.values("app_label", "model")
+
+        with pytest.raises(ValueError, match="can use COPY"):
+            Export.from_dataset(
+                queryset,
+                fieldnames=["app_label", "model"],
+                filename="content_types",
+                use_copy=True,
+            )
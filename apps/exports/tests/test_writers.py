@@ -0,0 +1,23 @@
+import csv
+import io
+
+from apps.exports.writers import count_csv_lines
+
+
+class DescribeCountCSVLines:
+    def it_skips_the_line_breaks_of_quoted_values_across_chunks(self):
+        rows = [["id", "abstract"], [1, 'A "quoted"\nabstract'], [2, "plain"]]
+        content = io.StringIO()
+        csv.writer(content, lineterminator="\n").writerows(rows)
+        data = content.getvalue().encode()
+
+        for size in range(1, len(data) + 1):
+            lines, quoted = 0, False
+            for start in range(0, len(data), size):
+                chunk_lines, quoted = count_csv_lines(
+                    data[start : start + size], quoted=quoted
+                )
+                lines += chunk_lines
+
+            assert lines == len(rows)
+            assert not quoted
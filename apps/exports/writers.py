@@ -0,0 +1,153 @@
+"""Writers of the datasets exports file formats."""
+
+import csv
+import pathlib
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING, Any
+
+from django.db import connections
+from django.db.models import QuerySet
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def write_csv(
+    path: pathlib.Path,
+    chunks: Iterable[Sequence[dict[str, Any]]],
+    fieldnames: list[str],
+    schema: "pa.Schema | None" = None,
+) -> int:
+    """Writes chunks of rows to a CSV file.
+
+    Args:
+        path (pathlib.Path): The destination file path.
+        chunks (Iterable[Sequence[dict[str, Any]]]): The rows, in chunks.
+        fieldnames (list[str]): The columns to write.
+        schema (pyarrow.Schema | None, optional): Unused, CSV files are untyped.
+
+    Returns:
+        int: The number of rows written.
+    """
+    rows = 0
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(
+    path: pathlib.Path,
+    chunks: Iterable[Sequence[dict[str, Any]]],
+    fieldnames: list[str],
+    schema: "pa.Schema | None" = None,
+) -> int:
+    """Writes chunks of rows to a Parquet file, one row group per chunk.
+
+    It requires the `pyarrow` package.
+
+    Args:
+        path (pathlib.Path): The destination file path.
+        chunks (Iterable[Sequence[dict[str, Any]]]): The rows, in chunks.
+        fieldnames (list[str]): The columns to write.
+        schema (pyarrow.Schema | None, optional): The columns types. Required.
+
+    Raises:
+        ValueError: If no schema is provided.
+
+    Returns:
+        int: The number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if schema is None:
+        msg = "A schema is required to export Parquet files."
+        raise ValueError(msg)
+
+    schema = pa.schema([schema.field(name) for name in fieldnames])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(list(chunk), schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def can_copy(dataset: Any) -> bool:
+    """Return if a dataset can be exported with `copy_csv`.
+
+    Args:
+        dataset (Any): The dataset to export.
+
+    Returns:
+        bool: If the dataset is a queryset of a PostgreSQL database.
+    """
+    return (
+        isinstance(dataset, QuerySet) and connections[dataset.db].vendor == "postgresql"
+    )
+
+
+def count_csv_lines(data: bytes, *, quoted: bool = False) -> tuple[int, bool]:
+    """Count the lines ended in a chunk of a CSV file.
+
+    The line breaks of the quoted values are not counted, and a value may be split
+    across chunks, so the quoting state is carried over from the previous chunk.
+
+    Args:
+        data (bytes): The chunk.
+        quoted (bool, optional): If the chunk starts in a quoted value.
+        Defaults to False.
+
+    Returns:
+        tuple[int, bool]: The number of lines ended, and if the chunk ends in a
+        quoted value.
+    """
+    lines = 0
+    # Escaped quotes are doubled, so they toggle the quoting twice
+    for position, part in enumerate(data.split(b'"')):
+        if position:
+            quoted = not quoted
+        if not quoted:
+            lines += part.count(b"\n")
+    return lines, quoted
+
+
+def copy_csv(path: pathlib.Path, queryset: QuerySet, fieldnames: list[str]) -> int:
+    """Writes a queryset to a CSV file with the PostgreSQL `COPY` command.
+
+    The rows are formatted as CSV by the database server and streamed as raw bytes
+    to the file, so no model or dictionary is built for them. Values are formatted
+    as PostgreSQL does, as `2024-01-31 12:00:00+00` for datetimes. The rows are
+    counted as they are streamed, as the cursor does not report them for `COPY TO`.
+
+    Args:
+        path (pathlib.Path): The destination file path.
+        queryset (QuerySet): A values queryset with the `fieldnames` columns.
+        fieldnames (list[str]): The columns to write.
+
+    Returns:
+        int: The number of rows written.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    columns = ", ".join(connection.ops.quote_name(name) for name in fieldnames)
+    statement = (
+        f"COPY (SELECT {columns} FROM ({sql}) AS dataset) "  # noqa: S608
+        "TO STDOUT WITH (FORMAT csv, HEADER)"
+    )
+    lines, quoted = 0, False
+    with (
+        connection.cursor() as cursor,
+        path.open("wb") as f,
+        cursor.cursor.copy(statement, params) as copy,
+    ):
+        for data in copy:
+            f.write(data)
+            chunk_lines, quoted = count_csv_lines(bytes(data), quoted=quoted)
+            lines += chunk_lines
+    # Without the header
+    return max(lines - 1, 0)
@@ -12,7 +12,7 @@ class ModelAdmin(admin.ModelAdmin):
     readonly_fields = ["created", "modified"]
     fieldsets = (
         (None, {"fields": ("file", "type", "params", "validation_results")}),
-        ("Metadata", {"fields": ("latest", "created", "modified")}),
+        ("Metadata", {"fields": ("latest", "trained_until", "created", "modified")}),
     )
     actions = ["make_latest"]
 
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class MlConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.ml"
+
+    def ready(self) -> None:
+        super().ready()
+
+        from apps.ml import signals
+
+        # The proxies of each model type are senders of their own signals
+        for model in self.get_models():
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    signals.evict_model_from_cache,
+                    sender=model,
+                    dispatch_uid=f"evict_{model._meta.model_name}_from_cache",  # noqa: SLF001
+                )
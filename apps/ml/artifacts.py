@@ -0,0 +1,73 @@
+"""Memory-mapped storage format for the models arrays.
+
+An artifact is an uncompressed `.npz` archive of `.npy` files. Before being
+opened, it is extracted once per host to `ML_MODELS_LOCAL_DIR`, and its arrays
+are memory-mapped read-only, so all the processes of a host share the same
+pages and loading a model does not copy its arrays to private memory.
+"""
+
+import shutil
+import tempfile
+import zipfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+
+ARTIFACT_SUFFIX = ".npz"
+
+
+def write_arrays(file: IO[bytes], arrays: Mapping[str, np.ndarray]) -> None:
+    """Write arrays to an artifact file.
+
+    Args:
+        file (IO[bytes]): The destination file.
+        arrays (Mapping[str, numpy.ndarray]): The arrays, by name.
+    """
+    np.savez(file, **arrays)
+
+
+def get_local_path(key: str) -> Path:
+    """Return the local directory of an artifact.
+
+    Args:
+        key (str): A unique key for the artifact, as the model ID.
+    """
+    return Path(settings.ML_MODELS_LOCAL_DIR) / key
+
+
+def open_arrays(file: FieldFile, key: str) -> dict[str, np.ndarray]:
+    """Open the arrays of an artifact as read-only memory maps.
+
+    Args:
+        file (FieldFile): The artifact file.
+        key (str): A unique key for the artifact, as the model ID.
+
+    Returns:
+        dict[str, numpy.ndarray]: The arrays, by name.
+    """
+    directory = get_local_path(key)
+    if not directory.exists():
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        extracted = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=directory.parent))
+        with file.open("rb") as f, zipfile.ZipFile(f) as archive:
+            archive.extractall(extracted)
+        try:
+            # Atomic, so concurrent processes never see a partial extraction
+            extracted.rename(directory)
+        except OSError:
+            shutil.rmtree(extracted, ignore_errors=True)
+
+    return {path.stem: np.load(path, mmap_mode="r") for path in directory.glob("*.npy")}
+
+
+def discard_arrays(key: str) -> None:
+    """Remove the local copy of an artifact, if any.
+
+    Args:
+        key (str): The artifact key.
+    """
+    shutil.rmtree(get_local_path(key), ignore_errors=True)
@@ -0,0 +1,185 @@
+"""Benchmarks of the machine learning models operations."""
+
+import time
+from collections.abc import Sequence
+from typing import TypedDict
+
+import numpy as np
+import pandas as pd
+
+from apps.ml.evaluation import get_ndcg
+from apps.ml.models import Model
+from apps.ml.ranking import top_k
+
+
+class IndexBenchmarkResult(TypedDict):
+    """Recall and latency of an index search configuration."""
+
+    n_probe: int | None
+    recall: float
+    latency_ms: float
+
+
+def benchmark_index(
+    model: Model,
+    users_ids: Sequence[int],
+    k: int,
+    n_probes: Sequence[int],
+) -> list[IndexBenchmarkResult]:
+    """Compares the model index searches with the exact scorer.
+
+    The exact scorer ranks all the indexed papers with `Model.predict_matrix`.
+
+    Args:
+        model (Model): A model with an index.
+        users_ids (Sequence[int]): The users to search papers for.
+        k (int): The number of papers to search for each user.
+        n_probes (Sequence[int]): The index search breadths to benchmark.
+
+    Returns:
+        list[IndexBenchmarkResult]: The results of the exact scorer (with no
+        `n_probe`, and a recall of 1) followed by the results of each search
+        breadth. The latencies are per user.
+    """
+    index = model.get_index()
+    if index is None:
+        msg = "The model has no index."
+        raise ValueError(msg)
+
+    start = time.perf_counter()
+    columns, _ = top_k(model.predict_matrix(users_ids, index.ids), k)
+    exact_latency = (time.perf_counter() - start) / len(users_ids)
+    exact = [set(papers) for papers in index.ids[columns].tolist()]
+
+    results = [
+        IndexBenchmarkResult(n_probe=None, recall=1.0, latency_ms=1000 * exact_latency)
+    ]
+    for n_probe in n_probes:
+        start = time.perf_counter()
+        found, _ = model.search(users_ids, k, n_probe=n_probe)
+        latency = (time.perf_counter() - start) / len(users_ids)
+        results.append(
+            IndexBenchmarkResult(
+                n_probe=n_probe,
+                recall=float(
+                    np.mean(
+                        [
+                            len(expected & set(papers)) / max(len(expected), 1)
+                            for expected, papers in zip(
+                                exact, found.tolist(), strict=True
+                            )
+                        ]
+                    )
+                ),
+                latency_ms=1000 * latency,
+            )
+        )
+    return results
+
+
+class ModelBenchmarkResult(TypedDict):
+    """Training time, prediction throughput and accuracy of a model."""
+
+    model_type: str
+    train_seconds: float
+    predictions_per_second: float
+    rmse: float | None
+    ndcg: float
+
+
+def _get_pairs_matrix(
+    df: pd.DataFrame, users: np.ndarray, papers: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    """Return a `(users, papers)` matrix with the values of the pairs of a dataset."""
+    pairs_users, pairs_papers = df["user"].to_numpy(), df["paper"].to_numpy()
+    known = np.isin(pairs_users, users) & np.isin(pairs_papers, papers)
+
+    matrix = np.zeros((len(users), len(papers)), dtype=values.dtype)
+    matrix[
+        np.searchsorted(users, pairs_users[known]),
+        np.searchsorted(papers, pairs_papers[known]),
+    ] = values[known]
+    return matrix
+
+
+def benchmark_models(  # noqa: PLR0913
+    models: Sequence[Model],
+    df: pd.DataFrame,
+    *,
+    k: int = 10,
+    test_size: float = 0.2,
+    n_users: int = 1000,
+    random_state: int | None = None,
+) -> list[ModelBenchmarkResult]:
+    """Compares models trained on the same split of a reviews dataset.
+
+    Each model is fitted, with no validation, on the training split. Then all the
+    training papers are scored for up to `n_users` users of the test split, and
+    ranked excluding the ones they reviewed in the training split. The rankings
+    are evaluated by their NDCG@k, with the test ratings as relevance. The RMSE on
+    the test split is only measured for models whose scores are ratings.
+
+    Args:
+        models (Sequence[Model]): The untrained models, with their params.
+        df (pandas.DataFrame): The reviews dataset.
+        k (int, optional): The number of papers ranked for each user. Defaults
+        to 10.
+        test_size (float, optional): The fraction of the reviews in the test split.
+        Defaults to 0.2.
+        n_users (int, optional): The maximum number of users scored. Defaults
+        to 1000.
+        random_state (int | None, optional): The seed of the split.
+
+    Returns:
+        list[ModelBenchmarkResult]: The results of each model.
+    """
+    rng = np.random.default_rng(random_state)
+    test = rng.random(len(df)) < test_size
+    train_df, test_df = df[~test], df[test]
+
+    results = []
+    for model in models:
+        start = time.perf_counter()
+        model.fit(train_df)
+        train_seconds = time.perf_counter() - start
+
+        training_df = model.prepare_for_training(train_df)
+        evaluation_df = model.prepare_for_training(test_df)
+        users = np.unique(evaluation_df["user"])
+        if len(users) > n_users:
+            users = np.sort(rng.choice(users, n_users, replace=False))
+        papers = np.unique(training_df["paper"])
+
+        start = time.perf_counter()
+        scores = model.predict_matrix(users, papers)
+        predict_seconds = time.perf_counter() - start
+
+        results.append(
+            ModelBenchmarkResult(
+                model_type=model.type,
+                train_seconds=train_seconds,
+                predictions_per_second=scores.size / predict_seconds
+                if predict_seconds
+                else 0.0,
+                rmse=model.evaluate(test_df)["rmse"]
+                if model.predicts_ratings
+                else None,
+                ndcg=get_ndcg(
+                    scores,
+                    _get_pairs_matrix(
+                        evaluation_df,
+                        users,
+                        papers,
+                        evaluation_df["rating"].to_numpy(),
+                    ),
+                    k,
+                    mask=_get_pairs_matrix(
+                        training_df,
+                        users,
+                        papers,
+                        np.ones(len(training_df), dtype=bool),
+                    ),
+                ),
+            )
+        )
+    return results
@@ -0,0 +1,142 @@
+"""In-process cache of the loaded machine learning models."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TypedDict
+from uuid import UUID
+
+from django.conf import settings
+
+from apps.ml.models import Model
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCacheStats(TypedDict):
+    """Usage metrics of a models cache."""
+
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    load_seconds: float
+
+
+class ModelCache:
+    """Least recently used cache of loaded models, keyed by their IDs.
+
+    Models artifacts never change once persisted, so an entry only has to be
+    dropped when the model is deleted or to respect the size bound. Callers detect
+    new versions by looking up the ID of the latest model, which is cheap. Each
+    load is logged with the cache usage metrics.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of models kept loaded.
+        """
+        self.maxsize = maxsize
+        self._models: OrderedDict[UUID, Model] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[UUID, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of cached models."""
+        return len(self._models)
+
+    def __contains__(self, model_id: UUID) -> bool:
+        """Return if a model is cached."""
+        return model_id in self._models
+
+    def get_or_load(self, model_id: UUID, loader: Callable[[UUID], Model]) -> Model:
+        """Return a cached model, loading it if needed.
+
+        Args:
+            model_id (UUID): The model ID.
+            loader (Callable[[UUID], Model]): Function that returns the loaded model
+            for an ID, called on cache misses.
+
+        Returns:
+            Model: The loaded model.
+        """
+        with self._lock:
+            if (model := self._get(model_id)) is not None:
+                return model
+            loading = self._loading.setdefault(model_id, threading.Lock())
+
+        # Models are loaded out of the cache lock, so other models are still served,
+        # and only once, as the threads missing the same model wait for the first.
+        with loading:
+            with self._lock:
+                if (model := self._get(model_id)) is not None:
+                    return model
+                self._misses += 1
+
+            start = time.perf_counter()
+            try:
+                model = loader(model_id)
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(model_id, None)
+                raise
+            load_seconds = time.perf_counter() - start
+
+            # Stored before the loading lock is dropped, so no thread loads it again
+            with self._lock:
+                self._load_seconds += load_seconds
+                self._models[model_id] = model
+                while len(self._models) > self.maxsize:
+                    self._models.popitem(last=False)
+                    self._evictions += 1
+                self._loading.pop(model_id, None)
+                stats = self.stats()
+
+        logger.info(
+            "Loaded the model %s in %.2f seconds, models cache: %s",
+            model_id,
+            load_seconds,
+            stats,
+        )
+        return model
+
+    def _get(self, model_id: UUID) -> Model | None:
+        """Return a cached model and mark it as recently used, with the lock held."""
+        if (model := self._models.get(model_id)) is not None:
+            self._models.move_to_end(model_id)
+            self._hits += 1
+        return model
+
+    def invalidate(self, model_id: UUID | None = None) -> None:
+        """Drop a model from the cache.
+
+        Args:
+            model_id (UUID | None, optional): The model to drop.
+            Defaults to all the models.
+        """
+        with self._lock:
+            if model_id is None:
+                self._models.clear()
+            else:
+                self._models.pop(model_id, None)
+
+    def stats(self) -> ModelCacheStats:
+        """Return the cache usage metrics."""
+        return ModelCacheStats(
+            size=len(self._models),
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            load_seconds=self._load_seconds,
+        )
+
+
+models_cache = ModelCache(maxsize=settings.ML_MODELS_CACHE_SIZE)
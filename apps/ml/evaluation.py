@@ -0,0 +1,71 @@
+"""Vectorized evaluation of the models predictions."""
+
+from collections.abc import Sequence
+from typing import TypedDict
+
+import numpy as np
+
+from apps.ml.ranking import top_k
+
+
+class AccuracyMetrics(TypedDict):
+    """Errors of predicted ratings."""
+
+    rmse: float
+    mae: float
+
+
+def get_accuracy_metrics(
+    predictions: Sequence[float], ratings: Sequence[float]
+) -> AccuracyMetrics:
+    """Compute the errors of predicted ratings.
+
+    Args:
+        predictions (Sequence[float]): The predicted ratings.
+        ratings (Sequence[float]): The actual ratings, aligned with `predictions`.
+
+    Returns:
+        AccuracyMetrics: The root mean squared error and the mean absolute error.
+    """
+    errors = np.asarray(predictions, dtype=np.float64) - np.asarray(
+        ratings, dtype=np.float64
+    )
+    if not len(errors):
+        msg = "There are no predictions to evaluate."
+        raise ValueError(msg)
+    return AccuracyMetrics(
+        rmse=float(np.sqrt(np.mean(errors**2))), mae=float(np.mean(np.abs(errors)))
+    )
+
+
+def get_ndcg(
+    scores: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    mask: np.ndarray | None = None,
+) -> float:
+    """Compute the mean normalized discounted cumulative gain of the top `k` papers.
+
+    Args:
+        scores (numpy.ndarray): A `(users, papers)` scores matrix.
+        relevance (numpy.ndarray): The graded relevance of each paper for each user,
+        with the same shape as `scores`, and zero for irrelevant papers.
+        k (int): The number of papers ranked for each user.
+        mask (numpy.ndarray | None, optional): Flags the papers that must not be
+        ranked, as the ones the users trained the model on. Defaults to None.
+
+    Returns:
+        float: The mean NDCG@k of the users with relevant papers.
+    """
+    columns, _ = top_k(scores, k, mask=mask)
+    discounts = 1 / np.log2(np.arange(2, columns.shape[1] + 2))
+    gains = 2 ** np.take_along_axis(relevance, columns, axis=1) - 1
+    best_relevance = -np.sort(-relevance, axis=1)[:, : columns.shape[1]]
+    ideal_gains = 2**best_relevance - 1
+
+    ideal = ideal_gains @ discounts
+    relevant = ideal > 0
+    if not relevant.any():
+        msg = "There are no relevant papers to rank."
+        raise ValueError(msg)
+    return float(np.mean((gains @ discounts)[relevant] / ideal[relevant]))
@@ -0,0 +1,298 @@
+"""Vectorized scoring with the latent factors of matrix factorization models."""
+
+from collections.abc import Mapping, Sequence
+from typing import Self
+
+import numpy as np
+
+UNKNOWN = -1
+
+
+def to_ids_array(ids: Sequence[int | None]) -> np.ndarray:
+    """Convert raw IDs to an integer array, with `UNKNOWN` for missing IDs."""
+    if isinstance(ids, np.ndarray) and np.issubdtype(ids.dtype, np.integer):
+        return ids.astype(np.int64, copy=False)
+    return np.fromiter(
+        (UNKNOWN if raw_id is None else raw_id for raw_id in ids),
+        dtype=np.int64,
+        count=len(ids),
+    )
+
+
+def lookup(sorted_ids: np.ndarray, ids: Sequence[int | None]) -> np.ndarray:
+    """Return the positions of IDs in a sorted IDs array, `UNKNOWN` if not found."""
+    ids_array = to_ids_array(ids)
+    if not len(sorted_ids):
+        return np.full(len(ids_array), UNKNOWN)
+    positions = np.minimum(np.searchsorted(sorted_ids, ids_array), len(sorted_ids) - 1)
+    return np.where(sorted_ids[positions] == ids_array, positions, UNKNOWN)
+
+
+class LatentFactors:
+    """Users and papers latent factors and biases of a trained model.
+
+    The users and papers raw IDs are kept sorted, and the position of an ID is the
+    row of its factors and bias. The ratings are predicted like Surprise's SVD:
+    the global mean, plus the known biases, plus the inner product of the factors
+    when both the user and the paper are known, clipped into the rating scale.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        users: np.ndarray,
+        papers: np.ndarray,
+        pu: np.ndarray,
+        qi: np.ndarray,
+        bu: np.ndarray,
+        bi: np.ndarray,
+        global_mean: float,
+        rating_scale: tuple[float, float],
+        *,
+        biased: bool = True,
+    ) -> None:
+        """Initializes the factors.
+
+        Args:
+            users (numpy.ndarray): The users raw IDs, sorted.
+            papers (numpy.ndarray): The papers raw IDs, sorted.
+            pu (numpy.ndarray): The users factors, aligned with `users`.
+            qi (numpy.ndarray): The papers factors, aligned with `papers`.
+            bu (numpy.ndarray): The users biases, aligned with `users`.
+            bi (numpy.ndarray): The papers biases, aligned with `papers`.
+            global_mean (float): The mean of all the training ratings.
+            rating_scale (tuple[float, float]): The lowest and highest ratings.
+            biased (bool, optional): If the biases are used. Defaults to True.
+        """
+        self.users = users
+        self.papers = papers
+        self.pu = pu
+        self.qi = qi
+        self.bu = bu
+        self.bi = bi
+        self.global_mean = global_mean
+        self.rating_scale = rating_scale
+        self.biased = biased
+
+    @classmethod
+    def from_unsorted(  # noqa: PLR0913
+        cls,
+        users: Sequence[int],
+        papers: Sequence[int],
+        pu: np.ndarray,
+        qi: np.ndarray,
+        bu: np.ndarray,
+        bi: np.ndarray,
+        global_mean: float,
+        rating_scale: tuple[float, float],
+        *,
+        biased: bool = True,
+    ) -> Self:
+        """Create the factors from rows in any order, sorting them by raw ID."""
+        users_array, papers_array = to_ids_array(users), to_ids_array(papers)
+        users_order = np.argsort(users_array, kind="stable")
+        papers_order = np.argsort(papers_array, kind="stable")
+        return cls(
+            users=users_array[users_order],
+            papers=papers_array[papers_order],
+            pu=np.asarray(pu)[users_order],
+            qi=np.asarray(qi)[papers_order],
+            bu=np.asarray(bu)[users_order],
+            bi=np.asarray(bi)[papers_order],
+            global_mean=float(global_mean),
+            rating_scale=rating_scale,
+            biased=biased,
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> Self:
+        """Create the factors from the arrays returned by `to_arrays`."""
+        lower_bound, higher_bound = arrays["rating_scale"].tolist()
+        return cls(
+            users=arrays["users"],
+            papers=arrays["papers"],
+            pu=arrays["pu"],
+            qi=arrays["qi"],
+            bu=arrays["bu"],
+            bi=arrays["bi"],
+            global_mean=float(arrays["global_mean"]),
+            rating_scale=(lower_bound, higher_bound),
+            biased=bool(arrays["biased"]),
+        )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Return the factors as a mapping of arrays."""
+        return {
+            "users": self.users,
+            "papers": self.papers,
+            "pu": self.pu,
+            "qi": self.qi,
+            "bu": self.bu,
+            "bi": self.bi,
+            "global_mean": np.float64(self.global_mean),
+            "rating_scale": np.array(self.rating_scale, dtype=np.float64),
+            "biased": np.bool_(self.biased),
+        }
+
+    def refit(  # noqa: PLR0913
+        self,
+        users: Sequence[int],
+        papers: Sequence[int],
+        ratings: Sequence[float],
+        *,
+        n_epochs: int,
+        lr: float,
+        reg: float,
+        init_mean: float = 0,
+        init_std_dev: float = 0.1,
+        random_state: int | None = None,
+    ) -> Self:
+        """Return the factors updated by SGD epochs over new ratings.
+
+        The updates are the ones of Surprise's SVD. New users and papers get factors
+        initialized like Surprise does and no biases, while the global mean and
+        the rating scale are kept.
+
+        Args:
+            users (Sequence[int]): The users raw IDs of the new ratings.
+            papers (Sequence[int]): The papers raw IDs, aligned with `users`.
+            ratings (Sequence[float]): The new ratings, aligned with `users`.
+            n_epochs (int): The number of passes over the new ratings.
+            lr (float): The learning rate of all the parameters.
+            reg (float): The regularization term of all the parameters.
+            init_mean (float, optional): The mean of the new factors. Defaults to 0.
+            init_std_dev (float, optional): The standard deviation of the new
+            factors. Defaults to 0.1.
+            random_state (int | None, optional): The seed of the new factors.
+
+        Returns:
+            LatentFactors: The updated factors, the current ones are unchanged.
+        """
+        users_array, papers_array = to_ids_array(users), to_ids_array(papers)
+        new_users = np.setdiff1d(users_array, self.users)
+        new_papers = np.setdiff1d(papers_array, self.papers)
+        rng = np.random.default_rng(random_state)
+        n_factors = self.pu.shape[1]
+
+        # Sorting copies the arrays, so read-only memory maps are never written
+        factors = type(self).from_unsorted(
+            users=np.concatenate([self.users, new_users]),
+            papers=np.concatenate([self.papers, new_papers]),
+            pu=np.vstack(
+                [
+                    self.pu,
+                    rng.normal(init_mean, init_std_dev, (len(new_users), n_factors)),
+                ]
+            ),
+            qi=np.vstack(
+                [
+                    self.qi,
+                    rng.normal(init_mean, init_std_dev, (len(new_papers), n_factors)),
+                ]
+            ),
+            bu=np.concatenate([self.bu, np.zeros(len(new_users))]),
+            bi=np.concatenate([self.bi, np.zeros(len(new_papers))]),
+            global_mean=self.global_mean,
+            rating_scale=self.rating_scale,
+            biased=self.biased,
+        )
+
+        pu, qi, bu, bi = factors.pu, factors.qi, factors.bu, factors.bi
+        rows = list(
+            zip(
+                lookup(factors.users, users_array).tolist(),
+                lookup(factors.papers, papers_array).tolist(),
+                np.asarray(ratings, dtype=np.float64).tolist(),
+                strict=True,
+            )
+        )
+        for _ in range(n_epochs):
+            for u, i, rating in rows:
+                dot = float(pu[u] @ qi[i])
+                if factors.biased:
+                    err = rating - (factors.global_mean + bu[u] + bi[i] + dot)
+                    bu[u] += lr * (err - reg * bu[u])
+                    bi[i] += lr * (err - reg * bi[i])
+                else:
+                    err = rating - dot
+                pu_u = pu[u].copy()
+                pu[u] += lr * (err * qi[i] - reg * pu_u)
+                qi[i] += lr * (err * pu_u - reg * qi[i])
+        return factors
+
+    def clip(self, estimations: np.ndarray) -> np.ndarray:
+        """Clip estimations into the rating scale."""
+        lower_bound, higher_bound = self.rating_scale
+        return np.maximum(lower_bound, np.minimum(higher_bound, estimations))
+
+    def predict_many(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        """Predict the ratings for pairs of users and papers raw IDs."""
+        users, papers = lookup(self.users, user_ids), lookup(self.papers, paper_ids)
+        known_users, known_papers = users != UNKNOWN, papers != UNKNOWN
+        known = known_users & known_papers
+
+        dot = np.zeros(len(users))
+        dot[known] = np.einsum(
+            "ij,ij->i", self.pu[users[known]], self.qi[papers[known]]
+        )
+
+        estimations = np.full(len(users), self.global_mean)
+        if self.biased:
+            estimations[known_users] += self.bu[users[known_users]]
+            estimations[known_papers] += self.bi[papers[known_papers]]
+            estimations += dot
+        else:
+            # The global mean is the fallback when the prediction is impossible
+            estimations[known] = dot[known]
+        return self.clip(estimations)
+
+    def predict_matrix(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        """Predict the ratings of every paper for every user, by raw IDs."""
+        users, papers = lookup(self.users, user_ids), lookup(self.papers, paper_ids)
+        known_users, known_papers = users != UNKNOWN, papers != UNKNOWN
+
+        estimations = np.full((len(users), len(papers)), self.global_mean)
+        dot = self.pu[users[known_users]] @ self.qi[papers[known_papers]].T
+        if self.biased:
+            estimations[known_users] += self.bu[users[known_users]][:, np.newaxis]
+            estimations[:, known_papers] += self.bi[papers[known_papers]]
+            estimations[np.ix_(known_users, known_papers)] += dot
+        else:
+            estimations[np.ix_(known_users, known_papers)] = dot
+        return self.clip(estimations)
+
+    def get_papers_vectors(self) -> np.ndarray:
+        """Return the papers factors, with the papers biases as the last column.
+
+        The rating predicted for a known paper is then the global mean, plus the
+        user bias, plus the inner product of this vector with the user vector.
+        """
+        if not self.biased:
+            return np.asarray(self.qi)
+        return np.hstack([self.qi, self.bi[:, np.newaxis]])
+
+    def get_users_vectors(self, user_ids: Sequence[int]) -> np.ndarray:
+        """Return the vectors of the given users, to query the papers vectors."""
+        users = lookup(self.users, user_ids)
+        known_users = users != UNKNOWN
+
+        vectors = np.zeros((len(users), self.pu.shape[1]))
+        vectors[known_users] = self.pu[users[known_users]]
+        if not self.biased:
+            return vectors
+        return np.hstack([vectors, np.ones((len(users), 1))])
+
+    def get_users_offsets(self, user_ids: Sequence[int]) -> np.ndarray:
+        """Return the part of the ratings that only depends on each user."""
+        users = lookup(self.users, user_ids)
+        known_users = users != UNKNOWN
+
+        offsets = np.full(len(users), self.global_mean)
+        if self.biased:
+            offsets[known_users] += self.bu[users[known_users]]
+        else:
+            offsets[known_users] = 0
+        return offsets
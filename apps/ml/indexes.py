@@ -0,0 +1,192 @@
+"""Approximate nearest neighbours indexes over the models item factors."""
+
+from typing import IO, Self
+
+import numpy as np
+
+CHUNK_SIZE = 65_536
+
+
+def _to_euclidean(vectors: np.ndarray, max_norm: float) -> np.ndarray:
+    """Append a component that makes every vector norm equal to `max_norm`.
+
+    With all the vectors on the same sphere, the nearest vectors (L2) to a query
+    whose extra component is zero are the ones with the largest inner products.
+    """
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    extra = np.sqrt(np.maximum(max_norm**2 - norms, 0))
+    return np.hstack([vectors, extra[:, np.newaxis]])
+
+
+def _nearest_centroids(
+    vectors: np.ndarray, centroids: np.ndarray, n: int = 1
+) -> np.ndarray:
+    """Return the rows of the `n` nearest centroids (L2) of each vector."""
+    distances = (
+        np.einsum("ij,ij->i", centroids, centroids)[np.newaxis, :]
+        - 2 * vectors @ centroids.T
+    )
+    if n == 1:
+        return distances.argmin(axis=1)[:, np.newaxis]
+    return np.argpartition(distances, n - 1, axis=1)[:, :n]
+
+
+class IVFIndex:
+    """Inverted file index for maximum inner product search.
+
+    The items are clustered with k-means and stored grouped by cluster (list).
+    A search only scores the items of the `n_probe` lists whose centroids are the
+    closest to the query, trading recall for latency.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        max_norm: float,
+    ) -> None:
+        """Initializes the index from its (already grouped by list) arrays.
+
+        Args:
+            ids (numpy.ndarray): The items IDs.
+            vectors (numpy.ndarray): The items vectors.
+            centroids (numpy.ndarray): The lists centroids.
+            offsets (numpy.ndarray): The start position of each list on `ids` and
+            `vectors`, followed by the number of items.
+            max_norm (float): The largest norm of the items vectors.
+        """
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.max_norm = max_norm
+
+    def __len__(self) -> int:
+        """Return the number of items in the index."""
+        return len(self.ids)
+
+    @property
+    def n_lists(self) -> int:
+        """The number of lists (clusters) of the index."""
+        return len(self.centroids)
+
+    @classmethod
+    def build(  # noqa: PLR0913
+        cls,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        n_lists: int | None = None,
+        n_iter: int = 10,
+        seed: int = 0,
+    ) -> Self:
+        """Builds an index over the given items.
+
+        Args:
+            ids (numpy.ndarray): The items IDs.
+            vectors (numpy.ndarray): The items vectors, one row per item.
+            n_lists (int | None, optional): The number of lists. Defaults to the
+            square root of the number of items.
+            n_iter (int, optional): The k-means iterations. Defaults to 10.
+            seed (int, optional): The k-means random seed. Defaults to 0.
+
+        Returns:
+            IVFIndex: The built index.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        max_norm = float(np.linalg.norm(vectors, axis=1).max(initial=0))
+        points = _to_euclidean(vectors, max_norm)
+
+        n_lists = max(1, min(n_lists or int(np.sqrt(len(points))), len(points)))
+        rng = np.random.default_rng(seed)
+        sample = points[
+            rng.choice(len(points), min(len(points), 256 * n_lists), replace=False)
+        ]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(n_iter):
+            assignments = _nearest_centroids(sample, centroids)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)[:, np.newaxis]
+            # Empty lists keep their previous centroid
+            centroids = np.where(counts > 0, sums / np.maximum(counts, 1), centroids)
+
+        assignments = np.concatenate(
+            [
+                _nearest_centroids(points[start : start + CHUNK_SIZE], centroids)[:, 0]
+                for start in range(0, len(points), CHUNK_SIZE)
+            ]
+        )
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        return cls(
+            ids=np.asarray(ids)[order],
+            vectors=vectors[order],
+            centroids=centroids,
+            offsets=offsets,
+            max_norm=max_norm,
+        )
+
+    def search(
+        self, queries: np.ndarray, k: int, n_probe: int = 8
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search the items with the largest inner product with each query.
+
+        Args:
+            queries (numpy.ndarray): The queries vectors, one row per query.
+            k (int): The number of items to return for each query.
+            n_probe (int, optional): The number of lists to scan. Defaults to 8.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The IDs of the items found and
+            their inner products, both with shape `(queries, k)` and sorted by
+            descending inner product. Rows with less than `k` items are padded
+            with the first ID and `-inf` scores.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        n_probe = max(1, min(n_probe, self.n_lists))
+        probes = _nearest_centroids(
+            np.hstack([queries, np.zeros((len(queries), 1), dtype=np.float32)]),
+            self.centroids,
+            n_probe,
+        )
+
+        rows = np.zeros((len(queries), k), dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf)
+        for query, lists in enumerate(probes):
+            candidates = np.concatenate(
+                [np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            )
+            candidates_scores = self.vectors[candidates] @ queries[query]
+            n = min(k, len(candidates))
+            if n == 0:
+                continue
+            best = np.argpartition(-candidates_scores, n - 1)[:n]
+            best = best[np.argsort(-candidates_scores[best], kind="stable")]
+            rows[query, :n] = candidates[best]
+            scores[query, :n] = candidates_scores[best]
+        return self.ids[rows], scores
+
+    def save(self, file: IO[bytes]) -> None:
+        """Write the index to a file."""
+        np.savez(
+            file,
+            ids=self.ids,
+            vectors=self.vectors,
+            centroids=self.centroids,
+            offsets=self.offsets,
+            max_norm=np.float64(self.max_norm),
+        )
+
+    @classmethod
+    def load(cls, file: IO[bytes]) -> Self:
+        """Read an index from a file."""
+        with np.load(file) as data:
+            return cls(
+                ids=data["ids"],
+                vectors=data["vectors"],
+                centroids=data["centroids"],
+                offsets=data["offsets"],
+                max_norm=float(data["max_norm"]),
+            )
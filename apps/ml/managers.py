@@ -14,3 +14,21 @@ class ModelManager(models.Manager):
             Model: The corresponding model.
         """
         return self.filter(type=model_type, latest=True).order_by("-created").first()
+
+    def get_latest_id_for_type(self, model_type):
+        """Return the ID of the latest model for a given type.
+
+        It is a cheap way to check if the latest model has changed.
+
+        Args:
+            model_type (str): The model type to filter by.
+
+        Returns:
+            UUID | None: The ID of the corresponding model.
+        """
+        return (
+            self.filter(type=model_type, latest=True)
+            .order_by("-created")
+            .values_list("id", flat=True)
+            .first()
+        )
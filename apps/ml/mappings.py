@@ -0,0 +1,90 @@
+"""Mappings between the papers IDs and the embedding indexes models are trained on."""
+
+from collections.abc import Mapping, Sequence
+from typing import Self
+
+import numpy as np
+
+from apps.ml.factors import UNKNOWN, lookup, to_ids_array
+
+
+class PapersMapping:
+    """The papers IDs of each embedding index a model was trained on.
+
+    The papers embedding indexes are only compacted periodically, so a model
+    stores the mapping it was trained with and keeps scoring the right papers after
+    that. Papers deleted since the training are tombstoned in a bitmap, aligned
+    with the indexes, and never returned.
+    """
+
+    def __init__(
+        self,
+        indexes: np.ndarray,
+        ids: np.ndarray,
+        deleted: np.ndarray | None = None,
+    ) -> None:
+        """Initializes the mapping.
+
+        Args:
+            indexes (numpy.ndarray): The papers embedding indexes, sorted.
+            ids (numpy.ndarray): The papers IDs, aligned with `indexes`.
+            deleted (numpy.ndarray | None, optional): Flags the deleted papers,
+            aligned with `indexes`. Defaults to none deleted.
+        """
+        self.indexes = indexes
+        self.ids = ids
+        self.deleted = (
+            np.zeros(len(indexes), dtype=bool) if deleted is None else deleted
+        )
+        self._ids_order = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._ids_order]
+
+    def __len__(self) -> int:
+        """Return the number of mapped papers, deleted ones included."""
+        return len(self.indexes)
+
+    @classmethod
+    def from_unsorted(cls, indexes: Sequence[int], ids: Sequence[int]) -> Self:
+        """Create the mapping from pairs in any order, possibly repeated."""
+        indexes_array, positions = np.unique(to_ids_array(indexes), return_index=True)
+        return cls(indexes=indexes_array, ids=to_ids_array(ids)[positions])
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> Self:
+        """Create the mapping from the arrays returned by `to_arrays`."""
+        return cls(indexes=arrays["mapping_indexes"], ids=arrays["mapping_ids"])
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Return the mapping as a mapping of arrays, with no tombstones."""
+        return {"mapping_indexes": self.indexes, "mapping_ids": self.ids}
+
+    def without_deleted(self, existing_ids: Sequence[int]) -> Self:
+        """Return a copy of the mapping with the missing papers tombstoned.
+
+        Args:
+            existing_ids (Sequence[int]): The IDs of all the existing papers.
+        """
+        return type(self)(
+            indexes=self.indexes,
+            ids=self.ids,
+            deleted=~np.isin(self.ids, to_ids_array(existing_ids)),
+        )
+
+    def get_ids(self, indexes: Sequence[int]) -> np.ndarray:
+        """Return the papers IDs of embedding indexes, `UNKNOWN` if not mapped."""
+        positions = lookup(self.indexes, indexes)
+        known = positions != UNKNOWN
+        known[known] = ~self.deleted[positions[known]]
+        ids = np.full(len(positions), UNKNOWN)
+        ids[known] = self.ids[positions[known]]
+        return ids
+
+    def get_indexes(self, ids: Sequence[int | None]) -> np.ndarray:
+        """Return the embedding indexes of papers IDs, `UNKNOWN` if not mapped."""
+        positions = lookup(self._sorted_ids, ids)
+        known = positions != UNKNOWN
+        positions[known] = self._ids_order[positions[known]]
+        known[known] = ~self.deleted[positions[known]]
+        indexes = np.full(len(positions), UNKNOWN)
+        indexes[known] = self.indexes[positions[known]]
+        return indexes
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:55
+
+import apps.ml.models.base
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='index_file',
+            field=models.FileField(blank=True, help_text='Approximate nearest neighbours index of the model items', null=True, upload_to=apps.ml.models.base.model_file_handler),
+        ),
+    ]
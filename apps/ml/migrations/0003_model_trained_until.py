@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0002_model_index_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='trained_until',
+            field=models.DateTimeField(blank=True, help_text='Creation time of the latest review the model was trained on', null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:23
+
+import apps.ml.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0003_model_trained_until'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ALSModel',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'ALS Model',
+                'verbose_name_plural': 'ALS Models',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=(apps.ml.models.mixins.LatentFactorsMixin, 'ml.model'),
+        ),
+        migrations.CreateModel(
+            name='ItemKNNModel',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Item kNN Model',
+                'verbose_name_plural': 'Item kNN Models',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=(apps.ml.models.mixins.ArraysArtifactMixin, 'ml.model'),
+        ),
+        migrations.AlterField(
+            model_name='model',
+            name='type',
+            field=models.CharField(choices=[('svd', 'SVD'), ('als', 'ALS'), ('knn', 'Item kNN')], max_length=3),
+        ),
+    ]
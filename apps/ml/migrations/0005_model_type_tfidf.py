@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:28
+
+import apps.ml.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0004_model_type_als_knn'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TFIDFModel',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'TF-IDF Model',
+                'verbose_name_plural': 'TF-IDF Models',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=(apps.ml.models.mixins.ArraysArtifactMixin, 'ml.model'),
+        ),
+        migrations.AlterField(
+            model_name='model',
+            name='type',
+            field=models.CharField(choices=[('svd', 'SVD'), ('als', 'ALS'), ('knn', 'Item kNN'), ('tfidf', 'TF-IDF')], max_length=8),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:35
+
+import apps.ml.models.base
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0005_model_type_tfidf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='model',
+            name='related_file',
+            field=models.FileField(blank=True, help_text='Most similar papers of each paper, precomputed by the model', null=True, upload_to=apps.ml.models.base.model_file_handler),
+        ),
+    ]
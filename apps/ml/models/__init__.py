@@ -2,6 +2,15 @@ from apps.ml.models.base import Model
 
 __all__ = ["Model"]
 
+try:
+    from apps.ml.models.als import ALSModel
+    from apps.ml.models.content import TFIDFModel
+    from apps.ml.models.knn import ItemKNNModel
+
+    __all__ += ["ALSModel", "ItemKNNModel", "TFIDFModel"]
+except ImportError:
+    pass
+
 try:
     from apps.ml.models.surprise import SVDModel
 
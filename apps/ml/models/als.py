@@ -0,0 +1,159 @@
+"""Proxies to manage implicit feedback models trained by alternating least squares."""
+
+from typing import Any, ClassVar, override
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from apps.ml.factors import LatentFactors
+from apps.ml.mappings import PapersMapping
+from apps.ml.models.base import Model
+from apps.ml.models.mixins import LatentFactorsMixin
+from apps.ml.sparse import get_ratings_matrix
+
+
+def _least_squares(
+    confidence: sparse.csr_matrix,
+    x: np.ndarray,
+    y: np.ndarray,
+    reg: float,
+    cg_steps: int,
+) -> np.ndarray:
+    """Solve the factors of the rows of a confidence matrix, the columns ones fixed.
+
+    Each row `u` minimizes `sum(c_ui * (p_ui - x_u . y_i) ** 2) + reg * |x_u| ** 2`
+    over all the columns, where the preference `p_ui` is 1 for the observed pairs
+    and 0 otherwise. The linear systems of all the rows are solved together by
+    conjugate gradient steps started from their current factors, so each step only
+    costs sparse and dense matrix products.
+
+    Args:
+        confidence (scipy.sparse.csr_matrix): The confidence minus one of the
+        observed pairs.
+        x (numpy.ndarray): The current factors of the rows.
+        y (numpy.ndarray): The factors of the columns.
+        reg (float): The regularization term.
+        cg_steps (int): The number of conjugate gradient steps.
+
+    Returns:
+        numpy.ndarray: The updated factors of the rows.
+    """
+    rows = np.repeat(np.arange(confidence.shape[0]), np.diff(confidence.indptr))
+    columns = confidence.indices
+    gram = y.T @ y + reg * np.eye(y.shape[1])
+
+    def product(vectors: np.ndarray) -> np.ndarray:
+        dots = np.einsum("ij,ij->i", vectors[rows], y[columns])
+        weighted = sparse.csr_matrix(
+            (confidence.data * dots, columns, confidence.indptr),
+            shape=confidence.shape,
+        )
+        return vectors @ gram + weighted @ y
+
+    targets = (
+        sparse.csr_matrix(
+            (confidence.data + 1, columns, confidence.indptr), shape=confidence.shape
+        )
+        @ y
+    )
+    x = np.array(x, dtype=np.float64)
+    residuals = targets - product(x)
+    directions = residuals.copy()
+    residuals_norms = np.einsum("ij,ij->i", residuals, residuals)
+    for _ in range(cg_steps):
+        products = product(directions)
+        curvatures = np.einsum("ij,ij->i", directions, products)
+        steps = np.divide(
+            residuals_norms,
+            curvatures,
+            out=np.zeros_like(curvatures),
+            where=curvatures > 0,
+        )
+        x += steps[:, np.newaxis] * directions
+        residuals -= steps[:, np.newaxis] * products
+        new_norms = np.einsum("ij,ij->i", residuals, residuals)
+        ratios = np.divide(
+            new_norms,
+            residuals_norms,
+            out=np.zeros_like(new_norms),
+            where=residuals_norms > 0,
+        )
+        directions = residuals + ratios[:, np.newaxis] * directions
+        residuals_norms = new_norms
+    return x
+
+
+class ALSModel(LatentFactorsMixin, Model):
+    """Model for storing implicit feedback ALS models.
+
+    The reviews are implicit signals of preference, with a confidence growing with
+    the rating, and the factors are fitted by alternating least squares over the
+    sparse confidence matrix (Hu, Koren and Volinsky, 2008). The scores only rank
+    the papers of each user, they are not ratings.
+    """
+
+    predicts_ratings = False
+
+    DEFAULT_PARAMS: ClassVar[dict[str, Any]] = {
+        "n_factors": 64,
+        "n_epochs": 15,
+        "reg": 0.01,
+        "alpha": 10.0,
+        "cg_steps": 3,
+        "init_std_dev": 0.01,
+    }
+
+    class Meta:
+        proxy = True
+        verbose_name = "ALS Model"
+        verbose_name_plural = "ALS Models"
+
+    @override
+    def __init__(self, *args, **kwargs) -> None:
+        """Initializes the ALS model by setting defaults."""
+        super().__init__(*args, **kwargs)
+        self.type = Model.TypeChoices.ALS
+        if not self.params:
+            self.params = self.DEFAULT_PARAMS
+
+    @override
+    def train(self, df: pd.DataFrame) -> None:
+        """Fits the factors on the whole dataset.
+
+        The confidence of a review is `1 + alpha * rating`.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+        """
+        training_df = self.prepare_for_training(df)
+        params = {**self.DEFAULT_PARAMS, **(self.params or {})}
+        users, papers, ratings = get_ratings_matrix(training_df)
+
+        confidence = ratings * params["alpha"]
+        confidence_by_paper = confidence.T.tocsr()
+        rng = np.random.default_rng(params.get("random_state"))
+        pu = rng.normal(0, params["init_std_dev"], (len(users), params["n_factors"]))
+        qi = rng.normal(0, params["init_std_dev"], (len(papers), params["n_factors"]))
+        for _ in range(params["n_epochs"]):
+            pu = _least_squares(confidence, pu, qi, params["reg"], params["cg_steps"])
+            qi = _least_squares(
+                confidence_by_paper, qi, pu, params["reg"], params["cg_steps"]
+            )
+
+        # Unbiased and unbounded, the scores of unknown pairs are zero
+        self._factors = LatentFactors(
+            users=users,
+            papers=papers,
+            pu=pu,
+            qi=qi,
+            bu=np.zeros(len(users)),
+            bi=np.zeros(len(papers)),
+            global_mean=0.0,
+            rating_scale=(-np.inf, np.inf),
+            biased=False,
+        )
+        self._mapping = PapersMapping.from_unsorted(
+            training_df["paper"], training_df["paperId"]
+        )
+        self.trained_until = self.get_watermark(training_df)
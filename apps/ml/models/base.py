@@ -1,8 +1,13 @@
 import pathlib
+import tempfile
 import uuid
-from typing import Any
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, ClassVar, Literal, Self
 
+import numpy as np
 import pandas as pd
+from django.core.files import File
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
@@ -11,7 +16,17 @@ from django_extensions.db.models import TimeStampedModel
 
 from apps.exports.utils import save
 from apps.ml import managers
+from apps.ml.artifacts import (
+    ARTIFACT_SUFFIX,
+    discard_arrays,
+    open_arrays,
+    write_arrays,
+)
 from apps.ml.encoders import ValidationResultsJSONEncoder
+from apps.ml.evaluation import AccuracyMetrics, get_accuracy_metrics
+from apps.ml.factors import UNKNOWN, lookup
+from apps.ml.indexes import IVFIndex
+from apps.ml.mappings import PapersMapping
 
 
 def model_file_handler(instance: "Model", filename):
@@ -29,19 +44,51 @@ class Model(TimeStampedModel, models.Model):
 
     class TypeChoices(models.TextChoices):
         SVD = "svd", "SVD"
+        ALS = "als", "ALS"
+        KNN = "knn", "Item kNN"
+        TFIDF = "tfidf", "TF-IDF"
 
     _model: Any | None = None
+    _index: IVFIndex | None = None
+    _related: dict[str, np.ndarray] | None = None
+    _latest_file_name: str | None = None
+    """The name of the file last published as the latest of the type."""
+
+    supports_warm_start: ClassVar[bool] = False
+    predicts_ratings: ClassVar[bool] = True
+    """If the scores are ratings predictions, else only their order is meaningful."""
+    requires_all_papers: ClassVar[bool] = False
+    """If the model is trained on all the papers, including the ones not reviewed."""
+    supports_similar_papers: ClassVar[bool] = False
+    """If the model implements `get_similar_papers`."""
 
     id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     file = models.FileField(blank=True, null=True, upload_to=model_file_handler)
+    index_file = models.FileField(
+        help_text=_("Approximate nearest neighbours index of the model items"),
+        blank=True,
+        null=True,
+        upload_to=model_file_handler,
+    )
+    related_file = models.FileField(
+        help_text=_("Most similar papers of each paper, precomputed by the model"),
+        blank=True,
+        null=True,
+        upload_to=model_file_handler,
+    )
     latest = models.BooleanField(default=True)
-    type = models.CharField(max_length=3, choices=TypeChoices.choices)
+    type = models.CharField(max_length=8, choices=TypeChoices.choices)
     params = models.JSONField(
         help_text=_("Parameters for training"), encoder=DjangoJSONEncoder, null=True
     )
     validation_results = models.JSONField(
         encoder=ValidationResultsJSONEncoder, null=True
     )
+    trained_until = models.DateTimeField(
+        help_text=_("Creation time of the latest review the model was trained on"),
+        null=True,
+        blank=True,
+    )
 
     objects: managers.ModelManager = managers.ModelManager()
 
@@ -53,24 +100,51 @@ class Model(TimeStampedModel, models.Model):
         return self.filename + " - " + self.type
 
     def save(self, *args, **kwargs):
+        """Save the model, publishing its file as the latest of its type.
+
+        The file is only copied when the model becomes the latest or its file
+        changes, not on every save.
+        """
         super().save(*args, **kwargs)
-        if self.latest and self.file:
+        if not self.latest:
+            self._latest_file_name = None
+        elif self.file and self.file.name != self._latest_file_name:
             path = model_file_handler(self, self.filename)
             folder = path.parent.parent
-            save(folder / f"latest{path.suffix}", self.file, overwrite=True)
+            # Read back from the storage, the saved file may be closed already
+            with self.file.storage.open(self.file.name, "rb") as file:
+                save(folder / f"latest{path.suffix}", file, overwrite=True)
+            self.file.close()
+            self._latest_file_name = self.file.name
             Model.objects.filter(type=self.type).exclude(pk=self.pk).update(
                 latest=False
             )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load a model, remembering the file it published if it is the latest."""
+        instance = super().from_db(db, field_names, values)
+        if {"latest", "file"} <= set(field_names) and instance.latest:
+            instance._latest_file_name = instance.file.name  # noqa: SLF001
+        return instance
+
     @property
     def filename(self):
         return pathlib.Path(self.file.name).name
 
     def delete(self, *args, **kwargs):
-        if self.file and self.file.storage.exists(self.file.name):
-            self.file.delete(save=False)
+        for file in (self.file, self.index_file, self.related_file):
+            if file and file.storage.exists(file.name):
+                file.delete(save=False)
+        discard_arrays(str(self.id))
+        discard_arrays(self.related_key)
         super().delete(*args, **kwargs)
 
+    @property
+    def related_key(self) -> str:
+        """The key of the related papers artifact, unique to the model."""
+        return f"{self.id}-related"
+
     def train(self, df: pd.DataFrame) -> None:
         """Train the model using the provided dataset.
 
@@ -79,6 +153,80 @@ class Model(TimeStampedModel, models.Model):
         """
         raise NotImplementedError
 
+    def fit(self, df: pd.DataFrame) -> None:
+        """Fit the model on the whole dataset, with no held-out validation.
+
+        Unlike `train`, it does not cross-validate the model first, for callers
+        that evaluate it on their own test split. Models that are not validated
+        when trained are just trained on the dataset.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+        """
+        self.train(df)
+
+    def tune(
+        self,
+        df: pd.DataFrame,
+        param_grid: dict[str, list[Any]] | None = None,
+        *,
+        method: Literal["grid", "random"] = "grid",
+        n_iter: int = 10,
+    ) -> None:
+        """Search the best params by cross-validation, then train the model.
+
+        Models that do not support it are trained with their params.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+            param_grid (dict[str, list[Any]] | None, optional): The values to
+            search for each param. Defaults to the model default grid.
+            method (Literal["grid", "random"], optional): If all the combinations
+            are evaluated, or `n_iter` random ones. Defaults to "grid".
+            n_iter (int, optional): The number of combinations evaluated by the
+            random search. Defaults to 10.
+        """
+        self.train(df)
+
+    def train_warm(self, df: pd.DataFrame, previous: Self) -> None:
+        """Train the model from a previous model, on the reviews created since.
+
+        Only models that support warm starts implement it.
+
+        Args:
+            df (pandas.DataFrame): The dataset, with the reviews creation times.
+            previous (Model): The trained model to start from.
+        """
+        raise NotImplementedError
+
+    def get_accuracy(self) -> float | None:
+        """Return the held-out RMSE measured when the model was trained, if any."""
+        return (self.validation_results or {}).get("rmse")
+
+    def evaluate(self, df: pd.DataFrame) -> AccuracyMetrics:
+        """Evaluate the model predictions on a dataset.
+
+        Args:
+            df (pandas.DataFrame): The dataset, in the training format.
+
+        Returns:
+            AccuracyMetrics: The errors of the predicted ratings.
+        """
+        evaluation_df = self.prepare_for_training(df)
+        return get_accuracy_metrics(
+            self.predict_many(
+                evaluation_df["user"].to_numpy(), evaluation_df["paper"].to_numpy()
+            ),
+            evaluation_df["rating"].to_numpy(),
+        )
+
+    @staticmethod
+    def get_watermark(df: pd.DataFrame) -> datetime | None:
+        """Return the creation time of the latest review of a dataset, if any."""
+        if "createdAt" not in df or df.empty:
+            return None
+        return pd.to_datetime(df["createdAt"], utc=True).max().to_pydatetime()
+
     def persist(self) -> None:
         """Persist the model to the file."""
         raise NotImplementedError
@@ -86,18 +234,140 @@ class Model(TimeStampedModel, models.Model):
     def prepare_for_training(self, df: pd.DataFrame) -> pd.DataFrame:
         """Prepare the dataset for training.
 
+        The reviews missing a value are dropped, and the columns are renamed to
+        `user`, `paper` (the paper embedding index) and `rating`.
+
         Args:
             df (pandas.DataFrame): The base dataset.
 
         Returns:
             pandas.DataFrame: The resulting dataset.
         """
-        raise NotImplementedError
+        training_df = df.copy().dropna(
+            subset=["userId", "paperId", "paperIndex", "rating"]
+        )
+
+        for column, column_type in [
+            ("userId", int),
+            ("paperId", int),
+            ("paperIndex", int),
+            ("rating", float),
+        ]:
+            training_df[column] = training_df[column].astype(column_type)
+
+        return training_df.rename(
+            columns={"userId": "user", "paperIndex": "paper", "rating": "rating"}
+        )
 
     def load(self) -> None:
         """Load the model from the file."""
         raise NotImplementedError
 
+    def build_index(self, min_papers: int | None = None) -> None:
+        """Build and persist an approximate nearest neighbours index of the papers.
+
+        Models that do not support indexing do nothing.
+
+        Args:
+            min_papers (int | None, optional): The index is only built if the model
+            covers at least this number of papers.
+            Defaults to the `ML_INDEX_MIN_PAPERS` setting.
+        """
+
+    def get_papers_mapping(self) -> PapersMapping | None:
+        """Return the papers IDs of the embedding indexes the model was trained on.
+
+        Models that do not store it return None, and are used with the current
+        papers indexes.
+        """
+        return None
+
+    def get_index(self) -> IVFIndex | None:
+        """Return the model index, loading it from its file on first use."""
+        if self._index is None and self.index_file:
+            with self.index_file.open("rb") as f:
+                self._index = IVFIndex.load(f)
+        return self._index
+
+    def search(
+        self, user_ids: Sequence[int], k: int, *, n_probe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search the papers with the best predicted ratings for each user.
+
+        It uses the model index, so the results are approximate.
+
+        Args:
+            user_ids (Sequence[int]): The users IDs.
+            k (int): The number of papers to return for each user.
+            n_probe (int | None, optional): The number of index lists to scan.
+            Defaults to the `ML_INDEX_N_PROBE` setting.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The papers IDs and the predicted
+            ratings, both with shape `(len(user_ids), k)` and sorted by descending
+            rating. Missing papers have `-inf` ratings.
+        """
+        raise NotImplementedError
+
+    def get_similar_papers(
+        self, paper_ids: Sequence[int], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search the papers most similar to each paper.
+
+        Models that can not compare papers do not implement it.
+
+        Args:
+            paper_ids (Sequence[int]): The papers IDs.
+            k (int): The number of similar papers to return for each paper.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The similar papers IDs and their
+            similarities, both with shape `(len(paper_ids), k)` and sorted by
+            descending similarity. Missing papers have `UNKNOWN` IDs and `-inf`
+            similarities.
+        """
+        raise NotImplementedError
+
+    def save_related_papers(
+        self, papers_ids: np.ndarray, related_ids: np.ndarray
+    ) -> None:
+        """Persist the papers most similar to each paper, precomputed by the model.
+
+        Args:
+            papers_ids (numpy.ndarray): The papers IDs, sorted.
+            related_ids (numpy.ndarray): The IDs of the papers most similar to each
+            paper, most similar first, with shape `(len(papers_ids), k)` and padded
+            with `UNKNOWN`.
+        """
+        with tempfile.NamedTemporaryFile("rb+") as temp:
+            write_arrays(temp, {"papers": papers_ids, "related": related_ids})
+            temp.seek(0)
+            self.related_file.save(
+                f"related-{self.id}{ARTIFACT_SUFFIX}", File(temp), save=True
+            )
+        discard_arrays(self.related_key)
+        self._related = None
+
+    def get_related_papers(self, paper_id: int) -> list[int]:
+        """Return the IDs of the papers most similar to a paper, most similar first.
+
+        It is a lookup on the precomputed related papers, memory-mapped on first
+        use. Papers that were not precomputed have no related papers.
+
+        Args:
+            paper_id (int): The paper ID.
+        """
+        if self._related is None:
+            if not self.related_file:
+                return []
+            self._related = open_arrays(self.related_file, self.related_key)
+
+        [position] = lookup(self._related["papers"], [paper_id])
+        if position == UNKNOWN:
+            return []
+        related = self._related["related"][position]
+        return related[related != UNKNOWN].tolist()
+
     def predict(self, user_id: int, paper_id: int) -> float:
         """Predict the ratings for the provided dataset.
 
@@ -109,3 +379,47 @@ class Model(TimeStampedModel, models.Model):
             float: The predicted rating.
         """
         raise NotImplementedError
+
+    def predict_many(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        """Predict the ratings for pairs of users and papers.
+
+        The default implementation calls `predict` for each pair, models that can
+        score in batch should override it.
+
+        Args:
+            user_ids (Sequence[int]): The users IDs.
+            paper_ids (Sequence[int]): The papers IDs, aligned with `user_ids`.
+
+        Returns:
+            numpy.ndarray: The predicted rating for each pair.
+        """
+        if len(user_ids) != len(paper_ids):
+            msg = "The users and papers sequences must have the same length."
+            raise ValueError(msg)
+        return np.fromiter(
+            (
+                self.predict(user_id, paper_id)
+                for user_id, paper_id in zip(user_ids, paper_ids, strict=True)
+            ),
+            dtype=np.float64,
+            count=len(user_ids),
+        )
+
+    def predict_matrix(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        """Predict the ratings of every paper for every user.
+
+        Args:
+            user_ids (Sequence[int]): The users IDs.
+            paper_ids (Sequence[int]): The papers IDs.
+
+        Returns:
+            numpy.ndarray: A `(len(user_ids), len(paper_ids))` matrix with the
+            predicted ratings.
+        """
+        users = np.repeat(np.asarray(user_ids, dtype=object), len(paper_ids))
+        papers = np.tile(np.asarray(paper_ids, dtype=object), len(user_ids))
+        return self.predict_many(users, papers).reshape(len(user_ids), len(paper_ids))
@@ -0,0 +1,226 @@
+"""Proxies to manage content-based models of the papers texts."""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, ClassVar, override
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+from apps.ml.factors import UNKNOWN, lookup
+from apps.ml.mappings import PapersMapping
+from apps.ml.models.base import Model
+from apps.ml.models.mixins import ArraysArtifactMixin
+from apps.ml.ranking import search_similar
+from apps.ml.sparse import (
+    csr_from_arrays,
+    csr_to_arrays,
+    inner_products,
+    normalize_rows,
+)
+from apps.ml.text import get_tfidf_matrix
+
+
+def _pairs_inner_products(
+    a: sparse.csr_matrix | np.ndarray, b: sparse.csr_matrix | np.ndarray
+) -> np.ndarray:
+    """Return the inner products of the aligned rows of two matrices."""
+    if sparse.issparse(a):
+        return np.asarray(a.multiply(b).sum(axis=1)).ravel()
+    return np.einsum("ij,ij->i", a, b)
+
+
+def _matrix_to_arrays(
+    prefix: str, matrix: sparse.csr_matrix | np.ndarray
+) -> dict[str, np.ndarray]:
+    """Return a sparse or dense matrix as a mapping of arrays."""
+    if sparse.issparse(matrix):
+        return csr_to_arrays(prefix, matrix)
+    return {prefix: matrix}
+
+
+def _matrix_from_arrays(
+    prefix: str, arrays: Mapping[str, np.ndarray]
+) -> sparse.csr_matrix | np.ndarray:
+    """Create a sparse or dense matrix from the arrays of `_matrix_to_arrays`."""
+    if f"{prefix}_indptr" in arrays:
+        return csr_from_arrays(prefix, arrays)
+    return arrays[prefix]
+
+
+class TFIDFModel(ArraysArtifactMixin, Model):
+    """Model for storing content-based models of the papers texts.
+
+    Each paper is the TF-IDF vector of its title, abstract and keywords, optionally
+    reduced by a truncated SVD, and each user the sum of the vectors of the papers
+    they reviewed, weighted by their ratings. The scores are the cosines of the
+    users and papers vectors, so the papers with no reviews are scored too. They
+    only rank the papers of each user, they are not ratings.
+    """
+
+    _papers: np.ndarray | None = None
+    _vectors: sparse.csr_matrix | np.ndarray | None = None
+    _users: np.ndarray | None = None
+    _profiles: sparse.csr_matrix | np.ndarray | None = None
+
+    predicts_ratings = False
+    requires_all_papers = True
+    supports_similar_papers = True
+    TEXT_COLUMNS: ClassVar[list[str]] = ["title", "abstract", "keywordNames"]
+
+    DEFAULT_PARAMS: ClassVar[dict[str, Any]] = {
+        "min_df": 2,
+        "max_df": 0.5,
+        "max_features": 100_000,
+        "sublinear_tf": True,
+        "n_components": None,
+    }
+
+    class Meta:
+        proxy = True
+        verbose_name = "TF-IDF Model"
+        verbose_name_plural = "TF-IDF Models"
+
+    @override
+    def __init__(self, *args, **kwargs) -> None:
+        """Initializes the TF-IDF model by setting defaults."""
+        super().__init__(*args, **kwargs)
+        self.type = Model.TypeChoices.TFIDF
+        if not self.params:
+            self.params = self.DEFAULT_PARAMS
+
+    @property
+    @override
+    def is_loaded(self) -> bool:
+        return self._vectors is not None
+
+    @staticmethod
+    def _reduce(
+        vectors: sparse.csr_matrix, n_components: int, random_state: int | None
+    ) -> sparse.csr_matrix | np.ndarray:
+        """Project the vectors on their `n_components` main singular directions."""
+        n_components = min(n_components, min(vectors.shape) - 1)
+        if n_components < 1:
+            return vectors
+        u, s, _ = svds(vectors, k=n_components, random_state=random_state)
+        return normalize_rows(u * s)
+
+    @override
+    def train(self, df: pd.DataFrame) -> None:
+        """Computes the papers vectors and the users profiles.
+
+        Args:
+            df (pandas.DataFrame): The dataset of all the papers, with their texts
+            and reviews. Papers with no reviews have empty reviews columns.
+        """
+        params = {**self.DEFAULT_PARAMS, **(self.params or {})}
+        papers_df = (
+            df.dropna(subset=["paperId", "paperIndex"])
+            .drop_duplicates(subset="paperIndex")
+            .astype({"paperId": int, "paperIndex": int})
+            .sort_values("paperIndex")
+        )
+        texts = (
+            papers_df.reindex(columns=self.TEXT_COLUMNS)
+            .fillna("")
+            .astype(str)
+            .agg(" ".join, axis=1)
+        )
+        _, vectors = get_tfidf_matrix(
+            texts,
+            min_df=params["min_df"],
+            max_df=params["max_df"],
+            max_features=params["max_features"],
+            sublinear_tf=params["sublinear_tf"],
+        )
+        if params["n_components"]:
+            vectors = self._reduce(
+                vectors, params["n_components"], params.get("random_state")
+            )
+        self._papers = papers_df["paperIndex"].to_numpy(dtype=np.int64)
+        self._vectors = vectors
+
+        reviews_df = self.prepare_for_training(df)
+        reviews_df = reviews_df[np.isin(reviews_df["paper"], self._papers)]
+        self._users, rows = np.unique(
+            reviews_df["user"].to_numpy(dtype=np.int64), return_inverse=True
+        )
+        ratings = sparse.csr_matrix(
+            (
+                reviews_df["rating"].to_numpy(dtype=np.float64),
+                (rows, np.searchsorted(self._papers, reviews_df["paper"])),
+            ),
+            shape=(len(self._users), len(self._papers)),
+        )
+        self._profiles = normalize_rows(ratings @ vectors)
+
+        self._mapping = PapersMapping.from_unsorted(
+            papers_df["paperIndex"], papers_df["paperId"]
+        )
+        self.trained_until = self.get_watermark(reviews_df)
+
+    @override
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        if not self.is_loaded:
+            self.load()
+        return {
+            "papers": self._papers,
+            "users": self._users,
+            **_matrix_to_arrays("vectors", self._vectors),
+            **_matrix_to_arrays("profiles", self._profiles),
+        }
+
+    @override
+    def from_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self._papers = arrays["papers"]
+        self._users = arrays["users"]
+        self._vectors = _matrix_from_arrays("vectors", arrays)
+        self._profiles = _matrix_from_arrays("profiles", arrays)
+
+    @override
+    def predict(self, user_id: int, paper_id: int) -> float:
+        return float(self.predict_many([user_id], [paper_id])[0])
+
+    @override
+    def predict_many(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        if len(user_ids) != len(paper_ids):
+            msg = "The users and papers sequences must have the same length."
+            raise ValueError(msg)
+        if not self.is_loaded:
+            self.load()
+
+        users, papers = lookup(self._users, user_ids), lookup(self._papers, paper_ids)
+        known = (users != UNKNOWN) & (papers != UNKNOWN)
+
+        estimations = np.zeros(len(users))
+        estimations[known] = _pairs_inner_products(
+            self._profiles[users[known]], self._vectors[papers[known]]
+        )
+        return estimations
+
+    @override
+    def predict_matrix(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        if not self.is_loaded:
+            self.load()
+
+        users, papers = lookup(self._users, user_ids), lookup(self._papers, paper_ids)
+        known_users, known_papers = users != UNKNOWN, papers != UNKNOWN
+
+        estimations = np.zeros((len(users), len(papers)))
+        estimations[np.ix_(known_users, known_papers)] = inner_products(
+            self._profiles[users[known_users]], self._vectors[papers[known_papers]]
+        )
+        return estimations
+
+    @override
+    def get_similar_papers(
+        self, paper_ids: Sequence[int], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if not self.is_loaded:
+            self.load()
+        return search_similar(self._papers, self._vectors, paper_ids, k)
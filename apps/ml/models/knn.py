@@ -0,0 +1,271 @@
+"""Proxies to manage item-based nearest neighbours models."""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, ClassVar, Final, override
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from apps.ml.factors import UNKNOWN, lookup
+from apps.ml.mappings import PapersMapping
+from apps.ml.models.base import Model
+from apps.ml.models.mixins import ArraysArtifactMixin
+from apps.ml.sparse import csr_from_arrays, csr_to_arrays, get_ratings_matrix
+
+MAX_SIMILARITIES_PER_BLOCK: Final[int] = 10_000_000
+"""Upper bound for the size of the similarities matrices built when training."""
+
+
+def get_neighbours(ratings: sparse.csr_matrix, n_neighbours: int) -> sparse.csr_matrix:
+    """Compute the most similar columns of each column of a ratings matrix.
+
+    The similarity is the cosine of the columns. They are compared in blocks whose
+    size is bounded by `MAX_SIMILARITIES_PER_BLOCK`, and only the `n_neighbours`
+    most similar ones with a positive similarity are kept.
+
+    Args:
+        ratings (scipy.sparse.csr_matrix): The users by papers ratings matrix.
+        n_neighbours (int): The number of neighbours of each paper.
+
+    Returns:
+        scipy.sparse.csr_matrix: A papers by papers matrix, with the similarities
+        of the neighbours of each paper on its row.
+    """
+    n_papers = ratings.shape[1]
+    norms = np.sqrt(np.asarray(ratings.multiply(ratings).sum(axis=0)).ravel())
+    normalized = (ratings @ sparse.diags(1 / np.where(norms > 0, norms, 1))).tocsc()
+    n_neighbours = min(n_neighbours, n_papers - 1)
+
+    rows, columns, similarities = [], [], []
+    block_size = max(1, MAX_SIMILARITIES_PER_BLOCK // max(n_papers, 1))
+    for start in range(0, n_papers if n_neighbours > 0 else 0, block_size):
+        block = np.arange(start, min(start + block_size, n_papers))
+        scores = (normalized[:, block].T @ normalized).toarray()
+        scores[np.arange(len(block)), block] = 0
+        selected = np.argpartition(-scores, n_neighbours - 1, axis=1)[:, :n_neighbours]
+        selected_scores = np.take_along_axis(scores, selected, axis=1)
+        positive = selected_scores > 0
+        rows.append(np.broadcast_to(block[:, np.newaxis], selected.shape)[positive])
+        columns.append(selected[positive])
+        similarities.append(selected_scores[positive])
+
+    if not rows:
+        return sparse.csr_matrix((n_papers, n_papers))
+    return sparse.csr_matrix(
+        (np.concatenate(similarities), (np.concatenate(rows), np.concatenate(columns))),
+        shape=(n_papers, n_papers),
+    )
+
+
+class ItemKNNModel(ArraysArtifactMixin, Model):
+    """Model for storing item-based nearest neighbours models.
+
+    The neighbours of each paper are the papers with the most similar ratings,
+    precomputed when training. The rating of a paper is predicted as the user mean,
+    plus the mean of the user deviations on its neighbours, weighted by their
+    similarities.
+    """
+
+    _users: np.ndarray | None = None
+    _papers: np.ndarray | None = None
+    _ratings: sparse.csr_matrix | None = None
+    _users_means: np.ndarray | None = None
+    _neighbours: sparse.csr_matrix | None = None
+    _global_mean: float = 0.0
+    _rating_scale: tuple[float, float] = (-np.inf, np.inf)
+
+    supports_similar_papers = True
+
+    DEFAULT_PARAMS: ClassVar[dict[str, Any]] = {
+        "n_neighbours": 40,
+    }
+
+    class Meta:
+        proxy = True
+        verbose_name = "Item kNN Model"
+        verbose_name_plural = "Item kNN Models"
+
+    @override
+    def __init__(self, *args, **kwargs) -> None:
+        """Initializes the item kNN model by setting defaults."""
+        super().__init__(*args, **kwargs)
+        self.type = Model.TypeChoices.KNN
+        if not self.params:
+            self.params = self.DEFAULT_PARAMS
+
+    @property
+    @override
+    def is_loaded(self) -> bool:
+        return self._neighbours is not None
+
+    @override
+    def train(self, df: pd.DataFrame) -> None:
+        """Computes the neighbours of the papers on the whole dataset.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+        """
+        training_df = self.prepare_for_training(df)
+        params = {**self.DEFAULT_PARAMS, **(self.params or {})}
+        self._users, self._papers, self._ratings = get_ratings_matrix(training_df)
+
+        counts = np.diff(self._ratings.indptr)
+        self._users_means = np.asarray(self._ratings.sum(axis=1)).ravel() / np.maximum(
+            counts, 1
+        )
+        self._global_mean = float(training_df["rating"].mean())
+        self._rating_scale = (
+            float(training_df["rating"].min()),
+            float(training_df["rating"].max()),
+        )
+        self._neighbours = get_neighbours(self._ratings, params["n_neighbours"])
+        self._mapping = PapersMapping.from_unsorted(
+            training_df["paper"], training_df["paperId"]
+        )
+        self.trained_until = self.get_watermark(training_df)
+
+    @override
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        if not self.is_loaded:
+            self.load()
+        return {
+            "users": self._users,
+            "papers": self._papers,
+            "users_means": self._users_means,
+            "global_mean": np.float64(self._global_mean),
+            "rating_scale": np.array(self._rating_scale, dtype=np.float64),
+            **csr_to_arrays("ratings", self._ratings),
+            **csr_to_arrays("neighbours", self._neighbours),
+        }
+
+    @override
+    def from_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        lower_bound, higher_bound = arrays["rating_scale"].tolist()
+        self._users = arrays["users"]
+        self._papers = arrays["papers"]
+        self._users_means = arrays["users_means"]
+        self._global_mean = float(arrays["global_mean"])
+        self._rating_scale = (lower_bound, higher_bound)
+        self._ratings = csr_from_arrays("ratings", arrays)
+        self._neighbours = csr_from_arrays("neighbours", arrays)
+
+    def _get_deviations(
+        self, users: np.ndarray
+    ) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """Return the ratings of known users minus their means, and their pattern.
+
+        Args:
+            users (numpy.ndarray): The positions of the users.
+
+        Returns:
+            tuple[scipy.sparse.csr_matrix, scipy.sparse.csr_matrix]: The deviations
+            of the users ratings, and a matrix with ones where they rated a paper.
+        """
+        ratings = self._ratings[users]
+        counts = np.diff(ratings.indptr)
+        deviations = sparse.csr_matrix(
+            (
+                ratings.data - np.repeat(self._users_means[users], counts),
+                ratings.indices,
+                ratings.indptr,
+            ),
+            shape=ratings.shape,
+        )
+        pattern = sparse.csr_matrix(
+            (np.ones(len(ratings.data)), ratings.indices, ratings.indptr),
+            shape=ratings.shape,
+        )
+        return deviations, pattern
+
+    def _estimate(
+        self, users: np.ndarray, numerators: np.ndarray, denominators: np.ndarray
+    ) -> np.ndarray:
+        """Combine the weighted deviations of known users into clipped ratings."""
+        means = self._users_means[users]
+        if numerators.ndim > 1:
+            means = means[:, np.newaxis]
+        deviations = np.divide(
+            numerators,
+            denominators,
+            out=np.zeros_like(numerators, dtype=np.float64),
+            where=denominators > 0,
+        )
+        lower_bound, higher_bound = self._rating_scale
+        return np.clip(means + deviations, lower_bound, higher_bound)
+
+    @override
+    def predict(self, user_id: int, paper_id: int) -> float:
+        return float(self.predict_many([user_id], [paper_id])[0])
+
+    @override
+    def predict_many(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        if len(user_ids) != len(paper_ids):
+            msg = "The users and papers sequences must have the same length."
+            raise ValueError(msg)
+        if not self.is_loaded:
+            self.load()
+
+        users, papers = lookup(self._users, user_ids), lookup(self._papers, paper_ids)
+        known_users = users != UNKNOWN
+        known = known_users & (papers != UNKNOWN)
+
+        estimations = np.full(len(users), self._global_mean)
+        estimations[known_users] = self._users_means[users[known_users]]
+        if known.any():
+            neighbours = self._neighbours[papers[known]]
+            deviations, pattern = self._get_deviations(users[known])
+            numerators = np.asarray(neighbours.multiply(deviations).sum(axis=1))
+            denominators = np.asarray(abs(neighbours).multiply(pattern).sum(axis=1))
+            estimations[known] = self._estimate(
+                users[known], numerators.ravel(), denominators.ravel()
+            )
+        return estimations
+
+    @override
+    def predict_matrix(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        if not self.is_loaded:
+            self.load()
+
+        users, papers = lookup(self._users, user_ids), lookup(self._papers, paper_ids)
+        known_users, known_papers = users != UNKNOWN, papers != UNKNOWN
+
+        estimations = np.full((len(users), len(papers)), self._global_mean)
+        estimations[known_users] = self._users_means[users[known_users]][:, np.newaxis]
+        if known_users.any() and known_papers.any():
+            neighbours = self._neighbours[papers[known_papers]].T
+            deviations, pattern = self._get_deviations(users[known_users])
+            estimations[np.ix_(known_users, known_papers)] = self._estimate(
+                users[known_users],
+                (deviations @ neighbours).toarray(),
+                (pattern @ abs(neighbours)).toarray(),
+            )
+        return estimations
+
+    @override
+    def get_similar_papers(
+        self, paper_ids: Sequence[int], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the precomputed neighbours, so at most `n_neighbours` papers."""
+        if not self.is_loaded:
+            self.load()
+
+        papers = lookup(self._papers, paper_ids)
+        found = np.full((len(papers), k), UNKNOWN)
+        similarities = np.full((len(papers), k), -np.inf)
+
+        indptr, indices, data = (
+            self._neighbours.indptr,
+            self._neighbours.indices,
+            self._neighbours.data,
+        )
+        for row in np.flatnonzero(papers != UNKNOWN):
+            start, end = indptr[papers[row]], indptr[papers[row] + 1]
+            order = np.argsort(-data[start:end], kind="stable")[:k]
+            found[row, : len(order)] = self._papers[indices[start:end][order]]
+            similarities[row, : len(order)] = data[start:end][order]
+        return found, similarities
@@ -0,0 +1,149 @@
+"""Behaviours shared by the models stored as arrays artifacts."""
+
+import tempfile
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.core.files import File
+
+from apps.ml.artifacts import ARTIFACT_SUFFIX, open_arrays, write_arrays
+from apps.ml.factors import LatentFactors
+from apps.ml.indexes import IVFIndex
+from apps.ml.mappings import PapersMapping
+from apps.ml.ranking import search_similar
+from apps.ml.sparse import normalize_rows
+
+
+class ArraysArtifactMixin:
+    """Persists a model as a memory-mapped arrays artifact, with its papers mapping.
+
+    Models return their arrays with `to_arrays`, restore them with `from_arrays`
+    and tell if they were trained or loaded with `is_loaded`.
+    """
+
+    _mapping: PapersMapping | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """If the model arrays are in memory, trained or loaded."""
+        raise NotImplementedError
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Return the model as a mapping of arrays, with no papers mapping."""
+        raise NotImplementedError
+
+    def from_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        """Restore the model from the arrays returned by `to_arrays`."""
+        raise NotImplementedError
+
+    def get_papers_mapping(self) -> PapersMapping | None:
+        if not self.is_loaded:
+            self.load()
+        return self._mapping
+
+    def get_name_for_file(self) -> str:
+        """Return the name for the model file."""
+        return f"model-{self.id}{ARTIFACT_SUFFIX}"
+
+    def persist(self) -> None:
+        arrays = self.to_arrays()
+        if self._mapping is not None:
+            arrays.update(self._mapping.to_arrays())
+        with tempfile.NamedTemporaryFile("rb+") as temp:
+            write_arrays(temp, arrays)
+            temp.seek(0)
+            self.file.save(
+                self.get_name_for_file(),
+                File(temp),
+                save=True,
+            )
+
+    def load(self) -> None:
+        if not self.file or not self.file.storage.exists(self.file.name):
+            msg = "No model file found."
+            raise ValueError(msg)
+
+        arrays = open_arrays(self.file, str(self.id))
+        self.from_arrays(arrays)
+        if "mapping_ids" in arrays:
+            self._mapping = PapersMapping.from_arrays(arrays)
+
+
+class LatentFactorsMixin(ArraysArtifactMixin):
+    """Scores and indexes the papers with the latent factors of a model."""
+
+    _factors: LatentFactors | None = None
+
+    supports_similar_papers = True
+
+    @property
+    def factors(self) -> LatentFactors:
+        """The model latent factors, loaded on first use."""
+        if self._factors is None:
+            self.load()
+        return self._factors  # type: ignore[return-value]
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._factors is not None
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return self.factors.to_arrays()
+
+    def from_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self._factors = LatentFactors.from_arrays(arrays)
+
+    def predict(self, user_id: int, paper_id: int) -> float:
+        return float(self.predict_many([user_id], [paper_id])[0])
+
+    def predict_many(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        if len(user_ids) != len(paper_ids):
+            msg = "The users and papers sequences must have the same length."
+            raise ValueError(msg)
+        return self.factors.predict_many(user_ids, paper_ids)
+
+    def predict_matrix(
+        self, user_ids: Sequence[int], paper_ids: Sequence[int]
+    ) -> np.ndarray:
+        return self.factors.predict_matrix(user_ids, paper_ids)
+
+    def build_index(self, min_papers: int | None = None) -> None:
+        factors = self.factors
+        if min_papers is None:
+            min_papers = settings.ML_INDEX_MIN_PAPERS
+        if len(factors.papers) < min_papers:
+            return
+
+        self._index = IVFIndex.build(factors.papers, factors.get_papers_vectors())
+        with tempfile.NamedTemporaryFile("rb+") as temp:
+            self._index.save(temp)
+            temp.seek(0)
+            self.index_file.save("index.npz", File(temp), save=True)
+
+    def search(
+        self, user_ids: Sequence[int], k: int, *, n_probe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if (index := self.get_index()) is None:
+            msg = "The model has no index."
+            raise ValueError(msg)
+
+        factors = self.factors
+        papers_ids, scores = index.search(
+            factors.get_users_vectors(user_ids),
+            k,
+            n_probe=n_probe or settings.ML_INDEX_N_PROBE,
+        )
+        scores += factors.get_users_offsets(user_ids)[:, np.newaxis]
+        return papers_ids, np.where(np.isfinite(scores), factors.clip(scores), scores)
+
+    def get_similar_papers(
+        self, paper_ids: Sequence[int], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search the papers whose factors have the highest cosines, biases aside."""
+        factors = self.factors
+        return search_similar(
+            factors.papers, normalize_rows(np.asarray(factors.qi)), paper_ids, k
+        )
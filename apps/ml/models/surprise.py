@@ -1,23 +1,58 @@
 """Proxies to manage models trained using the scikit-surprise library."""
 
+import itertools
+import pathlib
 import pickle
-import tempfile
-from typing import Any, ClassVar, override
+import time
+from typing import Any, ClassVar, Literal, override
 
+import numpy as np
 import pandas as pd
-from django.core.files import File
-from surprise import SVD, Dataset, Reader
-from surprise.accuracy import rmse
-from surprise.model_selection import cross_validate
+from django.conf import settings
+from joblib import Parallel, delayed
+from surprise import SVD, Dataset, Reader, Trainset
+from surprise.model_selection import KFold
 
+from apps.ml.artifacts import ARTIFACT_SUFFIX
+from apps.ml.evaluation import get_accuracy_metrics
+from apps.ml.factors import UNKNOWN, LatentFactors
+from apps.ml.mappings import PapersMapping
 from apps.ml.models.base import Model
+from apps.ml.models.mixins import LatentFactorsMixin
 
 
-class SVDModel(Model):
+def _cross_validate_fold(
+    params: dict[str, Any], trainset: Trainset, testset: list[tuple]
+) -> dict[str, float]:
+    """Fit a SVD on a fold trainset, and evaluate it on the fold testset."""
+    start = time.perf_counter()
+    algo = SVD(**params)
+    algo.fit(trainset)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    users, papers, ratings = zip(*testset, strict=True)
+    metrics = get_accuracy_metrics(
+        SVDModel._get_factors(algo).predict_many(users, papers),  # noqa: SLF001
+        ratings,
+    )
+    return {**metrics, "fit_time": fit_time, "test_time": time.perf_counter() - start}
+
+
+class SVDModel(LatentFactorsMixin, Model):
     """Model for storing SVD models."""
 
     _model: SVD | None = None
 
+    supports_warm_start = True
+    WARM_START_EPOCHS: ClassVar[int] = 5
+    CV_FOLDS: ClassVar[int] = 4
+    PARAM_GRID: ClassVar[dict[str, list[Any]]] = {
+        "n_factors": [50, 100, 200],
+        "lr_all": [0.002, 0.005, 0.01],
+        "reg_all": [0.02, 0.05, 0.1],
+    }
+
     DEFAULT_PARAMS: ClassVar[dict[str, Any]] = {
         "n_epochs": 20,
         "lr_all": 0.005,
@@ -38,22 +73,6 @@ class SVDModel(Model):
         if not self.params:
             self.params = self.DEFAULT_PARAMS
 
-    @override
-    def prepare_for_training(self, df: pd.DataFrame) -> pd.DataFrame:
-        training_df = df.copy().dropna(subset=["userId", "paperId", "rating"])
-
-        for column, column_type in [
-            ("userId", int),
-            ("paperId", int),
-            ("paperIndex", int),
-            ("rating", float),
-        ]:
-            training_df[column] = training_df[column].astype(column_type)
-
-        return training_df.rename(
-            columns={"userId": "user", "paperIndex": "paper", "rating": "rating"}
-        )
-
     @staticmethod
     def _get_data_loader(dataset_as_df: pd.DataFrame):
         """Loads a dataset into a Surprise DatasetAutoFolds object.
@@ -69,57 +88,232 @@ class SVDModel(Model):
             dataset.DatasetAutoFolds: The loaded dataset.
         """
         reader = Reader(
-            rating_scale=(dataset_as_df["rating"].max(), dataset_as_df["rating"].min())
+            rating_scale=(dataset_as_df["rating"].min(), dataset_as_df["rating"].max())
         )
         return Dataset.load_from_df(dataset_as_df[["user", "paper", "rating"]], reader)
 
-    @override
-    def persist(self) -> None:
-        with tempfile.NamedTemporaryFile("rb+") as temp:
-            pickle.dump(self.model, temp)
-            self.file.save(
-                self.get_name_for_file(),
-                File(temp),
-                save=True,
-            )
-
-    def get_accuracy(self) -> float | None:
-        """Return the RMSE based accuracy of the model."""
-        if not self.model:
-            return None
-        return rmse(self.model.test(self.model.trainset.build_testset()))
-
-    def get_name_for_file(self) -> str | None:
-        """Return the name for the model file."""
-        if not self.model:
-            return None
-        return f"model-{100 * int(self.get_accuracy() or 0)}.pkl"
+    @staticmethod
+    def _get_factors(algo: SVD) -> LatentFactors:
+        """Extract the latent factors of a fitted Surprise SVD algorithm."""
+        trainset = algo.trainset
+        return LatentFactors.from_unsorted(
+            users=[trainset.to_raw_uid(u) for u in range(trainset.n_users)],
+            papers=[trainset.to_raw_iid(i) for i in range(trainset.n_items)],
+            pu=algo.pu,
+            qi=algo.qi,
+            bu=algo.bu,
+            bi=algo.bi,
+            global_mean=trainset.global_mean,
+            rating_scale=trainset.rating_scale,
+            biased=algo.biased,
+        )
+
+    def _cross_validate(
+        self, data: Dataset, candidates: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Cross-validate params candidates on the same folds.
+
+        The folds of all the candidates are evaluated in parallel by
+        `ML_TRAINING_N_JOBS` processes, with vectorized predictions.
+
+        Args:
+            data (Dataset): The training dataset.
+            candidates (list[dict[str, Any]]): The params to evaluate.
+
+        Returns:
+            list[dict[str, Any]]: For each candidate, its params, the metrics of
+            each fold, as `test_rmse`, and their means, as `rmse`.
+        """
+        folds = list(
+            KFold(
+                n_splits=self.CV_FOLDS,
+                random_state=(self.params or {}).get("random_state"),
+            ).split(data)
+        )
+        scores = Parallel(n_jobs=settings.ML_TRAINING_N_JOBS)(
+            delayed(_cross_validate_fold)(params, trainset, testset)
+            for params in candidates
+            for trainset, testset in folds
+        )
+
+        results = []
+        for position, params in enumerate(candidates):
+            folds_scores = scores[position * len(folds) : (position + 1) * len(folds)]
+            result: dict[str, Any] = {"params": params}
+            for name in ("rmse", "mae", "fit_time", "test_time"):
+                values = [fold_scores[name] for fold_scores in folds_scores]
+                key = name if name.endswith("time") else f"test_{name}"
+                result[key] = values
+            result["rmse"] = float(np.mean(result["test_rmse"]))
+            result["mae"] = float(np.mean(result["test_mae"]))
+            results.append(result)
+        return results
 
     @override
     def train(self, df: pd.DataFrame) -> None:
+        """Cross-validates the model, then fits it on the whole dataset.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+        """
         training_df = self.prepare_for_training(df)
         data = self._get_data_loader(training_df)
 
-        self.model = SVD(**self.params)
-        self.validation_results = cross_validate(
-            self.model, data, measures=["RMSE", "MAE"], cv=4, verbose=True
-        )
+        [result] = self._cross_validate(data, [self.params])
+        del result["params"]
+        self.validation_results = result
+        self._fit(training_df, data)
+
+    @override
+    def tune(
+        self,
+        df: pd.DataFrame,
+        param_grid: dict[str, list[Any]] | None = None,
+        *,
+        method: Literal["grid", "random"] = "grid",
+        n_iter: int = 10,
+    ) -> None:
+        """Searches the best params by cross-validation, then fits the model.
 
-        trainset = data.build_full_trainset()
-        self.model.fit(trainset)
+        The params with the lowest RMSE are kept, along with the ones not
+        searched. The random search evaluates `n_iter` distinct combinations.
+
+        Args:
+            df (pandas.DataFrame): The dataset to train the model on.
+            param_grid (dict[str, list[Any]] | None, optional): The values to
+            search for each param. Defaults to `PARAM_GRID`.
+            method (Literal["grid", "random"], optional): If all the combinations
+            are evaluated, or `n_iter` random ones. Defaults to "grid".
+            n_iter (int, optional): The number of combinations evaluated by the
+            random search. Defaults to 10.
+        """
+        training_df = self.prepare_for_training(df)
+        data = self._get_data_loader(training_df)
+
+        param_grid = param_grid or self.PARAM_GRID
+        fixed_params = {
+            name: value
+            for name, value in (self.params or {}).items()
+            if name not in param_grid
+        }
+        candidates = [
+            {**fixed_params, **dict(zip(param_grid, values, strict=True))}
+            for values in itertools.product(*param_grid.values())
+        ]
+        if method == "random" and n_iter < len(candidates):
+            rng = np.random.default_rng(fixed_params.get("random_state"))
+            candidates = [
+                candidates[position]
+                for position in sorted(
+                    rng.choice(len(candidates), n_iter, replace=False)
+                )
+            ]
+
+        results = self._cross_validate(data, candidates)
+        best = min(results, key=lambda result: result["rmse"])
+        self.params = best["params"]
+        self.validation_results = {
+            "method": method,
+            "rmse": best["rmse"],
+            "mae": best["mae"],
+            "best_params": best["params"],
+            "cv_results": results,
+        }
+        self._fit(training_df, data)
 
     @override
-    def load(self) -> None:
-        if not self.file or not self.file.storage.exists(self.file.name):
-            msg = "No model file found."
-            raise ValueError(msg)
+    def fit(self, df: pd.DataFrame) -> None:
+        training_df = self.prepare_for_training(df)
+        self._fit(training_df, self._get_data_loader(training_df))
 
-        with self.file.open("rb") as f:
-            self._model = pickle.load(f)  # noqa: S301
+    def _fit(self, training_df: pd.DataFrame, data: Dataset) -> None:
+        """Fits the model with its params on the whole training dataset."""
+        self._model = SVD(**self.params)
+        self._model.fit(data.build_full_trainset())
+        self._factors = self._get_factors(self._model)
+        self._mapping = PapersMapping.from_unsorted(
+            training_df["paper"], training_df["paperId"]
+        )
+        self.trained_until = self.get_watermark(training_df)
 
     @override
-    def predict(self, user_id: int, paper_id: int) -> float:
-        if self._model is None:
-            self.load()
+    def train_warm(
+        self, df: pd.DataFrame, previous: Model, n_epochs: int | None = None
+    ) -> None:
+        """Train the model from a previous model, on the reviews created since.
+
+        The previous factors are updated by SGD epochs over the reviews created
+        after its `trained_until` watermark, so the training time depends on the
+        number of new reviews only. The papers keep the indexes of the previous
+        model, and new papers are appended after them.
+
+        Args:
+            df (pandas.DataFrame): The dataset, with the reviews creation times.
+            previous (Model): The trained model to start from.
+            n_epochs (int | None, optional): The number of passes over the new
+            reviews. Defaults to `WARM_START_EPOCHS`.
+
+        Raises:
+            ValueError: If the previous model has no watermark or papers mapping.
+        """
+        mapping = previous.get_papers_mapping()
+        if previous.trained_until is None or mapping is None:
+            msg = "The previous model can not be warm started, train a new one."
+            raise ValueError(msg)
+
+        training_df = self.prepare_for_training(df)
+        delta = training_df[
+            pd.to_datetime(training_df["createdAt"], utc=True) > previous.trained_until
+        ]
+        papers_ids = delta["paperId"].to_numpy()
+
+        # The current papers indexes may have been compacted since
+        papers = mapping.get_indexes(papers_ids)
+        new = papers == UNKNOWN
+        new_papers_ids = np.unique(papers_ids[new])
+        next_index = int(mapping.indexes.max(initial=-1)) + 1
+        papers[new] = next_index + np.searchsorted(new_papers_ids, papers_ids[new])
 
-        return self._model.predict(user_id, paper_id).est  # type: ignore[union-attr]
+        params = {**self.DEFAULT_PARAMS, **(self.params or {})}
+        self._factors = previous.factors.refit(  # type: ignore[attr-defined]
+            delta["user"].to_numpy(),
+            papers,
+            delta["rating"].to_numpy(),
+            n_epochs=n_epochs or self.WARM_START_EPOCHS,
+            lr=params["lr_all"],
+            reg=params["reg_all"],
+            init_mean=params.get("init_mean", 0),
+            init_std_dev=params.get("init_std_dev", 0.1),
+            random_state=params.get("random_state"),
+        )
+        self._mapping = PapersMapping.from_unsorted(
+            np.concatenate(
+                [mapping.indexes, next_index + np.arange(len(new_papers_ids))]
+            ),
+            np.concatenate([mapping.ids, new_papers_ids]),
+        )
+        self.trained_until = max(
+            previous.trained_until,
+            self.get_watermark(delta) or previous.trained_until,
+        )
+        self.validation_results = {
+            "warm_start": {
+                "model": str(previous.pk),
+                "reviews": len(delta),
+                "n_epochs": n_epochs or self.WARM_START_EPOCHS,
+            }
+        }
+
+    @override
+    def load(self) -> None:
+        if (
+            self.file
+            and pathlib.Path(self.file.name).suffix != ARTIFACT_SUFFIX
+            and self.file.storage.exists(self.file.name)
+        ):
+            # Models persisted before the arrays format are pickled Surprise objects
+            with self.file.open("rb") as f:
+                self._model = pickle.load(f)  # noqa: S301
+            self._factors = self._get_factors(self._model)  # type: ignore[arg-type]
+            return
+        super().load()
@@ -0,0 +1,99 @@
+"""Vectorized helpers to rank the papers scored by the models."""
+
+from collections.abc import Sequence
+from typing import Final
+
+import numpy as np
+from scipy import sparse
+
+from apps.ml.factors import UNKNOWN, lookup
+from apps.ml.sparse import inner_products
+
+MAX_SIMILARITIES_PER_BLOCK: Final[int] = 10_000_000
+"""Upper bound for the size of the similarities matrices built when searching."""
+
+
+def top_k(
+    scores: np.ndarray, k: int, mask: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select the `k` highest scores of each row of a scores matrix.
+
+    The selection uses a partial sort (`numpy.argpartition`), so only the selected
+    columns are fully sorted.
+
+    Args:
+        scores (numpy.ndarray): A `(users, papers)` scores matrix.
+        k (int): The number of columns to select for each row.
+        mask (numpy.ndarray | None, optional): A boolean matrix with the same shape
+        as `scores` flagging the columns that must not be selected. Masked columns
+        get a `-inf` score, so they are only returned if a row has less than `k`
+        unmasked columns. Defaults to None.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The columns indexes and the scores of
+        the selection, both with shape `(users, min(k, papers))` and sorted by
+        descending score.
+    """
+    if mask is not None:
+        scores = np.where(mask, -np.inf, scores)
+
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+
+    if k < scores.shape[1]:
+        columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        columns = np.broadcast_to(np.arange(k), scores.shape).copy()
+
+    selected = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-selected, axis=1, kind="stable")
+    return (
+        np.take_along_axis(columns, order, axis=1),
+        np.take_along_axis(selected, order, axis=1),
+    )
+
+
+def search_similar(
+    ids: np.ndarray,
+    vectors: sparse.csr_matrix | np.ndarray,
+    query_ids: Sequence[int],
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Search the rows of a vectors matrix most similar to some of its rows.
+
+    The similarity is the inner product of the vectors, so their cosine when they
+    are normalized. A row is never similar to itself, and the rows are compared in
+    blocks whose size is bounded by `MAX_SIMILARITIES_PER_BLOCK`.
+
+    Args:
+        ids (numpy.ndarray): The sorted raw IDs of the rows.
+        vectors (scipy.sparse.csr_matrix | numpy.ndarray): The vectors, aligned
+        with `ids`.
+        query_ids (Sequence[int]): The raw IDs of the rows to search for.
+        k (int): The number of similar rows to return for each row.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The similar rows IDs and their
+        similarities, both with shape `(len(query_ids), k)` and sorted by descending
+        similarity. Missing rows have `UNKNOWN` IDs and `-inf` similarities.
+    """
+    positions = lookup(ids, query_ids)
+    found = np.full((len(positions), k), UNKNOWN)
+    similarities = np.full((len(positions), k), -np.inf)
+
+    known = np.flatnonzero(positions != UNKNOWN)
+    block_size = max(1, MAX_SIMILARITIES_PER_BLOCK // max(len(ids), 1))
+    for start in range(0, len(known), block_size):
+        rows = known[start : start + block_size]
+        scores = inner_products(vectors[positions[rows]], vectors)
+        itself = np.zeros(scores.shape, dtype=bool)
+        itself[np.arange(len(rows)), positions[rows]] = True
+        columns, selected = top_k(scores, k, mask=itself)
+
+        found[rows, : columns.shape[1]] = np.where(
+            np.isfinite(selected), ids[columns], UNKNOWN
+        )
+        similarities[rows, : columns.shape[1]] = selected
+    return found, similarities
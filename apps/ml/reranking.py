@@ -0,0 +1,153 @@
+"""Vectorized re-ranking of the papers candidates scored by the models."""
+
+from typing import TypedDict
+
+import numpy as np
+from scipy import sparse
+
+from apps.ml.sparse import inner_products
+
+
+class RerankingWeights(TypedDict):
+    """Weights of the scores blended to re-rank the candidates."""
+
+    model: float
+    popularity: float
+    recency: float
+    diversity: float
+
+
+def normalize_scores(scores: np.ndarray) -> np.ndarray:
+    """Scale the finite scores of each row of a scores matrix to `[0, 1]`.
+
+    The rows whose finite scores are all equal get ones, and the non-finite scores
+    become zeros.
+    """
+    finite = np.isfinite(scores)
+    low = np.min(np.where(finite, scores, np.inf), axis=1, keepdims=True)
+    high = np.max(np.where(finite, scores, -np.inf), axis=1, keepdims=True)
+    span = np.where(np.isfinite(high - low), high - low, 0)
+    normalized = np.divide(
+        np.where(finite, scores, 0) - np.where(np.isfinite(low), low, 0),
+        span,
+        out=np.ones(scores.shape),
+        where=span > 0,
+    )
+    return np.where(finite, normalized, 0)
+
+
+def get_recency(ages: np.ndarray, half_life: float) -> np.ndarray:
+    """Return recency scores halving every `half_life`, zero for unknown ages."""
+    known = np.isfinite(ages)
+    return np.where(
+        known, 0.5 ** (np.maximum(np.where(known, ages, 0), 0) / half_life), 0
+    )
+
+
+def get_similarities(vectors: sparse.csr_matrix, positions: np.ndarray) -> np.ndarray:
+    """Compute the similarities of the candidates of each row of a candidates matrix.
+
+    Args:
+        vectors (scipy.sparse.csr_matrix): The normalized vectors of the candidates.
+        positions (numpy.ndarray): A `(rows, candidates)` matrix of the positions
+        of the vectors of each row candidates.
+
+    Returns:
+        numpy.ndarray: A `(rows, candidates, candidates)` matrix of the cosines of
+        the candidates of each row.
+    """
+    return np.stack([inner_products(vectors[row], vectors[row]) for row in positions])
+
+
+def maximal_marginal_relevance(
+    relevance: np.ndarray, similarities: np.ndarray, k: int, diversity: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select `k` relevant but diverse candidates of each row, greedily.
+
+    Each step selects, on all the rows at once, the candidate maximizing
+    `(1 - diversity) * relevance - diversity * similarity`, where the similarity is
+    the highest one with the candidates selected before it (Carbonell and
+    Goldstein, 1998).
+
+    Args:
+        relevance (numpy.ndarray): A `(rows, candidates)` relevance matrix, with
+        `-inf` for missing candidates.
+        similarities (numpy.ndarray): The `(rows, candidates, candidates)`
+        similarities of the candidates of each row.
+        k (int): The number of candidates to select for each row.
+        diversity (float): The weight of the diversity, between 0 and 1.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The columns of the selected candidates
+        and their marginal relevance, both with shape `(rows, min(k, candidates))`
+        and in selection order. Missing candidates have a `-inf` relevance.
+    """
+    n_rows, n_candidates = relevance.shape
+    k = min(k, n_candidates)
+    rows = np.arange(n_rows)
+    columns = np.zeros((n_rows, k), dtype=np.int64)
+    values = np.full((n_rows, k), -np.inf)
+
+    available = np.isfinite(relevance)
+    max_similarities = np.zeros(relevance.shape)
+    for step in range(k):
+        marginal = np.where(
+            available,
+            (1 - diversity) * np.where(available, relevance, 0)
+            - diversity * max_similarities,
+            -np.inf,
+        )
+        columns[:, step] = selected = marginal.argmax(axis=1)
+        values[:, step] = marginal[rows, selected]
+        available[rows, selected] = False
+        max_similarities = np.maximum(max_similarities, similarities[rows, selected])
+    return columns, values
+
+
+def rerank(  # noqa: PLR0913
+    scores: np.ndarray,
+    popularity: np.ndarray,
+    ages: np.ndarray,
+    similarities: np.ndarray,
+    k: int,
+    *,
+    weights: RerankingWeights,
+    half_life: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Re-rank the candidates of each row of a candidates matrix.
+
+    The relevance of a candidate blends its model score and its popularity, both
+    normalized by row, and its recency, then the candidates are selected by
+    maximal marginal relevance.
+
+    Args:
+        scores (numpy.ndarray): A `(rows, candidates)` matrix of the model scores,
+        with `-inf` for missing candidates.
+        popularity (numpy.ndarray): The popularity of the candidates, aligned with
+        `scores`.
+        ages (numpy.ndarray): The ages of the candidates, `nan` if unknown, aligned
+        with `scores`.
+        similarities (numpy.ndarray): The `(rows, candidates, candidates)`
+        similarities of the candidates of each row.
+        k (int): The number of candidates to keep for each row.
+        weights (RerankingWeights): The weights of the scores.
+        half_life (float): The age halving the recency, in the unit of `ages`.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The columns of the kept candidates and
+        their scores, both with shape `(rows, min(k, candidates))`. The scores are
+        non-increasing, so sorting by them keeps the selection order, and are
+        `-inf` for missing candidates.
+    """
+    relevance = (
+        weights["model"] * normalize_scores(scores)
+        + weights["popularity"] * normalize_scores(np.log1p(np.maximum(popularity, 0)))
+        + weights["recency"] * get_recency(ages, half_life)
+    )
+    columns, values = maximal_marginal_relevance(
+        np.where(np.isfinite(scores), relevance, -np.inf),
+        similarities,
+        k,
+        weights["diversity"],
+    )
+    return columns, np.minimum.accumulate(values, axis=1)
@@ -1,18 +1,43 @@
-from typing import Final
+import itertools
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Final, Literal
+from uuid import UUID
 
+import numpy as np
 import pandas as pd
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from django.utils.module_loading import import_string
+from scipy import sparse
 
 from apps.exports.models import Export
+from apps.ml.cache import models_cache
+from apps.ml.factors import UNKNOWN, lookup, to_ids_array
+from apps.ml.mappings import PapersMapping
 from apps.ml.models import Model
+from apps.ml.ranking import top_k
+from apps.ml.reranking import RerankingWeights, get_similarities, rerank
+from apps.ml.sparse import normalize_rows
 from apps.papers.models import Paper
 from apps.reviews.models import Review
 
 MODEL_TYPE_TO_CLASS: Final[dict[Model.TypeChoices, str]] = {
     Model.TypeChoices.SVD: "SVDModel",
+    Model.TypeChoices.ALS: "ALSModel",
+    Model.TypeChoices.KNN: "ItemKNNModel",
+    Model.TypeChoices.TFIDF: "TFIDFModel",
 }
 
+MAX_SCORES_PER_BLOCK: Final[int] = 10_000_000
+"""Upper bound for the size of the scores matrices built when recommending."""
+
+INDEX_SEARCH_BATCH_SIZE: Final[int] = 1000
+"""Number of users searched at a time on the models indexes."""
+
+RERANKING_BATCH_SIZE: Final[int] = 100
+"""Number of users whose candidates are re-ranked at a time."""
+
 
 def _import_model_class(model_type: Model.TypeChoices) -> type[Model]:
     """Imports the model class for the provided type.
@@ -29,8 +54,38 @@ def _import_model_class(model_type: Model.TypeChoices) -> type[Model]:
     return import_string(f"apps.ml.models.{MODEL_TYPE_TO_CLASS[model_type]}")
 
 
-def import_paper_reviews_dataset() -> pd.DataFrame:
-    """Imports the papers ratings dataset and joins it with the papers dataset."""
+def read_export(export: Export) -> pd.DataFrame:
+    """Reads an exported dataset.
+
+    Parquet files are read with `pyarrow`, keeping the exported types, and
+    converted to pandas without copying the columns whenever possible.
+
+    Args:
+        export (Export): The export to read.
+
+    Returns:
+        pandas.DataFrame: The dataset.
+    """
+    if export.file_format == Export.FormatChoices.PARQUET:
+        import pyarrow.parquet as pq
+
+        with export.file.open("rb") as f:
+            return pq.read_table(f).to_pandas(self_destruct=True)
+
+    with export.file.open("rb") as f:
+        return pd.read_csv(f)
+
+
+def import_paper_reviews_dataset(*, all_papers: bool = False) -> pd.DataFrame:
+    """Imports the papers ratings dataset and joins it with the papers dataset.
+
+    Args:
+        all_papers (bool, optional): If the papers with no reviews are kept, with
+        empty reviews columns. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: The reviews joined with their papers.
+    """
     papers_latest_export: Export | None = Export.objects.get_latest_for_content_type(
         ContentType.objects.get_for_model(Paper)
     )
@@ -49,16 +104,22 @@ def import_paper_reviews_dataset() -> pd.DataFrame:
         msg = "No ratings dataset found."
         raise ValueError(msg)
 
-    papers_df = pd.read_csv(papers_latest_export.file)
-    reviews_df = pd.read_csv(reviews_latest_export.file)
+    papers_df = read_export(papers_latest_export).set_index("paperId")
+    reviews_df = read_export(reviews_latest_export)
 
-    return reviews_df.copy().join(
-        papers_df, on="paperId", rsuffix="_paper_df", how="inner"
-    )
+    if all_papers:
+        return reviews_df.join(
+            papers_df, on="paperId", rsuffix="_paper_df", how="right"
+        ).reset_index(drop=True)
+    return reviews_df.join(papers_df, on="paperId", rsuffix="_paper_df", how="inner")
 
 
 def train_and_export_model(
-    model_type: Model.TypeChoices, params: dict | None = None
+    model_type: Model.TypeChoices,
+    params: dict | None = None,
+    *,
+    warm_start: bool = False,
+    search: Literal["grid", "random"] | None = None,
 ) -> Model:
     """Trains a model and exports it.
 
@@ -67,30 +128,435 @@ def train_and_export_model(
         params (dict | None, optional): The training params.
         Each model has its own set of params.
         If not provided, the default params will be used.
+        warm_start (bool, optional): If the model is trained from the latest model
+        of the type, on the reviews created since, when the type supports it and
+        the latest model has a watermark. Defaults to False.
+        search (Literal["grid", "random"] | None, optional): If set, the params
+        are searched by cross-validation with this method, starting from `params`.
+        Ignored by warm starts. Defaults to None.
 
     Returns:
         Model: The trained model.
     """
-    reviews_df = import_paper_reviews_dataset()
-
     model: Model = _import_model_class(model_type)(params=params)
-    model.train(reviews_df)
+    reviews_df = import_paper_reviews_dataset(all_papers=model.requires_all_papers)
+
+    previous = load_latest_model(model_type) if warm_start else None
+    if (
+        model.supports_warm_start
+        and previous is not None
+        and previous.trained_until is not None
+        and previous.get_papers_mapping() is not None
+    ):
+        model.train_warm(reviews_df, previous)
+    elif search:
+        model.tune(reviews_df, method=search)
+    else:
+        model.train(reviews_df)
+    # Published as the latest of its type only once all its artifacts are saved
+    model.latest = False
     model.persist()
     model.save()
+    model.build_index()
+    if model_type == settings.RELATED_PAPERS_MODEL_TYPE:
+        build_related_papers(model)
+    model.latest = True
+    model.save(update_fields=["latest"])
 
     return model
 
 
-def load_latest_model(model_type: Model.TypeChoices) -> Model:
+def load_latest_model(model_type: Model.TypeChoices) -> Model | None:
     """Loads the latest model of the provided type.
 
+    The loaded models are kept in the process `models_cache`, so only the ID of the
+    latest model is queried when it was already loaded. Its index, if any, is only
+    loaded when first searched.
+
+    Args:
+        model_type (Model.TypeChoices): The type of the model to load.
+
+    Returns:
+        Model | None: The loaded model, if there is one.
+    """
+    model_class: type[Model] = _import_model_class(model_type)
+    model_id = model_class.objects.get_latest_id_for_type(model_type)
+    if model_id is None:
+        return None
+    return load_model(model_type, model_id)
+
+
+def load_model(model_type: Model.TypeChoices, model_id: UUID) -> Model:
+    """Loads a model of the provided type by its ID.
+
+    The loaded models are kept in the process `models_cache`, as by
+    `load_latest_model`.
+
     Args:
         model_type (Model.TypeChoices): The type of the model to load.
+        model_id (UUID): The ID of the model.
 
     Returns:
         Model: The loaded model.
     """
     model_class: type[Model] = _import_model_class(model_type)
-    model: Model = model_class.objects.get_latest_for_type(model_type)
-    model.load()
-    return model
+
+    def load(pk) -> Model:
+        model: Model = model_class.objects.get(pk=pk)
+        model.load()
+        return model
+
+    return models_cache.get_or_load(model_id, load)
+
+
+def get_reviewed_papers(users_ids: Sequence[int]) -> dict[int, np.ndarray]:
+    """Return the IDs of the papers each user has already reviewed.
+
+    The reviews of all the users are loaded by a single query, sorted by user.
+
+    Args:
+        users_ids (Sequence[int]): The users IDs.
+
+    Returns:
+        dict[int, numpy.ndarray]: The sorted reviewed papers IDs of each user.
+    """
+    pairs = np.array(
+        Review.objects.active()
+        .filter(user_id__in=users_ids)
+        .order_by("user_id", "paper_id")
+        .values_list("user_id", "paper_id"),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    users, starts = np.unique(pairs[:, 0], return_index=True)
+
+    reviewed = {user_id: np.empty(0, dtype=np.int64) for user_id in users_ids}
+    if len(pairs):
+        reviewed.update(
+            zip(users.tolist(), np.split(pairs[:, 1], starts[1:]), strict=True)
+        )
+    return reviewed
+
+
+def get_reviewed_papers_mask(
+    users_ids: Sequence[int], papers_ids: Sequence[int]
+) -> np.ndarray:
+    """Flag the papers each user has already reviewed.
+
+    Args:
+        users_ids (Sequence[int]): The users IDs.
+        papers_ids (Sequence[int]): The papers IDs.
+
+    Returns:
+        numpy.ndarray: A `(len(users_ids), len(papers_ids))` boolean matrix.
+    """
+    mask = np.zeros((len(users_ids), len(papers_ids)), dtype=bool)
+    if not len(users_ids):
+        return mask
+
+    reviewed = get_reviewed_papers(users_ids)
+    papers = to_ids_array(papers_ids)
+    order = np.argsort(papers, kind="stable")
+    rows = np.repeat(
+        np.arange(len(users_ids)), [len(reviewed[user_id]) for user_id in users_ids]
+    )
+    columns = lookup(
+        papers[order], np.concatenate([reviewed[user_id] for user_id in users_ids])
+    )
+    known = columns != UNKNOWN
+    mask[rows[known], order[columns[known]]] = True
+    return mask
+
+
+def get_papers_mapping(
+    model: Model, papers_ids: Sequence[int] | None = None
+) -> PapersMapping:
+    """Return the papers IDs of the embedding indexes of a model.
+
+    The deleted papers are tombstoned. Models that do not store their mapping are
+    mapped with the current papers indexes.
+
+    Args:
+        model (Model): The model.
+        papers_ids (Sequence[int] | None, optional): The IDs of all the existing
+        papers. Defaults to querying them.
+
+    Returns:
+        PapersMapping: The mapping of the existing papers.
+    """
+    if (mapping := model.get_papers_mapping()) is None:
+        indexes, ids = [], []
+        for paper_index, paper_id in (
+            Paper.objects.filter(index__isnull=False)
+            .values_list("index", "id")
+            .iterator()
+        ):
+            indexes.append(paper_index)
+            ids.append(paper_id)
+        return PapersMapping.from_unsorted(indexes, ids)
+
+    if papers_ids is None:
+        papers_ids = np.fromiter(
+            Paper.objects.values_list("id", flat=True).iterator(), np.int64
+        )
+    return mapping.without_deleted(papers_ids)
+
+
+def _recommend_papers_from_index(
+    model: Model, users_ids: Sequence[int], k: int, batch_size: int
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Retrieves the recommendations of `recommend_papers` with the model index.
+
+    The search retrieves enough extra papers to make up for the reviewed papers and
+    the deleted ones, which are filtered out after it.
+    """
+    mapping = get_papers_mapping(model)
+    deleted = int(np.count_nonzero(mapping.deleted))
+    for start in range(0, len(users_ids), batch_size):
+        users_block = list(users_ids[start : start + batch_size])
+        reviewed = get_reviewed_papers(users_block)
+        found, scores = model.search(
+            users_block, k + deleted + max(map(len, reviewed.values()), default=0)
+        )
+        found_ids = mapping.get_ids(found.ravel()).reshape(found.shape)
+        for row, user_id in enumerate(users_block):
+            kept = (
+                (found_ids[row] != UNKNOWN)
+                & np.isfinite(scores[row])
+                & ~np.isin(found_ids[row], reviewed[user_id])
+            )
+            yield (
+                user_id,
+                [
+                    (paper_id, float(score))
+                    for paper_id, score in zip(
+                        found_ids[row][kept][:k].tolist(),
+                        scores[row][kept][:k],
+                        strict=True,
+                    )
+                ],
+            )
+
+
+def recommend_papers(
+    model: Model,
+    users_ids: Sequence[int],
+    k: int,
+    *,
+    batch_size: int | None = None,
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Retrieves the `k` best papers not reviewed yet for each user.
+
+    If the model has an index, the papers are searched on it. Otherwise, all the
+    papers in the catalog are scored by the model, in blocks of users whose size is
+    bounded by `MAX_SCORES_PER_BLOCK`.
+
+    Args:
+        model (Model): The model used to score the papers.
+        users_ids (Sequence[int]): The users to recommend papers to.
+        k (int): The number of papers to recommend to each user.
+        batch_size (int | None, optional): The number of users scored at a time.
+        Defaults to the most users that fit in a block.
+
+    Yields:
+        tuple[int, list[tuple[int, float]]]: The user ID and its recommended papers
+        IDs with their scores, best first.
+    """
+    if model.index_file:
+        yield from _recommend_papers_from_index(
+            model, users_ids, k, batch_size or INDEX_SEARCH_BATCH_SIZE
+        )
+        return
+
+    papers_ids = list(Paper.objects.values_list("id", flat=True).iterator())
+    if not papers_ids:
+        return
+    # The models are trained on the papers embedding indexes, not on their IDs
+    papers_indexes = get_papers_mapping(model, papers_ids).get_indexes(papers_ids)
+
+    batch_size = batch_size or max(1, MAX_SCORES_PER_BLOCK // len(papers_ids))
+    for start in range(0, len(users_ids), batch_size):
+        users_block = list(users_ids[start : start + batch_size])
+        columns, scores = top_k(
+            model.predict_matrix(users_block, papers_indexes),
+            k,
+            mask=get_reviewed_papers_mask(users_block, papers_ids),
+        )
+        for row, user_id in enumerate(users_block):
+            yield (
+                user_id,
+                [
+                    (papers_ids[column], float(score))
+                    for column, score in zip(columns[row], scores[row], strict=True)
+                    if np.isfinite(score)
+                ],
+            )
+
+
+def _get_candidates_features(
+    papers_ids: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """Return the popularity, the age in days and the keywords of sorted papers.
+
+    They are followed by those of a missing paper, with no popularity, an unknown
+    age and no keywords, to pad the candidates.
+    """
+    popularity = np.zeros(len(papers_ids) + 1)
+    ages = np.full(len(papers_ids) + 1, np.nan)
+    today = timezone.now().date()
+    for paper_id, score, published in Paper.objects.filter(
+        pk__in=papers_ids.tolist()
+    ).values_list("id", "score", "published"):
+        position = np.searchsorted(papers_ids, paper_id)
+        popularity[position] = score or 0
+        if published is not None:
+            ages[position] = (today - published).days
+
+    rows, columns, keywords_columns = [], [], {}
+    for paper_id, keyword_id in Paper.keywords.through.objects.filter(
+        paper_id__in=papers_ids.tolist()
+    ).values_list("paper_id", "keyword_id"):
+        rows.append(np.searchsorted(papers_ids, paper_id))
+        columns.append(keywords_columns.setdefault(keyword_id, len(keywords_columns)))
+    keywords = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(len(papers_ids) + 1, len(keywords_columns)),
+    )
+    return popularity, ages, normalize_rows(keywords)
+
+
+def _rerank_papers_block(
+    block: Sequence[tuple[int, list[tuple[int, float]]]],
+    k: int,
+    weights: RerankingWeights,
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Re-ranks the candidates of a block of users, as `rerank_papers`."""
+    papers_ids = np.unique(
+        np.fromiter(
+            (paper_id for _, papers in block for paper_id, _ in papers), np.int64
+        )
+    )
+    n_candidates = max((len(papers) for _, papers in block), default=0)
+    positions = np.full((len(block), n_candidates), len(papers_ids))
+    scores = np.full((len(block), n_candidates), -np.inf)
+    for row, (_, papers) in enumerate(block):
+        for column, (paper_id, score) in enumerate(papers):
+            positions[row, column] = np.searchsorted(papers_ids, paper_id)
+            scores[row, column] = score
+
+    popularity, ages, keywords = _get_candidates_features(papers_ids)
+    columns, values = rerank(
+        scores,
+        popularity[positions],
+        ages[positions],
+        get_similarities(keywords, positions),
+        k,
+        weights=weights,
+        half_life=settings.SUGGESTIONS_RECENCY_HALF_LIFE_DAYS,
+    )
+    for row, (user_id, papers) in enumerate(block):
+        yield (
+            user_id,
+            [
+                (papers[column][0], float(value))
+                for column, value in zip(columns[row], values[row], strict=True)
+                if np.isfinite(value)
+            ],
+        )
+
+
+def rerank_papers(
+    recommendations: Iterable[tuple[int, list[tuple[int, float]]]],
+    k: int,
+    *,
+    weights: RerankingWeights | None = None,
+    batch_size: int = RERANKING_BATCH_SIZE,
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Re-ranks the candidates papers of each user, keeping the `k` best ones.
+
+    The model scores are blended with the papers popularity and recency, and the
+    papers are then selected by maximal marginal relevance of their keywords, so
+    the suggestions of a user are not all on the same subjects. The candidates of a
+    block of users are re-ranked at once, with their features fetched in bulk.
+
+    Args:
+        recommendations (Iterable[tuple[int, list[tuple[int, float]]]]): The users
+        IDs and their candidates papers IDs with their scores, as returned by
+        `recommend_papers`.
+        k (int): The number of papers to keep for each user.
+        weights (RerankingWeights | None, optional): The weights of the scores.
+        Defaults to the `SUGGESTIONS_RERANKING_WEIGHTS` setting.
+        batch_size (int, optional): The number of users re-ranked at a time.
+        Defaults to `RERANKING_BATCH_SIZE`.
+
+    Yields:
+        tuple[int, list[tuple[int, float]]]: The user ID and its kept papers IDs
+        with their re-ranked scores, best first.
+    """
+    weights = weights or settings.SUGGESTIONS_RERANKING_WEIGHTS
+    if not (weights["popularity"] or weights["recency"] or weights["diversity"]):
+        # The order of the model scores is kept
+        for user_id, papers in recommendations:
+            yield user_id, papers[:k]
+        return
+
+    for block in itertools.batched(recommendations, batch_size):
+        yield from _rerank_papers_block(block, k, weights)
+
+
+def get_similar_papers(
+    model: Model, papers_ids: Sequence[int], k: int
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Retrieves the `k` papers most similar to each paper, by the model.
+
+    The papers deleted since the model was trained are skipped, and the papers the
+    model was not trained on have no similar papers.
+
+    Args:
+        model (Model): A model that can compare papers.
+        papers_ids (Sequence[int]): The papers IDs.
+        k (int): The number of similar papers to retrieve for each paper.
+
+    Yields:
+        tuple[int, list[tuple[int, float]]]: The paper ID and its similar papers
+        IDs with their similarities, most similar first.
+    """
+    mapping = get_papers_mapping(model)
+    found, similarities = model.get_similar_papers(
+        mapping.get_indexes(papers_ids), k + int(np.count_nonzero(mapping.deleted))
+    )
+    found_ids = mapping.get_ids(found.ravel()).reshape(found.shape)
+    for row, paper_id in enumerate(papers_ids):
+        yield (
+            paper_id,
+            [
+                (similar_id, float(similarity))
+                for similar_id, similarity in zip(
+                    found_ids[row].tolist(), similarities[row], strict=True
+                )
+                if similar_id != UNKNOWN and np.isfinite(similarity)
+            ][:k],
+        )
+
+
+def build_related_papers(model: Model, k: int | None = None) -> None:
+    """Precomputes the papers most similar to each paper, and saves them with a model.
+
+    Only the papers with a positive similarity are related. Models that can not
+    compare papers are skipped.
+
+    Args:
+        model (Model): The model.
+        k (int | None, optional): The number of related papers of each paper.
+        Defaults to the `RELATED_PAPERS_COUNT` setting.
+    """
+    if not model.supports_similar_papers:
+        return
+
+    k = k or settings.RELATED_PAPERS_COUNT
+    mapping = get_papers_mapping(model)
+    papers_ids = np.sort(mapping.ids[~mapping.deleted])
+    related_ids = np.full((len(papers_ids), k), UNKNOWN)
+    for row, (_, similar) in enumerate(get_similar_papers(model, papers_ids, k)):
+        related = [similar_id for similar_id, similarity in similar if similarity > 0]
+        related_ids[row, : len(related)] = related
+    model.save_related_papers(papers_ids, related_ids)
@@ -0,0 +1,7 @@
+from apps.ml.cache import models_cache
+from apps.ml.models import Model
+
+
+def evict_model_from_cache(sender: type[Model], instance: Model, **kwargs):
+    """Drop a model from the process cache when it is changed or deleted."""
+    models_cache.invalidate(instance.pk)
@@ -0,0 +1,76 @@
+"""Sparse matrices of the reviews datasets."""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def get_ratings_matrix(
+    training_df: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """Build the users by papers ratings matrix of a training dataset.
+
+    Args:
+        training_df (pandas.DataFrame): A dataset with the `user`, `paper` and
+        `rating` columns, as returned by `Model.prepare_for_training`.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray, scipy.sparse.csr_matrix]: The users
+        raw IDs and the papers raw IDs, both sorted, and the ratings matrix, whose
+        rows and columns are aligned with them.
+    """
+    users, rows = np.unique(training_df["user"].to_numpy(), return_inverse=True)
+    papers, columns = np.unique(training_df["paper"].to_numpy(), return_inverse=True)
+    ratings = sparse.csr_matrix(
+        (training_df["rating"].to_numpy(dtype=np.float64), (rows, columns)),
+        shape=(len(users), len(papers)),
+    )
+    ratings.sum_duplicates()
+    return users.astype(np.int64), papers.astype(np.int64), ratings
+
+
+def csr_to_arrays(prefix: str, matrix: sparse.csr_matrix) -> dict[str, np.ndarray]:
+    """Return a CSR matrix as a mapping of arrays, with keys starting by `prefix`."""
+    return {
+        f"{prefix}_data": matrix.data,
+        f"{prefix}_indices": matrix.indices,
+        f"{prefix}_indptr": matrix.indptr,
+        f"{prefix}_shape": np.array(matrix.shape, dtype=np.int64),
+    }
+
+
+def csr_from_arrays(prefix: str, arrays: Mapping[str, np.ndarray]) -> sparse.csr_matrix:
+    """Create a CSR matrix from the arrays returned by `csr_to_arrays`.
+
+    The arrays are not copied, so memory-mapped arrays stay shared.
+    """
+    return sparse.csr_matrix(
+        (
+            arrays[f"{prefix}_data"],
+            arrays[f"{prefix}_indices"],
+            arrays[f"{prefix}_indptr"],
+        ),
+        shape=tuple(arrays[f"{prefix}_shape"].tolist()),
+        copy=False,
+    )
+
+
+def normalize_rows(
+    matrix: sparse.csr_matrix | np.ndarray,
+) -> sparse.csr_matrix | np.ndarray:
+    """Scale the rows of a sparse or dense matrix to unit length, except null rows."""
+    if sparse.issparse(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        return (sparse.diags(1 / np.where(norms > 0, norms, 1)) @ matrix).tocsr()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def inner_products(
+    a: sparse.csr_matrix | np.ndarray, b: sparse.csr_matrix | np.ndarray
+) -> np.ndarray:
+    """Return the inner products of the rows of two matrices, as a dense matrix."""
+    products = a @ b.T
+    return products.toarray() if sparse.issparse(products) else np.asarray(products)
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture()
+def reviews_df() -> pd.DataFrame:
+    """Create a small random reviews dataset."""
+    rng = np.random.default_rng(12345)
+    papers_ids = rng.integers(1, 30, size=300)
+    return pd.DataFrame(
+        {
+            "userId": rng.integers(1, 20, size=300),
+            "paperId": papers_ids,
+            "paperIndex": papers_ids - 1,
+            "rating": rng.integers(1, 6, size=300),
+        }
+    ).drop_duplicates(subset=["userId", "paperId"])
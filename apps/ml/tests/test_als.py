@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from apps.ml.models import ALSModel
+from apps.ml.models.als import _least_squares
+
+
+@pytest.fixture()
+def als_model(reviews_df: pd.DataFrame) -> ALSModel:
+    """Train an ALS model on the reviews dataset."""
+    model = ALSModel(
+        params={**ALSModel.DEFAULT_PARAMS, "n_factors": 8, "random_state": 0}
+    )
+    model.train(reviews_df)
+    return model
+
+
+def it_solves_the_weighted_least_squares_of_each_row():
+    rng = np.random.default_rng(0)
+    confidence = sparse.random(6, 8, density=0.4, random_state=0, format="csr") * 5
+    x, y = rng.normal(size=(6, 3)), rng.normal(size=(8, 3))
+
+    solved = _least_squares(confidence, x, y, 0.1, cg_steps=10)
+
+    for row in range(6):
+        c = confidence[row].toarray().ravel()
+        expected = np.linalg.solve(
+            y.T @ y + (y.T * c) @ y + 0.1 * np.eye(3), y.T @ ((c + 1) * (c > 0))
+        )
+        np.testing.assert_allclose(solved[row], expected)
+
+
+class DescribeALSModel:
+    users = [1, 5, 19, 999]
+    papers = [0, 3, 28, 999]
+
+    def it_scores_the_reviewed_papers_higher(
+        self, als_model: ALSModel, reviews_df: pd.DataFrame
+    ):
+        papers = np.arange(29)
+        scores = als_model.predict_matrix([1], papers)[0]
+        reviewed = np.isin(papers, reviews_df.query("userId == 1")["paperIndex"])
+
+        assert scores[reviewed].mean() > scores[~reviewed].mean()
+
+    def it_predicts_pairs_like_the_matrix(self, als_model: ALSModel):
+        matrix = als_model.predict_matrix(self.users, self.papers)
+
+        np.testing.assert_allclose(
+            als_model.predict_many(
+                np.repeat(self.users, len(self.papers)),
+                np.tile(self.papers, len(self.users)),
+            ),
+            matrix.ravel(),
+        )
+        assert not matrix[-1].any()
+        assert not matrix[:, -1].any()
+
+    @pytest.mark.django_db()
+    def it_loads_the_persisted_arrays(self, als_model: ALSModel):
+        als_model.persist()
+
+        loaded = ALSModel.objects.get(pk=als_model.pk)
+        loaded.load()
+
+        assert isinstance(loaded.factors.qi, np.memmap)
+        np.testing.assert_allclose(
+            loaded.predict_matrix(self.users, self.papers),
+            als_model.predict_matrix(self.users, self.papers),
+        )
+
+    @pytest.mark.django_db()
+    def it_searches_the_index_like_the_exact_scorer(self, als_model: ALSModel):
+        als_model.build_index(min_papers=0)
+        index = als_model.get_index()
+        assert index is not None
+        exact = als_model.predict_matrix(self.users, index.ids)
+
+        _, scores = als_model.search(self.users, 5, n_probe=index.n_lists)
+
+        np.testing.assert_allclose(scores, -np.sort(-exact, axis=1)[:, :5])
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from apps.ml.benchmarks import benchmark_models
+from apps.ml.models import ALSModel, ItemKNNModel, SVDModel
+
+
+def it_compares_the_models_on_the_same_split(reviews_df: pd.DataFrame):
+    models = [
+        SVDModel(params={**SVDModel.DEFAULT_PARAMS, "verbose": False}),
+        ALSModel(params={**ALSModel.DEFAULT_PARAMS, "n_factors": 8}),
+        ItemKNNModel(),
+    ]
+
+    results = benchmark_models(models, reviews_df, k=5, random_state=0)
+
+    assert [result["model_type"] for result in results] == ["svd", "als", "knn"]
+    assert results[0]["rmse"] > 0
+    assert results[1]["rmse"] is None
+    for result in results:
+        assert 0 <= result["ndcg"] <= 1
+        assert result["predictions_per_second"] > 0
@@ -0,0 +1,82 @@
+import logging
+import threading
+from uuid import uuid4
+
+from apps.ml.cache import ModelCache
+from apps.ml.models import SVDModel
+
+
+class DescribeModelCache:
+    def it_logs_the_loads_with_the_metrics(self, caplog):
+        cache = ModelCache(maxsize=2)
+        model_id = uuid4()
+
+        with caplog.at_level(logging.INFO, logger="apps.ml.cache"):
+            cache.get_or_load(model_id, lambda pk: SVDModel(id=pk))
+            cache.get_or_load(model_id, lambda pk: SVDModel(id=pk))
+
+        [record] = caplog.records
+        assert str(model_id) in record.getMessage()
+        assert "'misses': 1" in record.getMessage()
+
+    def it_loads_models_only_once(self):
+        cache = ModelCache(maxsize=2)
+        model_id = uuid4()
+        loaded = []
+
+        def load(pk):
+            loaded.append(pk)
+            return SVDModel(id=pk)
+
+        first = cache.get_or_load(model_id, load)
+        second = cache.get_or_load(model_id, load)
+
+        assert first is second
+        assert loaded == [model_id]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def it_serves_cached_models_while_loading_another(self):
+        cache = ModelCache(maxsize=2)
+        cached_id, loading_id = uuid4(), uuid4()
+        cache.get_or_load(cached_id, lambda pk: SVDModel(id=pk))
+        started, release = threading.Event(), threading.Event()
+
+        def load(pk):
+            started.set()
+            release.wait(timeout=5)
+            return SVDModel(id=pk)
+
+        loading = threading.Thread(target=cache.get_or_load, args=(loading_id, load))
+        loading.start()
+        started.wait(timeout=5)
+        try:
+            cached = cache.get_or_load(cached_id, load)
+            assert loading_id not in cache
+        finally:
+            release.set()
+            loading.join()
+
+        assert cached.id == cached_id
+        assert loading_id in cache
+
+    def it_evicts_the_least_recently_used_model(self):
+        cache = ModelCache(maxsize=2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        for model_id in (first, second, first, third):
+            cache.get_or_load(model_id, lambda pk: SVDModel(id=pk))
+
+        assert first in cache
+        assert second not in cache
+        assert third in cache
+        assert cache.stats()["evictions"] == 1
+
+    def it_invalidates_models(self):
+        cache = ModelCache(maxsize=2)
+        model_id = uuid4()
+        cache.get_or_load(model_id, lambda pk: SVDModel(id=pk))
+
+        cache.invalidate(model_id)
+
+        assert len(cache) == 0
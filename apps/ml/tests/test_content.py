@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from apps.ml.factors import UNKNOWN
+from apps.ml.models import TFIDFModel
+
+
+@pytest.fixture()
+def papers_df() -> pd.DataFrame:
+    """Create a dataset of papers on two topics, only two of them reviewed."""
+    papers = pd.DataFrame(
+        {
+            "paperId": [11, 12, 13, 14, 15],
+            "paperIndex": [0, 1, 2, 3, 4],
+            "title": [
+                "Deep learning for image recognition",
+                "Neural networks for image segmentation",
+                "Bayesian statistics in ecology",
+                "Species distribution with Bayesian models",
+                "Shortest paths on graphs",
+            ],
+            "abstract": [
+                "Convolutional neural networks classify images.",
+                "Convolutional networks segment images.",
+                "Priors and posteriors of species counts.",
+                "Posterior sampling of species counts.",
+                "Algorithms for graphs.",
+            ],
+            "keywordNames": [
+                "deep learning, vision",
+                "deep learning, vision",
+                "statistics, ecology",
+                "statistics, ecology",
+                None,
+            ],
+        }
+    )
+    reviews = pd.DataFrame(
+        {"userId": [1, 2], "paperId": [11, 13], "rating": [5, 4]},
+    )
+    return reviews.join(
+        papers.set_index("paperId"), on="paperId", how="right"
+    ).reset_index(drop=True)
+
+
+@pytest.fixture()
+def tfidf_model(papers_df: pd.DataFrame) -> TFIDFModel:
+    """Train a TF-IDF model on the papers dataset."""
+    model = TFIDFModel(params={**TFIDFModel.DEFAULT_PARAMS, "min_df": 1})
+    model.train(papers_df)
+    return model
+
+
+class DescribeTFIDFModel:
+    def it_finds_the_papers_with_similar_texts(self, tfidf_model: TFIDFModel):
+        found, similarities = tfidf_model.get_similar_papers([0, 2, 99], 1)
+
+        assert found.tolist() == [[1], [3], [UNKNOWN]]
+        assert similarities[0, 0] > 0
+        assert similarities[2, 0] == -np.inf
+
+    def it_scores_the_papers_with_no_reviews(self, tfidf_model: TFIDFModel):
+        scores = tfidf_model.predict_matrix([1, 2, 999], [1, 3])
+
+        assert scores[0, 0] > scores[0, 1]
+        assert scores[1, 1] > scores[1, 0]
+        assert not scores[2].any()
+        np.testing.assert_allclose(
+            tfidf_model.predict_many([1, 2, 999], [1, 3, 3]), [*np.diag(scores), 0]
+        )
+
+    def it_reduces_the_vectors_dimension(self, papers_df: pd.DataFrame):
+        model = TFIDFModel(
+            params={
+                **TFIDFModel.DEFAULT_PARAMS,
+                "min_df": 1,
+                "n_components": 2,
+                "random_state": 0,
+            }
+        )
+        model.train(papers_df)
+
+        found, _ = model.get_similar_papers([0, 2], 1)
+
+        assert model._vectors.shape == (5, 2)  # noqa: SLF001
+        assert found.tolist() == [[1], [3]]
+
+    @pytest.mark.django_db()
+    @pytest.mark.parametrize("n_components", [None, 2])
+    def it_loads_the_persisted_arrays(
+        self, papers_df: pd.DataFrame, n_components: int | None
+    ):
+        model = TFIDFModel(
+            params={
+                **TFIDFModel.DEFAULT_PARAMS,
+                "min_df": 1,
+                "n_components": n_components,
+            }
+        )
+        model.train(papers_df)
+        model.persist()
+
+        loaded = TFIDFModel.objects.get(pk=model.pk)
+        loaded.load()
+
+        assert loaded.get_papers_mapping().get_ids([4]).tolist() == [15]
+        np.testing.assert_allclose(
+            loaded.predict_matrix([1, 2], [0, 1, 2, 3, 4]),
+            model.predict_matrix([1, 2], [0, 1, 2, 3, 4]),
+        )
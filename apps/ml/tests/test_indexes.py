@@ -0,0 +1,56 @@
+import io
+
+import numpy as np
+import pytest
+
+from apps.ml.indexes import IVFIndex
+
+
+@pytest.fixture()
+def vectors() -> np.ndarray:
+    """Create random items vectors."""
+    return np.random.default_rng(12345).normal(size=(500, 8))
+
+
+@pytest.fixture()
+def index(vectors: np.ndarray) -> IVFIndex:
+    """Build an index over the items vectors."""
+    return IVFIndex.build(np.arange(100, 100 + len(vectors)), vectors, n_lists=10)
+
+
+class DescribeIVFIndex:
+    def it_groups_all_items_in_lists(self, index: IVFIndex, vectors: np.ndarray):
+        assert len(index) == len(vectors)
+        assert index.offsets[0] == 0
+        assert index.offsets[-1] == len(vectors)
+        assert sorted(index.ids.tolist()) == list(range(100, 100 + len(vectors)))
+
+    def it_finds_the_exact_top_k_when_scanning_all_lists(
+        self, index: IVFIndex, vectors: np.ndarray
+    ):
+        queries = np.random.default_rng(1).normal(size=(5, 8))
+        expected = 100 + np.argsort(-(queries @ vectors.T), axis=1)[:, :10]
+
+        found, scores = index.search(queries, 10, n_probe=index.n_lists)
+
+        np.testing.assert_array_equal(found, expected)
+        assert (np.diff(scores, axis=1) <= 0).all()
+
+    def it_pads_the_results_when_there_are_not_enough_items(self):
+        index = IVFIndex.build(np.arange(3), np.eye(3), n_lists=1)
+
+        found, scores = index.search(np.ones((1, 3)), 5)
+
+        assert sorted(found[0, :3].tolist()) == [0, 1, 2]
+        assert np.isneginf(scores[0, 3:]).all()
+
+    def it_is_saved_and_loaded(self, index: IVFIndex):
+        file = io.BytesIO()
+        index.save(file)
+        file.seek(0)
+
+        loaded = IVFIndex.load(file)
+
+        np.testing.assert_array_equal(loaded.ids, index.ids)
+        np.testing.assert_array_equal(loaded.vectors, index.vectors)
+        assert loaded.max_norm == index.max_norm
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from apps.ml.factors import lookup
+from apps.ml.models import ItemKNNModel
+from apps.ml.models.knn import get_neighbours
+
+
+@pytest.fixture()
+def knn_model(reviews_df: pd.DataFrame) -> ItemKNNModel:
+    """Train an item kNN model on the reviews dataset."""
+    model = ItemKNNModel(params={"n_neighbours": 5})
+    model.train(reviews_df)
+    return model
+
+
+def it_keeps_the_most_similar_columns():
+    ratings = sparse.csr_matrix(
+        [[5.0, 5.0, 0.0, 1.0], [4.0, 4.0, 1.0, 0.0], [0.0, 1.0, 5.0, 5.0]]
+    )
+    normalized = ratings.toarray() / np.linalg.norm(ratings.toarray(), axis=0)
+    cosine = normalized.T @ normalized
+
+    neighbours = get_neighbours(ratings, 2).toarray()
+
+    assert (np.count_nonzero(neighbours, axis=1) == 2).all()  # noqa: PLR2004
+    assert not np.diag(neighbours).any()
+    np.testing.assert_allclose(neighbours[0, 1], cosine[0, 1])
+    assert neighbours[0, 2] == 0
+
+
+class DescribeItemKNNModel:
+    users = [1, 5, 19, 999]
+    papers = [0, 3, 28, 999]
+
+    def it_predicts_the_weighted_deviations_of_the_neighbours(
+        self, knn_model: ItemKNNModel
+    ):
+        ratings = knn_model._ratings.toarray()  # noqa: SLF001
+        neighbours = knn_model._neighbours.toarray()  # noqa: SLF001
+        [user] = lookup(knn_model._users, [5])  # noqa: SLF001
+        [paper] = lookup(knn_model._papers, [3])  # noqa: SLF001
+        rated = ratings[user] > 0
+        mean = ratings[user][rated].mean()
+
+        expected = (
+            mean
+            + (neighbours[paper] * (ratings[user] - mean) * rated).sum()
+            / (np.abs(neighbours[paper]) * rated).sum()
+        )
+
+        assert knn_model.predict(5, 3) == pytest.approx(expected)
+
+    def it_predicts_pairs_like_the_matrix(self, knn_model: ItemKNNModel):
+        matrix = knn_model.predict_matrix(self.users, self.papers)
+
+        np.testing.assert_allclose(
+            knn_model.predict_many(
+                np.repeat(self.users, len(self.papers)),
+                np.tile(self.papers, len(self.users)),
+            ),
+            matrix.ravel(),
+        )
+        np.testing.assert_allclose(
+            matrix[-1],
+            knn_model._global_mean,  # noqa: SLF001
+        )
+
+    @pytest.mark.django_db()
+    def it_loads_the_persisted_arrays(self, knn_model: ItemKNNModel):
+        knn_model.persist()
+
+        loaded = ItemKNNModel.objects.get(pk=knn_model.pk)
+        loaded.load()
+
+        assert loaded.get_papers_mapping().get_ids([3]).tolist() == [4]
+        np.testing.assert_allclose(
+            loaded.predict_matrix(self.users, self.papers),
+            knn_model.predict_matrix(self.users, self.papers),
+        )
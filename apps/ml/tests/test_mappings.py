@@ -0,0 +1,31 @@
+import numpy as np
+
+from apps.ml.factors import UNKNOWN
+from apps.ml.mappings import PapersMapping
+
+
+class DescribePapersMapping:
+    mapping = PapersMapping.from_unsorted([7, 2, 5, 2], [70, 20, 50, 20])
+
+    def it_maps_indexes_to_ids(self):
+        np.testing.assert_array_equal(
+            self.mapping.get_ids([2, 5, 7, 3]), [20, 50, 70, UNKNOWN]
+        )
+
+    def it_maps_ids_to_indexes(self):
+        np.testing.assert_array_equal(
+            self.mapping.get_indexes([70, 20, 99, None]), [7, 2, UNKNOWN, UNKNOWN]
+        )
+
+    def it_tombstones_the_deleted_papers(self):
+        mapping = self.mapping.without_deleted([20, 70])
+
+        assert len(mapping) == len(self.mapping)
+        np.testing.assert_array_equal(mapping.get_ids([2, 5, 7]), [20, UNKNOWN, 70])
+        np.testing.assert_array_equal(mapping.get_indexes([50]), [UNKNOWN])
+
+    def it_handles_empty_mappings(self):
+        mapping = PapersMapping.from_unsorted([], [])
+
+        np.testing.assert_array_equal(mapping.get_ids([1]), [UNKNOWN])
+        np.testing.assert_array_equal(mapping.get_indexes([1]), [UNKNOWN])
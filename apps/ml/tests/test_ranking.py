@@ -0,0 +1,27 @@
+import numpy as np
+
+from apps.ml.ranking import top_k
+
+
+class DescribeTopK:
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.4, 0.3, 0.2, 0.1]])
+
+    def it_selects_the_best_columns_sorted(self):
+        columns, values = top_k(self.scores, 2)
+
+        np.testing.assert_array_equal(columns, [[1, 3], [0, 1]])
+        np.testing.assert_array_equal(values, [[0.9, 0.7], [0.4, 0.3]])
+
+    def it_skips_masked_columns(self):
+        mask = np.array([[False, True, False, False], [True, True, True, False]])
+
+        columns, values = top_k(self.scores, 2, mask=mask)
+
+        np.testing.assert_array_equal(columns[0], [3, 2])
+        np.testing.assert_array_equal(columns[1, :1], [3])
+        assert np.isneginf(values[1, 1])
+
+    def it_limits_k_to_the_number_of_columns(self):
+        columns, _ = top_k(self.scores, 10)
+
+        assert columns.shape == (2, 4)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from apps.ml.reranking import (
+    RerankingWeights,
+    maximal_marginal_relevance,
+    normalize_scores,
+    rerank,
+)
+
+
+class DescribeNormalizeScores:
+    def it_scales_the_finite_scores_of_each_row(self):
+        normalized = normalize_scores(
+            np.array([[1.0, 3.0, -np.inf], [2.0, 2.0, -np.inf], [-np.inf] * 3])
+        )
+
+        assert normalized.tolist() == [[0, 1, 0], [1, 1, 0], [0, 0, 0]]
+
+
+class DescribeMaximalMarginalRelevance:
+    def it_skips_the_candidates_similar_to_the_selected_ones(self):
+        relevance = np.array([[1.0, 0.9, 0.5]])
+        similarities = np.array([[[1, 1, 0], [1, 1, 0], [0, 0, 1]]], dtype=float)
+
+        relevant, _ = maximal_marginal_relevance(relevance, similarities, 2, 0)
+        diverse, _ = maximal_marginal_relevance(relevance, similarities, 2, 0.5)
+
+        assert relevant.tolist() == [[0, 1]]
+        assert diverse.tolist() == [[0, 2]]
+
+
+class DescribeRerank:
+    def it_blends_the_popularity_and_keeps_the_scores_order(self):
+        weights = RerankingWeights(model=1, popularity=2, recency=0, diversity=0)
+
+        columns, values = rerank(
+            np.array([[3.0, 2.0, 1.0, -np.inf]]),
+            np.array([[0.0, 10.0, 0.0, 0.0]]),
+            np.full((1, 4), np.nan),
+            np.zeros((1, 4, 4)),
+            4,
+            weights=weights,
+            half_life=365,
+        )
+
+        assert columns[0, :3].tolist() == [1, 0, 2]
+        assert np.all(np.diff(values[0, :3]) <= 0)
+        assert values[0, 3] == -np.inf
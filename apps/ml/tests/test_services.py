@@ -0,0 +1,279 @@
+from unittest import mock
+
+import pandas as pd
+import pytest
+from django.db.models import F
+
+from apps.exports.models import Export
+from apps.ml import services
+from apps.ml.models import SVDModel, TFIDFModel, base
+from apps.papers.models import Paper
+from apps.papers.tasks import export_paper_reviews_dataset, export_papers_dataset
+from apps.papers.tests.factories import KeywordFactory, PaperFactory
+from apps.reviews.models import Review
+from apps.reviews.tests.factories import ReviewFactory
+from apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture()
+def reviews(db) -> list[Review]:
+    """Create reviews of a few users for a few papers."""
+    users = UserFactory.create_batch(3)
+    papers = PaperFactory.create_batch(6)
+    return [
+        ReviewFactory.create(user=user, paper=paper)
+        for user in users
+        for paper in papers[: users.index(user) + 2]
+    ]
+
+
+@pytest.fixture()
+def svd_model(reviews: list[Review]) -> SVDModel:
+    """Train a SVD model on the reviews."""
+    papers_indexes = dict(Paper.objects.values_list("id", "index"))
+    model = SVDModel(params={**SVDModel.DEFAULT_PARAMS, "verbose": False})
+    model.train(
+        pd.DataFrame(
+            {
+                "userId": [review.user_id for review in reviews],
+                "paperId": [review.paper_id for review in reviews],
+                "paperIndex": [papers_indexes[review.paper_id] for review in reviews],
+                "rating": [review.value for review in reviews],
+            }
+        )
+    )
+    return model
+
+
+@pytest.fixture()
+def tfidf_model(reviews: list[Review]) -> TFIDFModel:
+    """Train a TF-IDF model on all the papers and their reviews."""
+    export_papers_dataset()
+    export_paper_reviews_dataset()
+    model = TFIDFModel(params={**TFIDFModel.DEFAULT_PARAMS, "max_df": 1.0})
+    model.train(services.import_paper_reviews_dataset(all_papers=True))
+    return model
+
+
+class DescribeRecommendPapers:
+    def it_recommends_the_best_papers_not_reviewed(
+        self, svd_model: SVDModel, reviews: list[Review]
+    ):
+        users_ids = sorted({review.user_id for review in reviews})
+
+        recommendations = dict(
+            services.recommend_papers(svd_model, users_ids, 2, batch_size=2)
+        )
+
+        assert set(recommendations) == set(users_ids)
+        for user_id, papers in recommendations.items():
+            assert len(papers) == 2  # noqa: PLR2004
+            assert not {paper_id for paper_id, _ in papers} & {
+                review.paper_id for review in reviews if review.user_id == user_id
+            }
+            assert papers == sorted(papers, key=lambda paper: -paper[1])
+
+    @pytest.mark.parametrize("indexed", [False, True])
+    def it_recommends_the_trained_papers_after_a_compaction(
+        self,
+        svd_model: SVDModel,
+        reviews: list[Review],
+        indexed: bool,  # noqa: FBT001
+    ):
+        if indexed:
+            svd_model.build_index(min_papers=0)
+        users_ids = sorted({review.user_id for review in reviews})
+        recommendations = dict(services.recommend_papers(svd_model, users_ids, 3))
+
+        Paper.objects.update(index=F("index") + 100)
+
+        assert dict(services.recommend_papers(svd_model, users_ids, 3)) == (
+            recommendations
+        )
+
+    def it_does_not_recommend_deleted_papers(
+        self, svd_model: SVDModel, reviews: list[Review]
+    ):
+        users_ids = sorted({review.user_id for review in reviews})
+        paper_id, _ = dict(services.recommend_papers(svd_model, users_ids, 1))[
+            users_ids[0]
+        ][0]
+
+        Paper.objects.filter(pk=paper_id).delete()
+
+        assert all(
+            paper_id not in {pk for pk, _ in papers}
+            for _, papers in services.recommend_papers(svd_model, users_ids, 3)
+        )
+
+    def it_fills_the_index_recommendations_after_deletions(
+        self, svd_model: SVDModel, reviews: list[Review]
+    ):
+        svd_model.build_index(min_papers=0)
+        user_id = reviews[0].user_id
+        mapping = services.get_papers_mapping(svd_model)
+        found, _ = svd_model.search([user_id], len(mapping))
+        reviewed_ids = {
+            review.paper_id for review in reviews if review.user_id == user_id
+        }
+        worst_id = [
+            paper_id
+            for paper_id in mapping.get_ids(found.ravel()).tolist()
+            if paper_id not in reviewed_ids
+        ][-1]
+
+        Paper.objects.filter(pk__in=mapping.ids).exclude(pk=worst_id).delete()
+
+        recommendations = dict(services.recommend_papers(svd_model, [user_id], 1))
+        assert [paper_id for paper_id, _ in recommendations[user_id]] == [worst_id]
+
+
+@pytest.mark.usefixtures("reviews")
+class DescribeTrainAndExportModel:
+    def it_publishes_the_model_file_once(self):
+        export_papers_dataset()
+        export_paper_reviews_dataset()
+
+        with mock.patch.object(base, "save", wraps=base.save) as save:
+            model = services.train_and_export_model(SVDModel.TypeChoices.SVD)
+            model.save()
+
+        save.assert_called_once()
+
+    def it_publishes_the_model_once_its_artifacts_are_saved(self):
+        export_papers_dataset()
+        export_paper_reviews_dataset()
+        previous = services.train_and_export_model(SVDModel.TypeChoices.SVD)
+
+        build = SVDModel.build_index
+
+        def build_index(model, *args, **kwargs):
+            assert (
+                SVDModel.objects.get_latest_id_for_type(SVDModel.TypeChoices.SVD)
+                == previous.pk
+            )
+            build(model, *args, **kwargs)
+
+        with mock.patch.object(SVDModel, "build_index", autospec=True) as patched:
+            patched.side_effect = build_index
+            model = services.train_and_export_model(SVDModel.TypeChoices.SVD)
+
+        patched.assert_called_once()
+        assert (
+            SVDModel.objects.get_latest_id_for_type(SVDModel.TypeChoices.SVD)
+            == model.pk
+        )
+
+
+class DescribeImportPaperReviewsDataset:
+    @pytest.mark.parametrize(
+        "file_format", [Export.FormatChoices.CSV, Export.FormatChoices.PARQUET]
+    )
+    def it_joins_the_reviews_with_their_papers(
+        self, reviews: list[Review], file_format: Export.FormatChoices
+    ):
+        if file_format == Export.FormatChoices.PARQUET:
+            pytest.importorskip("pyarrow")
+        export_papers_dataset(file_format=file_format)
+        export_paper_reviews_dataset(file_format=file_format)
+
+        dataset = services.import_paper_reviews_dataset()
+
+        papers_indexes = dict(Paper.objects.values_list("id", "index"))
+        assert len(dataset) == len(reviews)
+        assert all(
+            papers_indexes[row.paperId] == row.paperIndex
+            for row in dataset.itertuples()
+        )
+
+    def it_keeps_the_papers_with_no_reviews(self, reviews: list[Review]):
+        paper = PaperFactory.create()
+        paper.keywords.set(KeywordFactory.create_batch(2))
+        export_papers_dataset()
+        export_paper_reviews_dataset()
+
+        dataset = services.import_paper_reviews_dataset(all_papers=True)
+
+        [row] = dataset[dataset["paperId"] == paper.pk].itertuples()
+        assert len(dataset) == len(reviews) + (
+            Paper.objects.filter(reviews__isnull=True).count()
+        )
+        assert pd.isna(row.userId)
+        assert row.abstract == paper.abstract
+        assert sorted(row.keywordNames.split(", ")) == sorted(
+            paper.keywords.values_list("name", flat=True)
+        )
+
+
+class DescribeGetReviewedPapersMask:
+    def it_flags_the_papers_reviewed_by_each_user(self, reviews: list[Review]):
+        users_ids = sorted({review.user_id for review in reviews})
+        papers_ids = list(Paper.objects.values_list("id", flat=True))[::-1]
+
+        mask = services.get_reviewed_papers_mask([*users_ids, 0], papers_ids)
+
+        assert {
+            (users_ids[row], papers_ids[column])
+            for row, column in zip(*mask.nonzero(), strict=True)
+        } == {(review.user_id, review.paper_id) for review in reviews}
+
+    def it_flags_nothing_for_users_with_no_reviews(self, reviews: list[Review]):
+        papers_ids = list(Paper.objects.values_list("id", flat=True))
+
+        assert not services.get_reviewed_papers_mask([0], papers_ids).any()
+
+
+class DescribeRerankPapers:
+    def it_diversifies_the_papers_keywords(self, db):
+        keyword, other_keyword = KeywordFactory.create_batch(2)
+        papers = [
+            PaperFactory.create(keywords=[keyword]),
+            PaperFactory.create(keywords=[keyword]),
+            PaperFactory.create(keywords=[other_keyword]),
+        ]
+        candidates = [
+            (paper.pk, score) for paper, score in zip(papers, [3, 2, 1], strict=True)
+        ]
+        weights = {"model": 1.0, "popularity": 0.0, "recency": 0.0, "diversity": 0.5}
+
+        [(user_id, reranked)] = services.rerank_papers(
+            [(1, candidates)], 2, weights=weights
+        )
+
+        assert user_id == 1
+        assert [pk for pk, _ in reranked] == [papers[0].pk, papers[2].pk]
+
+    def it_keeps_the_scores_with_only_the_model_weight(self):
+        candidates = [(1, 3.0), (2, 2.0), (3, 1.0)]
+        weights = {"model": 1.0, "popularity": 0.0, "recency": 0.0, "diversity": 0.0}
+
+        assert list(services.rerank_papers([(1, candidates)], 2, weights=weights)) == [
+            (1, candidates[:2])
+        ]
+
+
+class DescribeGetSimilarPapers:
+    def it_retrieves_the_similar_papers_not_deleted(self, tfidf_model: TFIDFModel):
+        papers_ids = tfidf_model.get_papers_mapping().ids.tolist()
+        Paper.objects.filter(pk=papers_ids[-1]).delete()
+
+        similar = dict(services.get_similar_papers(tfidf_model, papers_ids[:-1], 3))
+
+        for paper_id, papers in similar.items():
+            assert len(papers) == 3  # noqa: PLR2004
+            assert paper_id not in {pk for pk, _ in papers}
+            assert papers_ids[-1] not in {pk for pk, _ in papers}
+
+
+class DescribeBuildRelatedPapers:
+    def it_saves_the_similar_papers_of_each_paper(self, tfidf_model: TFIDFModel):
+        papers_ids = tfidf_model.get_papers_mapping().ids.tolist()
+
+        services.build_related_papers(tfidf_model, 3)
+
+        similar = dict(services.get_similar_papers(tfidf_model, papers_ids, 3))
+        for paper_id in papers_ids:
+            assert tfidf_model.get_related_papers(paper_id) == [
+                pk for pk, similarity in similar[paper_id] if similarity > 0
+            ]
+        assert tfidf_model.get_related_papers(max(papers_ids) + 1) == []
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import pytest
+from surprise.accuracy import rmse
+
+from apps.ml.models import SVDModel
+
+
+@pytest.fixture()
+def svd_model(reviews_df: pd.DataFrame) -> SVDModel:
+    """Train a SVD model on the reviews dataset."""
+    model = SVDModel(params={**SVDModel.DEFAULT_PARAMS, "verbose": False})
+    model.train(reviews_df)
+    return model
+
+
+class DescribeSVDModel:
+    users = [1, 5, 19, 999]
+    papers = [0, 3, 28, 999]
+
+    def it_predicts_a_matrix_like_surprise(self, svd_model: SVDModel):
+        algo = svd_model._model  # noqa: SLF001
+        expected = [
+            [algo.predict(user, paper).est for paper in self.papers]
+            for user in self.users
+        ]
+
+        np.testing.assert_allclose(
+            svd_model.predict_matrix(self.users, self.papers), expected
+        )
+
+    def it_predicts_pairs_like_surprise(self, svd_model: SVDModel):
+        algo = svd_model._model  # noqa: SLF001
+        expected = [
+            algo.predict(user, paper).est
+            for user, paper in zip(self.users, self.papers, strict=True)
+        ]
+
+        np.testing.assert_allclose(
+            svd_model.predict_many(self.users, self.papers), expected
+        )
+
+    def it_rejects_pairs_of_different_lengths(self, svd_model: SVDModel):
+        with pytest.raises(ValueError, match="same length"):
+            svd_model.predict_many(self.users, self.papers[:2])
+
+    @pytest.mark.django_db()
+    def it_searches_the_index_like_the_exact_scorer(self, svd_model: SVDModel):
+        svd_model.build_index(min_papers=0)
+        index = svd_model.get_index()
+        assert index is not None
+        exact = svd_model.predict_matrix(self.users, index.ids)
+
+        found, scores = svd_model.search(self.users, 5, n_probe=index.n_lists)
+
+        np.testing.assert_allclose(scores, -np.sort(-exact, axis=1)[:, :5])
+        assert found.shape == (len(self.users), 5)
+
+    @pytest.mark.django_db()
+    def it_loads_the_persisted_arrays_as_memory_maps(self, svd_model: SVDModel):
+        svd_model.persist()
+
+        loaded = SVDModel.objects.get(pk=svd_model.pk)
+        loaded.load()
+
+        assert loaded.filename == f"model-{svd_model.id}.npz"
+        assert isinstance(loaded.factors.qi, np.memmap)
+        np.testing.assert_array_equal(
+            loaded.get_papers_mapping().get_ids(self.papers),
+            svd_model.get_papers_mapping().get_ids(self.papers),
+        )
+        np.testing.assert_allclose(
+            loaded.predict_matrix(self.users, self.papers),
+            svd_model.predict_matrix(self.users, self.papers),
+        )
+
+
+class DescribeSVDModelValidation:
+    def it_measures_the_accuracy_on_held_out_folds(self, svd_model: SVDModel):
+        results = svd_model.validation_results
+
+        assert len(results["test_rmse"]) == SVDModel.CV_FOLDS
+        assert results["rmse"] == pytest.approx(np.mean(results["test_rmse"]))
+        assert svd_model.get_accuracy() == results["rmse"]
+
+    def it_evaluates_datasets_like_surprise(
+        self, svd_model: SVDModel, reviews_df: pd.DataFrame
+    ):
+        algo = svd_model._model  # noqa: SLF001
+
+        metrics = svd_model.evaluate(reviews_df)
+
+        assert metrics["rmse"] == pytest.approx(
+            rmse(algo.test(algo.trainset.build_testset()), verbose=False)
+        )
+
+
+class DescribeSVDModelWarmStart:
+    @pytest.fixture()
+    def dated_reviews_df(self, reviews_df: pd.DataFrame) -> pd.DataFrame:
+        """Date the reviews one minute apart, the last ones being of new users."""
+        dated_df = pd.concat(
+            [
+                reviews_df,
+                pd.DataFrame(
+                    {
+                        "userId": [100, 100, 101],
+                        "paperId": [5, 40, 40],
+                        "paperIndex": [4, 39, 39],
+                        "rating": [5, 4, 1],
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
+        dated_df["createdAt"] = pd.date_range(
+            "2024-01-01", periods=len(dated_df), freq="min", tz="UTC"
+        )
+        return dated_df
+
+    @pytest.fixture()
+    def previous(self, dated_reviews_df: pd.DataFrame) -> SVDModel:
+        model = SVDModel(
+            params={**SVDModel.DEFAULT_PARAMS, "verbose": False, "random_state": 0}
+        )
+        model.train(dated_reviews_df.iloc[:-3])
+        return model
+
+    def it_trains_on_the_reviews_created_since_the_previous_model(
+        self, previous: SVDModel, dated_reviews_df: pd.DataFrame
+    ):
+        model = SVDModel(params={**SVDModel.DEFAULT_PARAMS, "random_state": 0})
+        model.train_warm(dated_reviews_df, previous)
+
+        assert model.trained_until == dated_reviews_df["createdAt"].max()
+        assert model.validation_results["warm_start"]["reviews"] == 3  # noqa: PLR2004
+        assert {100, 101} <= set(model.factors.users.tolist())
+        assert model.get_papers_mapping().get_indexes([40]).tolist() == [
+            previous.factors.papers.max() + 1
+        ]
+        assert model.predict(100, 4) > model.predict(101, 4)
+
+    def it_requires_a_previous_watermark(
+        self, svd_model: SVDModel, dated_reviews_df: pd.DataFrame
+    ):
+        with pytest.raises(ValueError, match="can not be warm started"):
+            SVDModel().train_warm(dated_reviews_df, svd_model)
+
+
+class DescribeSVDModelTune:
+    @pytest.mark.parametrize("method", ["grid", "random"])
+    def it_keeps_the_best_params(self, reviews_df: pd.DataFrame, method: str):
+        model = SVDModel(params={**SVDModel.DEFAULT_PARAMS, "verbose": False})
+
+        model.tune(
+            reviews_df,
+            {"n_factors": [2, 4], "reg_all": [0.02, 0.1]},
+            method=method,
+            n_iter=2,
+        )
+
+        results = model.validation_results
+        assert model.params == results["best_params"]
+        assert model.params["verbose"] is False
+        assert results["rmse"] == min(
+            result["rmse"] for result in results["cv_results"]
+        )
+        assert len(results["cv_results"]) == (4 if method == "grid" else 2)
+        assert model.factors.pu.shape[1] == model.params["n_factors"]
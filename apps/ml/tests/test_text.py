@@ -0,0 +1,35 @@
+import numpy as np
+
+from apps.ml.text import get_tfidf_matrix, tokenize
+
+
+def it_tokenizes_lowercase_words():
+    assert tokenize("Deep-Learning of 3D images, a survey") == [
+        "deep",
+        "learning",
+        "of",
+        "3d",
+        "images",
+        "survey",
+    ]
+
+
+def it_weights_the_terms_by_their_inverse_document_frequency():
+    terms, matrix = get_tfidf_matrix(
+        ["banana apple banana", "cherry banana"], sublinear_tf=False
+    )
+
+    rare = np.log(3 / 2) + 1
+    expected = np.array([[rare, 2, 0], [0, 1, rare]])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert terms.tolist() == ["apple", "banana", "cherry"]
+    np.testing.assert_allclose(matrix.toarray(), expected)
+
+
+def it_drops_the_rare_and_the_common_terms():
+    terms, matrix = get_tfidf_matrix(
+        ["banana apple", "cherry banana", "apple banana"], min_df=2, max_df=0.9
+    )
+
+    assert terms.tolist() == ["apple"]
+    assert matrix.shape == (3, 1)
@@ -0,0 +1,85 @@
+"""Sparse TF-IDF vectors of the papers texts."""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+import numpy as np
+from scipy import sparse
+
+from apps.ml.sparse import normalize_rows
+
+TOKEN_PATTERN = re.compile(r"\b\w\w+\b")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into its lowercase words of two or more characters."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def get_tfidf_matrix(
+    texts: Iterable[str],
+    *,
+    min_df: int = 1,
+    max_df: float = 1.0,
+    max_features: int | None = None,
+    sublinear_tf: bool = True,
+) -> tuple[np.ndarray, sparse.csr_matrix]:
+    """Compute the TF-IDF vectors of texts.
+
+    The terms are weighted like scikit-learn's `TfidfVectorizer` with a smooth
+    inverse document frequency, `log((1 + texts) / (1 + frequency)) + 1`, and the
+    vectors are scaled to unit length, so their inner products are cosines.
+
+    Args:
+        texts (Iterable[str]): The texts.
+        min_df (int, optional): The minimum number of texts with a term for it
+        to be kept. Defaults to 1.
+        max_df (float, optional): The maximum fraction of the texts with a term
+        for it to be kept. Defaults to 1.0.
+        max_features (int | None, optional): If set, only the most frequent terms
+        are kept. Defaults to None.
+        sublinear_tf (bool, optional): If the terms counts are replaced by
+        `1 + log(count)`. Defaults to True.
+
+    Returns:
+        tuple[numpy.ndarray, scipy.sparse.csr_matrix]: The kept terms, sorted, and
+        a texts by terms matrix with the vectors.
+    """
+    vocabulary: dict[str, int] = {}
+    indices: list[int] = []
+    counts: list[int] = []
+    indptr = [0]
+    for text in texts:
+        terms_counts = Counter(
+            vocabulary.setdefault(term, len(vocabulary)) for term in tokenize(text)
+        )
+        indices.extend(terms_counts.keys())
+        counts.extend(terms_counts.values())
+        indptr.append(len(indices))
+
+    n_texts = len(indptr) - 1
+    matrix = sparse.csr_matrix(
+        (
+            np.asarray(counts, dtype=np.float64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(indptr, dtype=np.int64),
+        ),
+        shape=(n_texts, len(vocabulary)),
+    )
+    frequencies = np.bincount(matrix.indices, minlength=len(vocabulary))
+    kept = (frequencies >= min_df) & (frequencies <= max_df * n_texts)
+    if max_features is not None and np.count_nonzero(kept) > max_features:
+        most_frequent = np.argsort(-np.where(kept, frequencies, -1), kind="stable")
+        kept = np.zeros(len(vocabulary), dtype=bool)
+        kept[most_frequent[:max_features]] = True
+
+    terms = np.array(list(vocabulary), dtype=str)
+    columns = np.flatnonzero(kept)
+    columns = columns[np.argsort(terms[columns], kind="stable")]
+
+    matrix = matrix[:, columns]
+    if sublinear_tf:
+        matrix.data = 1 + np.log(matrix.data)
+    idf = np.log((1 + n_texts) / (1 + frequencies[columns])) + 1
+    return terms[columns], normalize_rows(matrix @ sparse.diags(idf))
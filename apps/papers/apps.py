@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_save
 from django.utils.translation import gettext_lazy as _
 
 
@@ -16,8 +16,3 @@ class PapersConfig(AppConfig):
             sender=models.Paper,
             dispatch_uid="recalculate_papers_embeddings_on_save",
         )
-        post_delete.connect(
-            signals.recalculate_papers_embeddings_on_delete,
-            sender=models.Paper,
-            dispatch_uid="recalculate_papers_embeddings_on_delete",
-        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = "Compare the throughput of the ORM and COPY datasets exports."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            default=2000,
+            type=int,
+            help="The number of rows fetched at a time by the ORM export.",
+        )
+
+    def handle(self, *args, **options):
+        from apps.exports.benchmarks import benchmark_export
+        from apps.exports.writers import can_copy
+        from apps.papers.models import Paper
+        from apps.papers.tasks import (
+            PAPER_REVIEWS_DATASET_FIELDNAMES,
+            PAPERS_DATASET_FIELDNAMES,
+        )
+        from apps.reviews.models import Review
+
+        datasets = {
+            "papers": (Paper.objects.to_dataset(), PAPERS_DATASET_FIELDNAMES),
+            "reviews": (Review.objects.to_dataset(), PAPER_REVIEWS_DATASET_FIELDNAMES),
+        }
+        self.stdout.write(
+            f"{'dataset':>8} {'backend':>8} {'rows':>10} {'MB':>8} {'rows/s':>12}"
+        )
+        for name, (queryset, fieldnames) in datasets.items():
+            if not can_copy(queryset):
+                self.stdout.write(
+                    self.style.WARNING(f"The {name} database does not support COPY.")
+                )
+            for result in benchmark_export(
+                queryset, fieldnames, chunk_size=options["chunk_size"]
+            ):
+                self.stdout.write(
+                    f"{name:>8} "
+                    f"{result['backend']:>8} "
+                    f"{result['rows']:>10} "
+                    f"{result['size'] / 2**20:>8.2f} "
+                    f"{result['rows_per_second']:>12.0f}"
+                )
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = "Compare the recall and latency of the latest model index searches."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "model",
+            nargs="?",
+            default=settings.DEFAULT_MODEL_TYPE,
+            type=str,
+            help="The model type to benchmark.",
+        )
+        parser.add_argument(
+            "--users",
+            default=100,
+            type=int,
+            help="The number of users to search papers for.",
+        )
+        parser.add_argument(
+            "-k",
+            default=50,
+            type=int,
+            help="The number of papers to search for each user.",
+        )
+        parser.add_argument(
+            "--n-probes",
+            default=[1, 2, 4, 8, 16, 32],
+            nargs="+",
+            type=int,
+            help="The index search breadths to benchmark.",
+        )
+
+    def handle(self, *args, **options):
+        from apps.ml import services
+        from apps.ml.benchmarks import benchmark_index
+        from apps.users.models import User
+
+        model = services.load_latest_model(options["model"])
+        if model.get_index() is None:
+            self.stdout.write("Building the model index...")
+            model.build_index(min_papers=0)
+
+        users_ids = list(
+            User.objects.order_by("?").values_list("id", flat=True)[: options["users"]]
+        )
+        if not users_ids:
+            self.stdout.write(self.style.ERROR("There are no users to search for."))
+            return
+
+        self.stdout.write(f"{'n_probe':>8} {'recall':>8} {'ms/user':>10}")
+        for result in benchmark_index(
+            model, users_ids, options["k"], options["n_probes"]
+        ):
+            self.stdout.write(
+                f"{result['n_probe'] or 'exact':>8} "
+                f"{result['recall']:>8.3f} "
+                f"{result['latency_ms']:>10.3f}"
+            )
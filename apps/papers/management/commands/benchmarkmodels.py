@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = "Compare the training time, throughput and accuracy of the models types."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        from apps.ml.models import Model
+
+        parser.add_argument(
+            "models",
+            nargs="*",
+            default=Model.TypeChoices.values,
+            choices=Model.TypeChoices.values,
+            help="The model types to benchmark. Defaults to all of them.",
+        )
+        parser.add_argument(
+            "-k",
+            default=10,
+            type=int,
+            help="The number of papers ranked for each user.",
+        )
+        parser.add_argument(
+            "--test-size",
+            default=0.2,
+            type=float,
+            help="The fraction of the reviews held out for the evaluation.",
+        )
+        parser.add_argument(
+            "--users",
+            default=1000,
+            type=int,
+            help="The maximum number of users to score papers for.",
+        )
+        parser.add_argument(
+            "--random-state",
+            default=None,
+            type=int,
+            help="The seed of the reviews split.",
+        )
+
+    def handle(self, *args, **options):
+        from django.utils.module_loading import import_string
+
+        from apps.ml import services
+        from apps.ml.benchmarks import benchmark_models
+
+        models = [
+            import_string(
+                f"apps.ml.models.{services.MODEL_TYPE_TO_CLASS[model_type]}"
+            )()
+            for model_type in options["models"]
+        ]
+        results = benchmark_models(
+            models,
+            services.import_paper_reviews_dataset(),
+            k=options["k"],
+            test_size=options["test_size"],
+            n_users=options["users"],
+            random_state=options["random_state"],
+        )
+
+        self.stdout.write(
+            f"{'model':>6} {'train s':>10} {'scores/s':>12} {'rmse':>8} {'ndcg':>8}"
+        )
+        for result in results:
+            rmse = "-" if result["rmse"] is None else f"{result['rmse']:.4f}"
+            self.stdout.write(
+                f"{result['model_type']:>6} "
+                f"{result['train_seconds']:>10.2f} "
+                f"{result['predictions_per_second']:>12.0f} "
+                f"{rmse:>8} "
+                f"{result['ndcg']:>8.4f}"
+            )
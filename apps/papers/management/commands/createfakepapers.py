@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from apps.papers import models
+from apps.papers.reindex import suspend_papers_reindex
 from apps.papers.tests import factories
 
 
@@ -65,22 +66,25 @@ class Command(BaseCommand):
         Returns:
             list[models.Paper]: The created papers.
         """
+        location = factories.LocationFactory.create()
         return models.Paper.objects.bulk_create(
-            [factories.PaperFactory.build() for _ in range(count)]
+            [factories.PaperFactory.build(location=location) for _ in range(count)]
         )
 
     def handle(self, *args, **kwargs):
-        papers = self.create_fake_papers(kwargs["count"])
-
-        self.create_fake_authors(kwargs["authors"])
-        self.create_fake_keywords(kwargs["keywords"])
-
-        for paper in papers:
-            paper.authors.set(
-                models.Author.objects.order_by("?")[: kwargs["authors_per_paper"]]
-            )
-            paper.keywords.set(
-                models.Keyword.objects.order_by("?")[: kwargs["keywords_per_paper"]]
-            )
+        # Bulk creations send no signals, so the reindexing is scheduled at the end
+        with suspend_papers_reindex():
+            papers = self.create_fake_papers(kwargs["count"])
+
+            self.create_fake_authors(kwargs["authors"])
+            self.create_fake_keywords(kwargs["keywords"])
+
+            for paper in papers:
+                paper.authors.set(
+                    models.Author.objects.order_by("?")[: kwargs["authors_per_paper"]]
+                )
+                paper.keywords.set(
+                    models.Keyword.objects.order_by("?")[: kwargs["keywords_per_paper"]]
+                )
 
         self.stdout.write(self.style.SUCCESS(f"{len(papers)} papers created."))
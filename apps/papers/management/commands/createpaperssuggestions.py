@@ -14,39 +14,57 @@ class Command(BaseCommand):
             help="The model type to train.",
         )
         parser.add_argument(
-            "--start",
-            default=0,
+            "-k",
+            default=None,
             type=int,
-            help="The paper to start.",
+            help="The number of papers to suggest to each user.",
         )
         parser.add_argument(
-            "--offset",
-            default=50,
+            "--batch-size",
+            default=None,
             type=int,
-            help="The papers batch size.",
+            help="The number of users to score at a time.",
         )
         parser.add_argument(
-            "--max",
-            default=250,
-            type=int,
-            help="The number of papers to suggest.",
+            "--no-rerank",
+            action="store_true",
+            help="Store the model scores, with no popularity, recency or diversity.",
         )
         parser.add_argument(
-            "--reuse-suggestions-up-to-days",
+            "--shard-size",
+            default=None,
             type=int,
-            default=7,
-            help="The number of days to consider current suggestions as still valid.",
+            help="Dispatch shards of this number of users to the Celery workers.",
+        )
+        parser.add_argument(
+            "--resume",
+            default=None,
+            type=str,
+            help="The ID of an unfinished sharded run to resume.",
         )
 
     def handle(self, *args, **options):
-        from apps.papers.tasks import batch_create_papers_suggestions
+        from apps.papers.tasks import (
+            batch_create_papers_suggestions,
+            create_papers_suggestions,
+        )
+
+        if options["shard_size"] or options["resume"]:
+            run_id = create_papers_suggestions(
+                model_type=options["model"],
+                k=options["k"],
+                shard_size=options["shard_size"],
+                rerank=not options["no_rerank"],
+                run_id=options["resume"],
+            )
+            self.stdout.write(f"Dispatched the suggestions run {run_id}.")
+            return
 
         batch_create_papers_suggestions(
             model_type=options["model"],
-            start=options["start"],
-            offset=options["offset"],
-            max_papers=options["max"],
-            use_suggestions_up_to_days=options["reuse_suggestions_up_to_days"],
+            k=options["k"],
+            batch_size=options["batch_size"],
+            rerank=not options["no_rerank"],
         )
 
         self.stdout.write(
@@ -5,7 +5,7 @@ from django.core.management.base import BaseCommand, CommandParser
 
 
 class Command(BaseCommand):
-    help = "Train a surprise model using the latest exported datasets."
+    help = "Train a model using the latest exported datasets."
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument(
@@ -22,6 +22,19 @@ class Command(BaseCommand):
             help="The training parameters."
             " If not provided, the default parameters will be used.",
         )
+        parser.add_argument(
+            "--warm-start",
+            action="store_true",
+            default=False,
+            help="Train from the latest model, on the reviews created since.",
+        )
+        parser.add_argument(
+            "--search",
+            default=None,
+            choices=["grid", "random"],
+            help="Search the best parameters by cross-validation with this method,"
+            " starting from the training parameters.",
+        )
 
     def handle(self, *args, **kwargs):
         from apps.papers.tasks import train_and_export_new_model
@@ -35,6 +48,11 @@ class Command(BaseCommand):
             )
             return
 
-        train_and_export_new_model(model_type, params)
+        train_and_export_new_model(
+            model_type,
+            params,
+            warm_start=kwargs["warm_start"],
+            search=kwargs["search"],
+        )
 
         self.stdout.write(self.style.SUCCESS("Successfully trained the model."))
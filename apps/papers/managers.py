@@ -1,7 +1,13 @@
+from typing import TYPE_CHECKING
+
 from django.db import models
 
 from apps.papers import querysets
 from apps.suggestions.models import Suggestion
+from common.aggregates import StringAgg
+
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 
 class PaperManager(models.Manager):
@@ -25,6 +31,8 @@ class PaperManager(models.Manager):
         - paperId
         - paperIndex
         - title
+        - abstract
+        - keywordNames: The names of the paper keywords, separated by commas.
         - publishedAt
         - reviewsAverage
         - reviewsCount
@@ -41,18 +49,51 @@ class PaperManager(models.Manager):
                     "publishedAt": models.F("published"),
                     "reviewsAverage": models.F("reviews_average"),
                     "reviewsCount": models.F("reviews_count"),
+                    "keywordNames": models.Subquery(
+                        self.model.keywords.through.objects.filter(
+                            paper=models.OuterRef("pk")
+                        )
+                        .values("paper")
+                        .annotate(names=StringAgg("keyword__name", ", "))
+                        .values("names")
+                    ),
                 }
             )
             .values(
                 "paperId",
                 "paperIndex",
                 "title",
+                "abstract",
+                "keywordNames",
                 "publishedAt",
                 "reviewsAverage",
                 "reviewsCount",
             )
         )
 
+    def to_dataset_schema(self) -> "pa.Schema":
+        """Return the types of the `to_dataset` columns.
+
+        It requires the `pyarrow` package.
+
+        Returns:
+            pyarrow.Schema: The papers dataset schema.
+        """
+        import pyarrow as pa
+
+        return pa.schema(
+            [
+                pa.field("paperId", pa.int64(), nullable=False),
+                pa.field("paperIndex", pa.int64()),
+                pa.field("title", pa.string(), nullable=False),
+                pa.field("abstract", pa.string(), nullable=False),
+                pa.field("keywordNames", pa.string()),
+                pa.field("publishedAt", pa.date32()),
+                pa.field("reviewsAverage", pa.decimal128(5, 2)),
+                pa.field("reviewsCount", pa.int64()),
+            ]
+        )
+
     def recent_suggestions(
         self,
         users_ids: list[int],
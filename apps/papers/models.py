@@ -176,4 +176,11 @@ class Paper(TimeStampedModel, UuidModel, models.Model):
         self.score = float(self.reviews_average or 0) * self.reviews_count
         self.last_reviews_update = timezone.now()
         if save:
-            self.save()
+            self.save(
+                update_fields=[
+                    "reviews_average",
+                    "reviews_count",
+                    "score",
+                    "last_reviews_update",
+                ]
+            )
@@ -6,7 +6,7 @@ class PaperAccessPolicy(AccessPolicy):
 
     statements = [
         {
-            "action": ["list", "retrieve"],
+            "action": ["list", "retrieve", "related"],
             "principal": "*",
             "effect": "allow",
         },
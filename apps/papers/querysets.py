@@ -2,8 +2,11 @@ from typing import Self
 
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils import timezone
 
+from apps.reviews.models import Review
+
 PAPERS_REVIEWS_RECALCULATE_MINUTES = 10
 
 
@@ -42,6 +45,89 @@ class PaperQuerySet(models.QuerySet):
             )
         )
 
+    def order_by_last_reviews_update(self) -> Self:
+        """Order the papers by the last update of their reviews data, oldest first.
+
+        Papers never updated come first.
+        """
+        return self.order_by(models.F("last_reviews_update").asc(nulls_first=True))
+
+    def update_reviews(self) -> int:
+        """Update the reviews data of the selected papers from their active reviews.
+
+        All the papers are updated with a single `UPDATE` statement, with the
+        average, count and sum of the reviews of each paper computed by correlated
+        subqueries, which use the index on the reviews paper.
+
+        Returns:
+            int: The number of papers updated.
+        """
+        reviews = (
+            Review.objects.active()
+            .filter(paper=models.OuterRef("pk"))
+            .order_by()
+            .values("paper")
+        )
+        return self.update(
+            reviews_average=models.Subquery(
+                reviews.annotate(average=models.Avg("value")).values("average")
+            ),
+            reviews_count=Coalesce(
+                models.Subquery(
+                    reviews.annotate(count=models.Count("pk")).values("count")
+                ),
+                0,
+            ),
+            # The score is the average times the count, which is the sum
+            score=Coalesce(
+                models.Subquery(
+                    reviews.annotate(
+                        sum=Cast(models.Sum("value"), models.FloatField())
+                    ).values("sum")
+                ),
+                0.0,
+            ),
+            last_reviews_update=timezone.now(),
+        )
+
+    def add_reviews(self, count: int, total: float) -> int:
+        """Add reviews to the reviews data of the selected papers.
+
+        The data is updated atomically with F-expressions, at a constant cost per
+        paper. Papers whose reviews data was never computed are fully updated with
+        `update_reviews` instead, so it must be called after the reviews are
+        written. So are the papers that would be left with a negative number of
+        reviews, as when a removal races with a reconciliation.
+
+        Args:
+            count (int): The number of reviews added, negative if removed.
+            total (float): The sum of the values of the reviews added, negative if
+            removed.
+
+        Returns:
+            int: The number of papers updated.
+        """
+
+        def if_consistent(value):
+            # Cleared, to be fully updated below, if the count would be negative
+            return models.Case(
+                models.When(reviews_count__gte=-count, then=value), default=None
+            )
+
+        def get_count():
+            return models.F("reviews_count") + count
+
+        def get_total():
+            return Coalesce(models.F("score"), 0.0) + total
+
+        updated = self.filter(reviews_count__isnull=False).update(
+            reviews_count=if_consistent(get_count()),
+            score=if_consistent(get_total()),
+            reviews_average=if_consistent(get_total() / NullIf(get_count(), 0)),
+            last_reviews_update=timezone.now(),
+        )
+        return updated + self.filter(reviews_count__isnull=True).update_reviews()
+
     def popular(self, reverse=None):
         """Order the papers by popularity."""
         order_by = models.F("score")
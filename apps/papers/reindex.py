@@ -0,0 +1,93 @@
+"""Debounced indexing of the new papers positions.
+
+Papers creations only mark the positions as outdated, and a single Celery task
+indexes the new papers once no paper was written for
+`PAPERS_REINDEX_QUIET_SECONDS`, or at most `PAPERS_REINDEX_MAX_DELAY_SECONDS` after
+the first write, so bursts of writes cost a single pass. The state is kept in the
+default cache, shared by all the processes.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.transaction import on_commit
+
+OUTDATED_SINCE_KEY = "papers:reindex:outdated-since"
+OUTDATED_AT_KEY = "papers:reindex:outdated-at"
+SCHEDULED_KEY = "papers:reindex:scheduled"
+
+_suspended: ContextVar[bool] = ContextVar("papers_reindex_suspended", default=False)
+
+
+def schedule_papers_reindex() -> None:
+    """Mark the papers positions as outdated, and schedule their reindexing.
+
+    It does nothing while the reindexing is suspended with `suspend_papers_reindex`,
+    and waits for the current transaction to be committed, so the task sees the
+    written papers, and nothing is scheduled for a rolled back transaction.
+    """
+    if not _suspended.get():
+        on_commit(_schedule_papers_reindex)
+
+
+def _schedule_papers_reindex() -> None:
+    from apps.papers.tasks import reindex_papers_positions
+
+    quiet, max_delay = (
+        settings.PAPERS_REINDEX_QUIET_SECONDS,
+        settings.PAPERS_REINDEX_MAX_DELAY_SECONDS,
+    )
+    now = time.time()
+    cache.add(OUTDATED_SINCE_KEY, now, timeout=None)
+    cache.set(OUTDATED_AT_KEY, now, timeout=None)
+    # Expires in case the task is lost, as when its worker dies
+    if cache.add(SCHEDULED_KEY, now, timeout=quiet + max_delay):
+        reindex_papers_positions.apply_async(countdown=quiet)
+
+
+def get_papers_reindex_delay() -> float:
+    """Return the seconds to wait before reindexing the papers positions.
+
+    Returns:
+        float: The remaining quiet period, bounded by the maximum delay since the
+        positions are outdated. Zero or negative if they can be reindexed now.
+    """
+    outdated_since, outdated_at = (
+        cache.get(OUTDATED_SINCE_KEY),
+        cache.get(OUTDATED_AT_KEY),
+    )
+    if outdated_since is None or outdated_at is None:
+        return 0
+    return (
+        min(
+            outdated_at + settings.PAPERS_REINDEX_QUIET_SECONDS,
+            outdated_since + settings.PAPERS_REINDEX_MAX_DELAY_SECONDS,
+        )
+        - time.time()
+    )
+
+
+def clear_papers_reindex() -> None:
+    """Mark the papers positions as up to date, before they are reindexed.
+
+    Papers written during the reindexing schedule a new one.
+    """
+    cache.delete_many([OUTDATED_SINCE_KEY, OUTDATED_AT_KEY, SCHEDULED_KEY])
+
+
+@contextmanager
+def suspend_papers_reindex() -> Iterator[None]:
+    """Suspend the papers reindexing, to be scheduled only once at the end.
+
+    Meant for bulk operations, as imports of many papers.
+    """
+    token = _suspended.set(True)  # noqa: FBT003
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+        schedule_papers_reindex()
@@ -114,7 +114,11 @@ class PaperDetailSerializer(PaperListSerializer):
         keywords_data = validated_data.pop("keywords")
         location_data = validated_data.pop("location")
 
-        instance = super().update(instance, validated_data)
+        # Only the given fields are written, as the embedding index is written by
+        # the indexing tasks, possibly since the instance was loaded
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
 
         instance.authors.clear()
         for author_data in authors_data:
@@ -1,145 +1,196 @@
-from celery import shared_task
+import time
+from collections.abc import Iterator
+from functools import partial
+from typing import TypedDict
+
+from celery import chord, shared_task
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Avg, Count, F, Window
-from django.db.models.functions import DenseRank
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Max, Q, Sum
 from django.utils import timezone
 
 from apps.exports.models import Export
 from apps.ml import services
 from apps.ml.models import Model
-from apps.papers import models
+from apps.papers import models, reindex
 from apps.reviews.models import Review
-from apps.suggestions.models import Suggestion
+from apps.suggestions.feeds import set_suggestions_feeds
+from apps.suggestions.models import Suggestion, SuggestionsRun, SuggestionsShard
 from apps.users.models import User
 
+SUGGESTIONS_BULK_SIZE = 5000
+PAPERS_INDEX_BATCH_SIZE = 5000
+PAPER_REVIEWS_DATASET_FIELDNAMES = ["userId", "paperId", "rating", "createdAt"]
+PAPERS_DATASET_FIELDNAMES = [
+    "paperId",
+    "paperIndex",
+    "title",
+    "abstract",
+    "keywordNames",
+    "publishedAt",
+    "reviewsAverage",
+    "reviewsCount",
+]
+
+
+class SuggestionsRunReport(TypedDict):
+    """Totals and timings of a suggestions run."""
+
+    shards: int
+    finished_shards: int
+    suggestions: int
+    shards_seconds: float
+    seconds: float
 
-def update_papers_reviews(update_all=None, count: int | None = None):
-    """Updates papers reviews data (average and count).
+
+def update_papers_reviews(update_all=None, count: int | None = None) -> int:
+    """Updates papers reviews data (average and count) from their active reviews.
+
+    The papers are updated with a single set-based `UPDATE` statement.
 
     Args:
         update_all (bool, optional): If True, all the papers in the database are
         updated, only papers with outdated reviews information are updated otherwise.
         Defaults to all.
-        count (int, optional): The number of papers to update. Defaults to None.
+        count (int, optional): The number of papers to update, the ones with the
+        oldest reviews data first. Defaults to None.
 
     Returns:
         int: The number of papers updated.
     """
-
-    aggregated_reviews = (
-        Review.objects.all()
-        .values("paper_id")
-        .annotate(average=Avg("value"), count=Count("paper_id"))
-    )
-
-    queryset = models.Paper.objects.get_queryset().order_by("last_reviews_update")
+    queryset = models.Paper.objects.get_queryset()
     if not update_all:
         queryset = queryset.filter_outdated_reviews()
-
-    updated = 0
-    for agg in aggregated_reviews:
-        queryset.filter(pk=agg["paper_id"]).update(
-            reviews_average=agg["average"],
-            reviews_count=agg["count"],
-            score=agg["average"] * agg["count"],
-            last_reviews_update=timezone.now(),
+    if count:
+        queryset = models.Paper.objects.filter(
+            pk__in=queryset.order_by_last_reviews_update().values("pk")[:count]
         )
-        updated += 1
-        if count and updated >= count:
-            break
-    return updated
+    return queryset.update_reviews()
 
 
 @shared_task(name="update_papers_reviews_outdated")
 def update_papers_reviews_outdated():
-    """Updates outdated papers reviews data."""
+    """Updates outdated papers reviews data.
+
+    The reviews data is kept up to date by the reviews signals, so this only
+    reconciles it with the reviews, as after bulk writes that skip the signals.
+    """
     return update_papers_reviews()
 
 
+def _get_dataset_schema(manager, file_format: Export.FormatChoices):
+    """Return the dataset schema of a manager, if the format needs one."""
+    if file_format == Export.FormatChoices.CSV:
+        return None
+    return manager.to_dataset_schema()
+
+
 @shared_task(name="export_paper_reviews_dataset")
-def export_paper_reviews_dataset(filename: str | None = None) -> str | None:
+def export_paper_reviews_dataset(
+    filename: str | None = None, file_format: str = Export.FormatChoices.CSV
+) -> str | None:
     """Exports a dataset with the papers reviews, average and count.
 
     Args:
         filename (str | None, optional): A name for the destination file.
         Defaults to `paper_reviews`.
+        file_format (str, optional): The export file format. Defaults to CSV.
 
     Returns:
         str: The export file path.
     """
+    file_format = Export.FormatChoices(file_format)
     return Export.from_dataset(
         Review.objects.to_dataset(),
-        fieldnames=["userId", "paperId", "rating", "createdAt"],
+        fieldnames=PAPER_REVIEWS_DATASET_FIELDNAMES,
         filename=filename or "paper_reviews",
         content_type=ContentType.objects.get_for_model(Review),
+        file_format=file_format,
+        schema=_get_dataset_schema(Review.objects, file_format),
     ).file.path
 
 
 @shared_task(name="export_papers_dataset")
-def export_papers_dataset():
+def export_papers_dataset(file_format: str = Export.FormatChoices.CSV):
     """Exports a dataset with the papers data.
 
+    Args:
+        file_format (str, optional): The export file format. Defaults to CSV.
+
     Returns:
         str: The export file path.
     """
+    file_format = Export.FormatChoices(file_format)
     return Export.from_dataset(
         models.Paper.objects.to_dataset(),
-        fieldnames=[
-            "paperId",
-            "paperIndex",
-            "title",
-            "publishedAt",
-            "reviewsAverage",
-            "reviewsCount",
-        ],
+        fieldnames=PAPERS_DATASET_FIELDNAMES,
         filename="papers",
         content_type=ContentType.objects.get_for_model(models.Paper),
+        file_format=file_format,
+        schema=_get_dataset_schema(models.Paper.objects, file_format),
     ).file.path
 
 
 @shared_task(name="train_and_export_new_model")
-def train_and_export_new_model(model_type, params: dict | None = None):
+def train_and_export_new_model(
+    model_type,
+    params: dict | None = None,
+    *,
+    warm_start: bool = False,
+    search: str | None = None,
+):
     """Trains and exports a new model.
 
     Args:
         model_type (str): The model type to train.
         params (dict | None, optional): The training params. Defaults to None.
+        warm_start (bool, optional): If the model is trained from the latest one,
+        on the reviews created since. Defaults to False.
+        search (str | None, optional): The params search method, "grid" or
+        "random". Defaults to no search.
 
     Returns:
         str: The export file path.
     """
     return services.train_and_export_model(
-        model_type=model_type, params=params
+        model_type=model_type, params=params, warm_start=warm_start, search=search
     ).file.path
 
 
 @shared_task(name="batch_create_papers_suggestions")
-def batch_create_papers_suggestions(  # noqa: PLR0913
+def batch_create_papers_suggestions(
     model_type: Model.TypeChoices,
     users_ids: list[int] | None = None,
     *,
-    max_papers: int = 1000,
-    offset: int = 50,
-    start: int = 0,
-    use_suggestions_up_to_days: int | None = 7,
-):
-    """Generates suggestions for a batch of users.
+    k: int | None = None,
+    batch_size: int | None = None,
+    rerank: bool = True,
+) -> int:
+    """Generates the top `k` suggestions for a batch of users.
+
+    Every paper in the catalog is scored for each user, and only the best papers
+    the user did not review yet are kept as candidates. They are re-ranked by
+    `services.rerank_papers`, and the `k` best ones are stored as suggestions.
 
     Args:
         model_type (str): The model type to use.
         users_ids (list[int] | None, optional): The users to generate suggestions to.
         Defaults to the users that interacted with the application recently.
-        max_papers (int, optional): The maximum number of papers to generate suggestions.
-        Defaults to 1000.
-        offset (int, optional): The number of papers to generate suggestions at a time.
-        Defaults to 50.
-        start (int, optional): The papers start index. Defaults to 0.
-        use_suggestions_up_to_days (int | None, optional): Reuse suggestions up to the given days.
-        Defaults to 7.
+        k (int | None, optional): The number of suggestions for each user.
+        Defaults to the `SUGGESTIONS_PER_USER` setting.
+        batch_size (int | None, optional): The number of users scored at a time.
+        Defaults to as many as the scores memory bound allows.
+        rerank (bool, optional): If `SUGGESTIONS_CANDIDATES_FACTOR` times more
+        candidates are re-ranked, else the model scores are stored as they are.
+        Defaults to True.
 
     Raises:
         ValueError: If the model is not found.
-    """  # noqa: E501
+
+    Returns:
+        int: The number of suggestions created or refreshed.
+    """
 
     model = services.load_latest_model(model_type)
     if not model:
@@ -148,64 +199,339 @@ def batch_create_papers_suggestions(  # noqa: PLR0913
 
     if users_ids is None:
         users_ids = User.objects.recent(ids_only=True)  # type: ignore[assignment]
-
-    end = start + offset
-    papers_ids: list[int] = (
-        models.Paper.objects.all().popular().values_list("id", flat=True)[start:end]
+    users_ids = list(users_ids or [])
+
+    return create_papers_suggestions_for_users(
+        model,
+        users_ids,
+        k=k,
+        batch_size=batch_size,
+        rerank=rerank,
     )
 
-    recent_suggestions = {}
-    if use_suggestions_up_to_days:
-        recent_suggestions = models.Paper.objects.recent_suggestions(
-            users_ids,  # type: ignore[arg-type]
-            papers_ids,
-            days=use_suggestions_up_to_days,
+
+def create_papers_suggestions_for_users(
+    model: Model,
+    users_ids: list[int],
+    *,
+    k: int | None = None,
+    batch_size: int | None = None,
+    rerank: bool = True,
+) -> int:
+    """Generates and stores the top `k` suggestions of a model for some users.
+
+    The feeds of the users are replaced by their new suggestions as they are stored.
+
+    See `batch_create_papers_suggestions` for the arguments.
+
+    Returns:
+        int: The number of suggestions created or refreshed.
+    """
+    created = 0
+    for suggestions, feeds in generate_papers_suggestions(
+        model,
+        users_ids,
+        k=k,
+        batch_size=batch_size,
+        rerank=rerank,
+    ):
+        created += Suggestion.objects.upsert(suggestions)
+        set_suggestions_feeds(feeds, model.pk)
+    return created
+
+
+def generate_papers_suggestions(
+    model: Model,
+    users_ids: list[int],
+    *,
+    k: int | None = None,
+    batch_size: int | None = None,
+    rerank: bool = True,
+) -> Iterator[tuple[list[Suggestion], dict[int, list[int]]]]:
+    """Generates the top `k` suggestions of a model for some users, without storing
+    them.
+
+    See `batch_create_papers_suggestions` for the arguments.
+
+    Yields:
+        tuple[list[Suggestion], dict[int, list[int]]]: Batches of up to
+        `SUGGESTIONS_BULK_SIZE` suggestions to store, and the suggested papers IDs
+        of their users, best first, for their feeds.
+    """
+    k = k or settings.SUGGESTIONS_PER_USER
+    suggestions: list[Suggestion] = []
+    feeds: dict[int, list[int]] = {}
+    recommendations = services.recommend_papers(
+        model,
+        users_ids,
+        k * settings.SUGGESTIONS_CANDIDATES_FACTOR if rerank else k,
+        batch_size=batch_size,
+    )
+    if rerank:
+        recommendations = services.rerank_papers(recommendations, k)
+
+    for user_id, papers in recommendations:
+        feeds[user_id] = [paper_id for paper_id, _ in papers]
+        suggestions.extend(
+            Suggestion(user_id=user_id, paper_id=paper_id, value=value, model=model)
+            for paper_id, value in papers
         )
+        if len(suggestions) >= SUGGESTIONS_BULK_SIZE:
+            yield suggestions, feeds
+            suggestions, feeds = [], {}
+
+    if suggestions or feeds:
+        yield suggestions, feeds
+
+
+@shared_task(name="create_papers_suggestions")
+def create_papers_suggestions(  # noqa: PLR0913
+    model_type: Model.TypeChoices,
+    users_ids: list[int] | None = None,
+    *,
+    k: int | None = None,
+    shard_size: int | None = None,
+    rerank: bool = True,
+    run_id: str | None = None,
+) -> str:
+    """Generates the suggestions of many users as a chord of shards of users.
+
+    The run and its shards are stored as checkpoints. Each shard is a task storing
+    the suggestions of a block of users with the model of the run, so the run
+    scales with the number of workers, and a final task reports the totals. A run
+    is resumed by its ID, dispatching again only the shards not finished yet.
+
+    Args:
+        model_type (Model.TypeChoices): The model type to use.
+        users_ids (list[int] | None, optional): The users to generate suggestions to.
+        Defaults to the users that interacted with the application recently.
+        k (int | None, optional): The number of suggestions for each user.
+        Defaults to the `SUGGESTIONS_PER_USER` setting.
+        shard_size (int | None, optional): The number of users of each shard.
+        Defaults to the `SUGGESTIONS_SHARD_SIZE` setting.
+        rerank (bool, optional): If the candidates are re-ranked. Defaults to True.
+        run_id (str | None, optional): The ID of a run to resume, whose params are
+        used instead of the others. Defaults to None.
 
-    count = 0
-    while count < max_papers:
-        suggestions: list[Suggestion] = []
-        for paper_id in papers_ids:
-            users_covered = recent_suggestions.get(paper_id, [])
-            for user_id in users_ids or []:
-                if user_id in users_covered:
-                    continue
-                suggestions.append(
-                    Suggestion(
-                        user_id=user_id,
-                        paper_id=paper_id,
-                        value=model.predict(user_id, paper_id),
-                        model=model,
-                    )
+    Raises:
+        ValueError: If the model is not found.
+
+    Returns:
+        str: The ID of the run.
+    """
+    if run_id is not None:
+        run = SuggestionsRun.objects.get(pk=run_id)
+    else:
+        model = services.load_latest_model(model_type)
+        if not model:
+            msg = "Model not found."
+            raise ValueError(msg)
+
+        if users_ids is None:
+            users_ids = User.objects.recent(ids_only=True)  # type: ignore[assignment]
+        users_ids = list(users_ids or [])
+        k = k or settings.SUGGESTIONS_PER_USER
+        shard_size = shard_size or settings.SUGGESTIONS_SHARD_SIZE
+        with transaction.atomic():
+            run = SuggestionsRun.objects.create(
+                model=model,
+                params={
+                    "k": k,
+                    "rerank": rerank,
+                },
+            )
+            SuggestionsShard.objects.bulk_create(
+                SuggestionsShard(
+                    run=run,
+                    number=number,
+                    users_ids=users_ids[start : start + shard_size],
                 )
-            count += 1
+                for number, start in enumerate(range(0, len(users_ids), shard_size))
+            )
 
-        Suggestion.objects.bulk_create(suggestions)
+    pending = list(
+        run.shards.filter(finished__isnull=True).values_list("pk", flat=True)
+    )
+    report = finish_papers_suggestions_run.si(str(run.pk))
+    if pending:
+        chord(create_papers_suggestions_shard.si(pk) for pk in pending)(report)
+    else:
+        report.delay()
+    return str(run.pk)
+
+
+@shared_task(
+    name="create_papers_suggestions_shard",
+    acks_late=True,
+    autoretry_for=(DatabaseError, OSError),
+    max_retries=settings.SUGGESTIONS_SHARD_MAX_RETRIES,
+    retry_backoff=True,
+)
+def create_papers_suggestions_shard(shard_id: int) -> int:
+    """Generates the suggestions of the users of a suggestions run shard.
+
+    The suggestions are generated first, then stored with the checkpoint in a
+    short transaction locking the shard, so a shard that failed starts over with
+    no duplicates, and a finished shard is skipped. The feeds of its users are
+    only replaced once the transaction is committed. Shards failing on database or
+    storage errors are retried with an exponential backoff, up to
+    `SUGGESTIONS_SHARD_MAX_RETRIES` times.
+
+    Args:
+        shard_id (int): The ID of the shard.
 
-        start += offset
-        end = start + offset
-        papers_ids = (
-            models.Paper.objects.all()
-            .popular()
-            .values_list("id", flat=True)[start : start + offset]
+    Raises:
+        ValueError: If the model of the run was deleted.
+
+    Returns:
+        int: The number of suggestions created or refreshed.
+    """
+    shard = SuggestionsShard.objects.select_related("run__model").get(pk=shard_id)
+    if shard.finished is not None:
+        return shard.created_suggestions or 0
+    if (run_model := shard.run.model) is None:
+        msg = "Model not found."
+        raise ValueError(msg)
+
+    start = time.perf_counter()
+    params = shard.run.params
+    batches = list(
+        generate_papers_suggestions(
+            services.load_model(run_model.type, run_model.pk),
+            shard.users_ids,
+            k=params["k"],
+            rerank=params["rerank"],
+        )
+    )
+
+    with transaction.atomic():
+        shard = SuggestionsShard.objects.select_for_update().get(pk=shard_id)
+        if shard.finished is not None:
+            return shard.created_suggestions or 0
+
+        shard.created_suggestions = sum(
+            Suggestion.objects.upsert(suggestions) for suggestions, _ in batches
+        )
+        shard.seconds = time.perf_counter() - start
+        shard.finished = timezone.now()
+        shard.save(update_fields=["created_suggestions", "seconds", "finished"])
+        feeds = {
+            user_id: papers_ids
+            for _, batch_feeds in batches
+            for user_id, papers_ids in batch_feeds.items()
+        }
+        transaction.on_commit(
+            partial(set_suggestions_feeds, feeds, run_model.pk), robust=True
         )
+    return shard.created_suggestions
+
+
+@shared_task(name="finish_papers_suggestions_run")
+def finish_papers_suggestions_run(run_id: str) -> SuggestionsRunReport:
+    """Reports the totals and timings of a suggestions run.
+
+    The run is marked as finished once all its shards are.
+
+    Args:
+        run_id (str): The ID of the run.
+
+    Returns:
+        SuggestionsRunReport: The shards and suggestions totals, and the durations.
+    """
+    run = SuggestionsRun.objects.get(pk=run_id)
+    totals = run.shards.aggregate(
+        shards=Count("pk"),
+        finished_shards=Count("pk", filter=Q(finished__isnull=False)),
+        suggestions=Sum("created_suggestions", default=0),
+        shards_seconds=Sum("seconds", default=0.0),
+    )
+    if run.finished is None and totals["finished_shards"] == totals["shards"]:
+        run.finished = timezone.now()
+        run.save(update_fields=["finished"])
+    return SuggestionsRunReport(
+        **totals,
+        seconds=((run.finished or timezone.now()) - run.created).total_seconds(),
+    )
 
 
 @shared_task(name="update_papers_position_embeddings")
-def update_papers_position_embeddings():
-    """Update the papers embeddings.
+def update_papers_position_embeddings(batch_size: int = PAPERS_INDEX_BATCH_SIZE) -> int:
+    """Update the papers embeddings, compacting their indexes.
+
+    The papers are indexed by their position in the IDs order. Only the IDs and
+    current indexes are read, and only the papers whose index changed are written,
+    with `bulk_update` in batches, which does not send the save signals.
+
+    Between compactions, new papers are appended by `allocate_papers_indexes` and
+    deleted papers leave gaps. It runs daily before the datasets are exported to
+    train new models, and models store the indexes they were trained on, so it
+    does not invalidate them.
+
+    Args:
+        batch_size (int, optional): The number of papers read and written at a
+        time. Defaults to `PAPERS_INDEX_BATCH_SIZE`.
 
     Returns:
         int: The number of papers updated.
     """
     updated = 0
-    for paper in (
-        models.Paper.objects.all()
-        .annotate(embedding_index=Window(DenseRank(), order_by=[F("id").asc()]))
-        .annotate(new_index=F("embedding_index") - 1)
+    changed: list[models.Paper] = []
+    papers = models.Paper.objects.order_by("id").values_list("id", "index")
+    for new_index, (paper_id, index) in enumerate(
+        papers.iterator(chunk_size=batch_size)
     ):
-        if paper.index != getattr(paper, "new_index", None):
-            paper.index = getattr(paper, "new_index", None)
-            paper.save()
-            updated += 1
+        if index != new_index:
+            changed.append(models.Paper(id=paper_id, index=new_index))
+        if len(changed) >= batch_size:
+            updated += models.Paper.objects.bulk_update(changed, ["index"])
+            changed = []
+
+    if changed:
+        updated += models.Paper.objects.bulk_update(changed, ["index"])
     return updated
+
+
+def allocate_papers_indexes(batch_size: int = PAPERS_INDEX_BATCH_SIZE) -> int:
+    """Append the papers with no embedding index after the last indexed paper.
+
+    The other papers indexes never change, so the deployed models remain valid.
+
+    Args:
+        batch_size (int, optional): The number of papers written at a time.
+        Defaults to `PAPERS_INDEX_BATCH_SIZE`.
+
+    Returns:
+        int: The number of papers indexed.
+    """
+    last_index = models.Paper.objects.aggregate(last_index=Max("index"))["last_index"]
+    next_index = 0 if last_index is None else last_index + 1
+    return models.Paper.objects.bulk_update(
+        [
+            models.Paper(id=paper_id, index=next_index + position)
+            for position, paper_id in enumerate(
+                models.Paper.objects.filter(index__isnull=True)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+        ],
+        ["index"],
+        batch_size=batch_size,
+    )
+
+
+@shared_task(name="reindex_papers_positions")
+def reindex_papers_positions() -> int | None:
+    """Index the new papers once papers are no longer being written.
+
+    Scheduled by `reindex.schedule_papers_reindex`, it waits again while papers
+    keep being written, up to the maximum delay.
+
+    Returns:
+        int | None: The number of papers updated, None if postponed.
+    """
+    if (delay := reindex.get_papers_reindex_delay()) > 0:
+        reindex_papers_positions.apply_async(countdown=delay)
+        return None
+
+    reindex.clear_papers_reindex()
+    return allocate_papers_indexes()
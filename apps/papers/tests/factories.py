@@ -1,4 +1,4 @@
-from factory import Faker, lazy_attribute_sequence, post_generation
+from factory import Faker, SubFactory, lazy_attribute_sequence, post_generation
 from factory.django import DjangoModelFactory
 from slugify import slugify
 
@@ -46,7 +46,7 @@ class PaperFactory(DjangoModelFactory):
     title = Faker("sentence")
     abstract = Faker("text")
     published = Faker("date")
-    location = LocationFactory()
+    location = SubFactory(LocationFactory)
     doi = Faker("isbn13")
     uri = Faker("url")
     pdf = Faker("file_path", extension="pdf")
@@ -0,0 +1,84 @@
+from unittest import mock
+
+import pytest
+from django.db import transaction
+
+from apps.papers import reindex, tasks
+from apps.papers.models import Paper
+from apps.papers.tests.factories import PaperFactory
+
+
+@pytest.fixture()
+def apply_async():
+    reindex.clear_papers_reindex()
+    with mock.patch.object(tasks.reindex_papers_positions, "apply_async") as patched:
+        yield patched
+    reindex.clear_papers_reindex()
+
+
+@pytest.fixture()
+def _debounce(settings):
+    settings.PAPERS_REINDEX_QUIET_SECONDS = 60
+    settings.PAPERS_REINDEX_MAX_DELAY_SECONDS = 600
+
+
+@pytest.mark.django_db()
+@pytest.mark.usefixtures("_debounce")
+class DescribeSchedulePapersReindex:
+    def it_schedules_a_single_reindex_for_many_writes(self, apply_async):
+        PaperFactory.create_batch(3)
+        Paper.objects.first().delete()
+
+        apply_async.assert_called_once_with(countdown=60)
+        assert 0 < reindex.get_papers_reindex_delay() <= 60  # noqa: PLR2004
+
+    def it_postpones_the_reindex_while_papers_are_written(self, apply_async):
+        PaperFactory.create()
+
+        assert tasks.reindex_papers_positions() is None
+        assert apply_async.call_count == 2  # noqa: PLR2004
+
+    def it_reindexes_once_after_a_suspension(self, apply_async):
+        with reindex.suspend_papers_reindex():
+            PaperFactory.create_batch(3)
+            apply_async.assert_not_called()
+
+        apply_async.assert_called_once()
+
+    def it_schedules_the_reindex_once_committed(
+        self, apply_async, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        monkeypatch.setattr(reindex, "on_commit", transaction.on_commit)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PaperFactory.create()
+            apply_async.assert_not_called()
+
+        apply_async.assert_called_once_with(countdown=60)
+
+
+@pytest.mark.django_db()
+class DescribeReindexPapersPositions:
+    def it_reindexes_when_papers_are_no_longer_written(self):
+        papers = PaperFactory.create_batch(2)
+        Paper.objects.update(index=None)
+        reindex.schedule_papers_reindex()
+
+        assert list(
+            Paper.objects.filter(pk__in=[paper.pk for paper in papers])
+            .order_by("id")
+            .values_list("index", flat=True)
+        ) == [0, 1]
+
+    def it_keeps_the_indexes_of_stale_papers_when_saved(self):
+        papers = PaperFactory.create_batch(3)
+        Paper.objects.update(index=None)
+        reindex.schedule_papers_reindex()
+
+        papers[-1].update_reviews(save=True)
+
+        assert list(
+            Paper.objects.filter(pk__in=[paper.pk for paper in papers])
+            .order_by("id")
+            .values_list("index", flat=True)
+        ) == [0, 1, 2]
@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.ml.models import Model
+from apps.ml.services import train_and_export_model
+from apps.papers.models import Paper
+from apps.papers.tasks import (
+    create_papers_suggestions,
+    export_paper_reviews_dataset,
+    export_papers_dataset,
+    update_papers_position_embeddings,
+    update_papers_reviews,
+)
+from apps.papers.tests.factories import PaperFactory
+from apps.reviews.tests.factories import ReviewFactory
+from apps.suggestions.feeds import get_feed_key
+from apps.suggestions.models import Suggestion, SuggestionsRun
+from apps.suggestions.tasks import clean_up_suggestions
+from apps.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db()
+class DescribeUpdatePapersReviews:
+    def it_aggregates_the_active_reviews_of_outdated_papers(self):
+        paper, reviewless_paper, updated_paper = PaperFactory.create_batch(3)
+        ReviewFactory.create(paper=paper, value=4)
+        ReviewFactory.create(paper=paper, value=5)
+        ReviewFactory.create(paper=paper, value=1, active=False)
+        ReviewFactory.create(paper=updated_paper, value=3)
+        Paper.objects.exclude(pk=updated_paper.pk).update(
+            reviews_average=None,
+            reviews_count=None,
+            score=None,
+            last_reviews_update=timezone.now() - timedelta(days=1),
+        )
+        Paper.objects.filter(pk=updated_paper.pk).update(reviews_count=None)
+
+        assert update_papers_reviews() == 2  # noqa: PLR2004
+
+        paper.refresh_from_db()
+        assert float(paper.reviews_average) == 4.5  # noqa: PLR2004
+        assert paper.reviews_count == 2  # noqa: PLR2004
+        assert paper.score == 9  # noqa: PLR2004
+        reviewless_paper.refresh_from_db()
+        assert reviewless_paper.reviews_average is None
+        assert reviewless_paper.reviews_count == 0
+        assert reviewless_paper.score == 0
+        updated_paper.refresh_from_db()
+        assert updated_paper.reviews_count is None
+
+    def it_updates_the_oldest_papers_first(self):
+        papers = PaperFactory.create_batch(3)
+        for days, paper in enumerate(papers, start=1):
+            Paper.objects.filter(pk=paper.pk).update(
+                last_reviews_update=timezone.now() - timedelta(days=days)
+            )
+
+        assert update_papers_reviews(count=2) == 2  # noqa: PLR2004
+
+        assert set(
+            Paper.objects.filter(reviews_count=0).values_list("pk", flat=True)
+        ) == {papers[1].pk, papers[2].pk}
+
+
+@pytest.mark.django_db()
+class DescribeUpdatePapersPositionEmbeddings:
+    def it_indexes_the_papers_by_id_in_batches(self):
+        papers = PaperFactory.create_batch(5)
+        Paper.objects.update(index=None)
+        Paper.objects.filter(pk=papers[0].pk).update(index=0)
+
+        assert update_papers_position_embeddings(batch_size=2) == 4  # noqa: PLR2004
+
+        assert list(Paper.objects.order_by("id").values_list("index", flat=True)) == [
+            0,
+            1,
+            2,
+            3,
+            4,
+        ]
+        assert update_papers_position_embeddings() == 0
+
+
+@pytest.mark.django_db()
+class DescribeCreatePapersSuggestions:
+    @pytest.fixture()
+    def users_ids(self) -> list[int]:
+        """Create reviews of a few users and train a model on them."""
+        users = UserFactory.create_batch(3)
+        papers = PaperFactory.create_batch(6)
+        for position, user in enumerate(users):
+            for paper in papers[: position + 2]:
+                ReviewFactory.create(user=user, paper=paper)
+        export_papers_dataset()
+        export_paper_reviews_dataset()
+        train_and_export_model(Model.TypeChoices.SVD, {"verbose": False})
+        return [user.pk for user in users]
+
+    def it_stores_the_suggestions_of_each_shard(self, users_ids: list[int]):
+        run_id = create_papers_suggestions(
+            Model.TypeChoices.SVD, users_ids, k=2, shard_size=2
+        )
+
+        run = SuggestionsRun.objects.get(pk=run_id)
+        assert run.finished is not None
+        assert [shard.users_ids for shard in run.shards.all()] == [
+            users_ids[:2],
+            users_ids[2:],
+        ]
+        assert Suggestion.objects.count() == sum(
+            run.shards.values_list("created_suggestions", flat=True)
+        )
+        assert Suggestion.objects.count() == len(users_ids) * 2
+
+    def it_writes_the_feeds_once_the_shards_are_committed(
+        self, users_ids: list[int], django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            create_papers_suggestions(
+                Model.TypeChoices.SVD, users_ids, k=2, shard_size=2
+            )
+            assert cache.get_many(map(get_feed_key, users_ids)) == {}
+
+        for callback in callbacks:
+            callback()
+        for user_id in users_ids:
+            assert set(cache.get(get_feed_key(user_id))["papers"]) == set(
+                Suggestion.objects.filter(user_id=user_id).values_list(
+                    "paper_id", flat=True
+                )
+            )
+
+    def it_resumes_the_shards_not_finished(self, users_ids: list[int]):
+        run_id = create_papers_suggestions(
+            Model.TypeChoices.SVD, users_ids, k=2, shard_size=2
+        )
+        run = SuggestionsRun.objects.get(pk=run_id)
+        failed = run.shards.get(number=1)
+        Suggestion.objects.filter(user_id__in=failed.users_ids).delete()
+        run.shards.filter(pk=failed.pk).update(finished=None)
+        SuggestionsRun.objects.filter(pk=run_id).update(finished=None)
+
+        create_papers_suggestions(Model.TypeChoices.SVD, run_id=run_id)
+
+        assert Suggestion.objects.count() == len(users_ids) * 2
+        assert not run.shards.filter(finished__isnull=True).exists()
+
+    def it_keeps_the_suggestions_made_again_by_a_new_model(self, users_ids: list[int]):
+        create_papers_suggestions(Model.TypeChoices.SVD, users_ids, k=2)
+        old_model = Model.objects.create(type=Model.TypeChoices.SVD)
+        Model.objects.filter(pk=old_model.pk).update(
+            created=timezone.now() - timedelta(days=1)
+        )
+        Suggestion.objects.update(model=old_model)
+        Suggestion.objects.filter(
+            pk__in=[
+                Suggestion.objects.filter(user_id=user_id).earliest("value").pk
+                for user_id in users_ids
+            ]
+        ).delete()
+
+        create_papers_suggestions(Model.TypeChoices.SVD, users_ids, k=2)
+
+        assert clean_up_suggestions()["deactivated"] == 0
+        assert Suggestion.objects.filter(active=True).count() == len(users_ids) * 2
+
+    def it_refreshes_the_suggestions_already_stored(self, users_ids: list[int]):
+        for _ in range(2):
+            create_papers_suggestions(Model.TypeChoices.SVD, users_ids, k=2)
+
+        assert Suggestion.objects.count() == len(users_ids) * 2
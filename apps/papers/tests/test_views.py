@@ -0,0 +1,116 @@
+from typing import Any
+
+import pytest
+from pytest_drf import (
+    AsAnonymousUser,
+    AsUser,
+    Returns200,
+    UsesGetMethod,
+    ViewSetTest,
+)
+from pytest_drf.util import url_for
+from pytest_lambda.fixtures import lambda_fixture
+
+from apps.ml.cache import models_cache
+from apps.ml.models import Model
+from apps.ml.services import train_and_export_model
+from apps.papers.models import Paper
+from apps.papers.tasks import export_paper_reviews_dataset, export_papers_dataset
+from apps.papers.tests.factories import PaperFactory
+from apps.suggestions.feeds import set_suggestions_feeds
+from apps.users.models import User
+
+
+class DescribePaperViewSet(ViewSetTest):
+    papers = lambda_fixture(lambda db: PaperFactory.create_batch(5))
+    paper = lambda_fixture(lambda papers: papers[0])
+
+    class CaseAnonymous(AsAnonymousUser):
+        class DescribeRelated(UsesGetMethod, Returns200):
+            url = lambda_fixture(
+                lambda paper: url_for("paper-related", uuid=paper.uuid)
+            )
+
+            @pytest.fixture()
+            def model(self, papers: list[Paper]) -> Model:
+                """Train a model of the related papers type on the papers."""
+                export_papers_dataset()
+                export_paper_reviews_dataset()
+                return train_and_export_model(
+                    Model.TypeChoices.TFIDF, {"min_df": 1, "max_df": 1.0}
+                )
+
+            def it_returns_the_related_papers_in_order(
+                self, model: Model, paper: Paper, json: list[dict[str, Any]]
+            ):
+                expected = [
+                    str(uuid)
+                    for uuid in Paper.objects.order_by_ids(
+                        model.get_related_papers(paper.pk)
+                    ).values_list("uuid", flat=True)
+                ]
+                assert [item["id"] for item in json] == expected
+
+            def it_does_not_load_the_model(
+                self, model: Model, json: list[dict[str, Any]]
+            ):
+                assert json
+                assert model.pk not in models_cache
+
+            def it_returns_nothing_with_no_model(self, json: list[dict[str, Any]]):
+                assert json == []
+
+    class CaseUser(AsUser("user")):
+        class DescribeSuggestions(UsesGetMethod, Returns200):
+            url = lambda_fixture(lambda: url_for("paper-suggestions"))
+
+            def it_lists_the_popular_papers_with_no_feed(
+                self, papers: list[Paper], json: dict[str, Any]
+            ):
+                assert json["count"] == len(papers)
+
+            @pytest.fixture()
+            def feed(self, user: User, papers: list[Paper]) -> list[Paper]:
+                """Store a feed of some of the papers for the user."""
+                feed = [papers[3], papers[1], papers[4]]
+                set_suggestions_feeds({user.pk: [paper.pk for paper in feed]}, None)
+                return feed
+
+            def it_returns_the_feed_papers_in_order(
+                self, feed: list[Paper], json: dict[str, Any]
+            ):
+                assert json["count"] == len(feed)
+                assert json["next"] is None
+                assert [item["id"] for item in json["results"]] == [
+                    str(paper.uuid) for paper in feed
+                ]
+
+            @pytest.fixture()
+            def _pages_of_two(self, settings) -> None:
+                settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "PAGE_SIZE": 2}
+
+            @pytest.mark.usefixtures("_pages_of_two")
+            def it_fetches_a_page_of_the_feed(
+                self, feed: list[Paper], json: dict[str, Any], client
+            ):
+                next_page = client.get(json["next"]).json()
+
+                assert json["count"] == len(feed)
+                assert [
+                    item["id"] for item in json["results"] + next_page["results"]
+                ] == [str(paper.uuid) for paper in feed]
+
+            def it_filters_the_page_papers(self, feed: list[Paper], client, url: str):
+                response = client.get(url, {"title": feed[1].title}).json()
+
+                assert response["count"] == len(feed)
+                assert [item["id"] for item in response["results"]] == [
+                    str(feed[1].uuid)
+                ]
+
+            def it_orders_the_page_papers(self, feed: list[Paper], client, url: str):
+                response = client.get(url, {"ordering": "title"})
+
+                assert [item["id"] for item in response.json()["results"]] == [
+                    str(paper.uuid) for paper in sorted(feed, key=lambda p: p.title)
+                ]
@@ -1,15 +1,24 @@
 from typing import override
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_access_policy import AccessViewSetMixin
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_extensions.mixins import DetailSerializerMixin
 
+from apps.ml.models import Model
 from apps.papers import filters, models, permissions, serializers
-from apps.suggestions.models import Suggestion
+from apps.suggestions.feeds import (
+    get_suggestions_feed,
+    paginate_suggestions_feed,
+)
 from common.utils.cache import vary_on_headers_with_default
 
 
@@ -56,30 +65,90 @@ class PaperViewSet(
     filterset_class = filters.PaperFilter
     ordering_fields = ["published", "title", "score", "reviews_average"]
 
-    def get_queryset_from_suggestions(self):
-        """Get the queryset from the papers suggestions for the user."""
-        suggestions_queryset = Suggestion.objects.filter(
-            user=self.request.user,
-            review__isnull=True,
-        )
-
-        self.request.session["total_new_suggestions"] = suggestions_queryset.count()
-
-        if suggestions_queryset.exists():
-            movies_ids = suggestions_queryset.order_by("-value").values_list(
-                "paper_id", flat=True
-            )
-            return models.Paper.objects.order_by_ids(movies_ids)
-        return models.Paper.objects.popular()
-
     @override
     def get_queryset(self):
         """Return the queryset for the view."""
         if self.action == "suggestions":
-            return self.get_queryset_from_suggestions()
+            return models.Paper.objects.popular()
+        if self.action == "related":
+            return models.Paper.objects.only("id", "uuid")
         return super().get_queryset()
 
     @action(detail=False, methods=["get"])
     def suggestions(self, request, *args, **kwargs):
-        """Get the list of suggestions for the user."""
-        return self.list(request, *args, **kwargs)
+        """Get the list of suggestions for the user.
+
+        They are read from the user feed, by cursor, and the popular papers are
+        listed instead while the user has no suggestions. Only the papers of the
+        page are fetched, so they are filtered and ordered like the papers list
+        within the page, and in the feed order by default.
+        """
+        feed = get_suggestions_feed(request.user.pk)
+        if not feed["papers"]:
+            return self.list(request, *args, **kwargs)
+
+        try:
+            papers_ids, next_cursor, previous_cursor = paginate_suggestions_feed(
+                feed, request.query_params.get("cursor"), api_settings.PAGE_SIZE
+            )
+        except ValueError as e:
+            raise NotFound(str(e)) from e
+
+        papers = list(
+            self.filter_queryset(
+                models.Paper.objects.filter(pk__in=papers_ids)
+                .select_related("location")
+                .prefetch_related("authors", "keywords")
+            )
+        )
+        if api_settings.ORDERING_PARAM not in request.query_params:
+            positions = {pk: position for position, pk in enumerate(papers_ids)}
+            papers.sort(key=lambda paper: positions[paper.pk])
+
+        serializer = self.get_serializer(papers, many=True)
+        url = request.build_absolute_uri()
+        return Response(
+            {
+                "count": len(feed["papers"]),
+                "next": next_cursor and replace_query_param(url, "cursor", next_cursor),
+                "previous": previous_cursor
+                and replace_query_param(url, "cursor", previous_cursor),
+                "results": serializer.data,
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def related(self, request, *args, **kwargs):
+        """Get the papers most similar to a paper.
+
+        They are precomputed with the latest model of the related papers type, and
+        cached for each version of the model.
+        """
+        paper = self.get_object()
+        # Only the related papers arrays are read, not the model nor its index
+        model = (
+            Model.objects.filter(type=settings.RELATED_PAPERS_MODEL_TYPE, latest=True)
+            .order_by("-created")
+            .only("pk", "related_file")
+            .first()
+        )
+        if model is None:
+            return Response([])
+
+        cache_key = f"papers:related:{model.pk}:{paper.pk}"
+        if (data := cache.get(cache_key)) is None:
+            related_ids = model.get_related_papers(paper.pk)
+            papers = (
+                models.Paper.objects.filter(pk__in=related_ids)
+                .select_related("location")
+                .prefetch_related("authors", "keywords")
+                .in_bulk()
+            )
+            serializer = serializers.PaperListSerializer(
+                [papers[pk] for pk in related_ids if pk in papers],
+                many=True,
+                context=self.get_serializer_context(),
+            )
+            data = list(serializer.data)
+            cache.set(cache_key, data, settings.RELATED_PAPERS_CACHE_TIMEOUT)
+        return Response(data)
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
 
 class ReviewsConfig(AppConfig):
@@ -16,3 +16,13 @@ class ReviewsConfig(AppConfig):
             sender=models.Review,
             dispatch_uid="deactivate_old_ratings",
         )
+        post_save.connect(
+            signals.add_review_to_paper,
+            sender=models.Review,
+            dispatch_uid="add_review_to_paper",
+        )
+        post_delete.connect(
+            signals.remove_review_from_paper,
+            sender=models.Review,
+            dispatch_uid="remove_review_from_paper",
+        )
@@ -1,7 +1,12 @@
+from typing import TYPE_CHECKING
+
 from django.db import models
 
 from apps.reviews.querysets import ReviewQuerySet
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 class ReviewManager(models.Manager):
     """Manager for the Review model."""
@@ -44,3 +49,22 @@ class ReviewManager(models.Manager):
             )
             .values("userId", "paperId", "rating", "createdAt")
         )
+
+    def to_dataset_schema(self) -> "pa.Schema":
+        """Return the types of the `to_dataset` columns.
+
+        It requires the `pyarrow` package.
+
+        Returns:
+            pyarrow.Schema: The ratings dataset schema.
+        """
+        import pyarrow as pa
+
+        return pa.schema(
+            [
+                pa.field("userId", pa.int64(), nullable=False),
+                pa.field("paperId", pa.int64(), nullable=False),
+                pa.field("rating", pa.int16(), nullable=False),
+                pa.field("createdAt", pa.timestamp("us", tz="UTC"), nullable=False),
+            ]
+        )
@@ -1,4 +1,7 @@
-from django.db import models
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import models, transaction
 
 
 class ReviewQuerySet(models.QuerySet):
@@ -13,12 +16,42 @@ class ReviewQuerySet(models.QuerySet):
         return self.filter(active=False)
 
     def activate(self):
-        """Activates the selected reviews."""
-        return self.update(active=True)
+        """Activates the selected reviews, adding them to their papers data."""
+        return self._set_active(active=True)
 
     def deactivate(self):
-        """Deactivates the selected reviews."""
-        return self.update(active=False)
+        """Deactivates the selected reviews, removing them from their papers data."""
+        return self._set_active(active=False)
+
+    def _set_active(self, *, active: bool) -> int:
+        """Set the selected reviews state and update their papers reviews data.
+
+        Args:
+            active (bool): The new state.
+
+        Returns:
+            int: The number of reviews whose state changed.
+        """
+        paper_model = apps.get_model("papers", "Paper")
+        sign = 1 if active else -1
+        with transaction.atomic():
+            changed = list(
+                self.filter(active=not active)
+                .select_for_update()
+                .order_by()
+                .values_list("pk", "paper_id", "value")
+            )
+            updated = self.model.objects.filter(
+                pk__in=[pk for pk, _, _ in changed]
+            ).update(active=active)
+
+            deltas: defaultdict[int, list[int]] = defaultdict(lambda: [0, 0])
+            for _, paper_id, value in changed:
+                deltas[paper_id][0] += sign
+                deltas[paper_id][1] += sign * value
+            for paper_id, (count, total) in deltas.items():
+                paper_model.objects.filter(pk=paper_id).add_reviews(count, total)
+        return updated
 
     def average(self):
         return self.aggregate(average=models.Avg("value"))["average"]
@@ -1,4 +1,6 @@
+from apps.papers.models import Paper
 from apps.reviews import models, querysets
+from apps.suggestions.feeds import delete_suggestions_feed
 from apps.suggestions.models import Suggestion
 
 
@@ -16,10 +18,7 @@ def deactivate_old_ratings(
                 )
                 .exclude(pk=instance.pk, active=True)
             )
-            if old_ratings_queryset.exists():
-                old_ratings_queryset.deactivate()
-                instance.active = True
-                instance.save()
+            old_ratings_queryset.deactivate()
         if (
             suggestion_queryset := Suggestion.objects.filter(
                 user=instance.user,
@@ -28,3 +27,27 @@ def deactivate_old_ratings(
             )
         ).exists():
             suggestion_queryset.update(review=instance)
+            delete_suggestions_feed(instance.user_id)
+
+
+def add_review_to_paper(
+    sender: type[models.Review], instance: models.Review, created, **kwargs
+):
+    """Keep the reviews data of the reviewed paper up to date."""
+    if kwargs.get("raw"):
+        return
+
+    papers = Paper.objects.filter(pk=instance.paper_id)
+    if not created:
+        # The previous value of the review is unknown
+        papers.update_reviews()
+    elif instance.active:
+        papers.add_reviews(1, instance.value)
+
+
+def remove_review_from_paper(
+    sender: type[models.Review], instance: models.Review, **kwargs
+):
+    """Remove a deleted review from the reviews data of its paper."""
+    if instance.active:
+        Paper.objects.filter(pk=instance.paper_id).add_reviews(-1, -instance.value)
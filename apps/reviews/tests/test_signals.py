@@ -0,0 +1,67 @@
+import pytest
+
+from apps.papers.models import Paper
+from apps.papers.tests.factories import PaperFactory
+from apps.reviews.models import Review
+from apps.reviews.tests.factories import ReviewFactory
+
+
+@pytest.fixture()
+def paper(db) -> Paper:
+    return PaperFactory.create()
+
+
+def assert_reviews_data(paper: Paper, count: int, total: float):
+    paper.refresh_from_db()
+    assert paper.reviews_count == count
+    assert paper.score == total
+    if count:
+        assert float(paper.reviews_average) == pytest.approx(total / count, abs=0.01)
+    else:
+        assert paper.reviews_average is None
+
+
+@pytest.mark.django_db()
+class DescribePapersReviewsData:
+    def it_adds_created_reviews(self, paper: Paper):
+        ReviewFactory.create(paper=paper, value=4)
+        ReviewFactory.create(paper=paper, value=5)
+        ReviewFactory.create(paper=paper, value=1, active=False)
+
+        assert_reviews_data(paper, 2, 9)
+
+    def it_replaces_the_previous_review_of_the_user(self, paper: Paper):
+        review = ReviewFactory.create(paper=paper, value=2)
+        ReviewFactory.create(paper=paper, value=5, user=review.user)
+
+        assert_reviews_data(paper, 1, 5)
+
+    def it_removes_deleted_reviews(self, paper: Paper):
+        ReviewFactory.create(paper=paper, value=4)
+        ReviewFactory.create(paper=paper, value=1).delete()
+
+        assert_reviews_data(paper, 1, 4)
+
+    def it_updates_activated_and_deactivated_reviews(self, paper: Paper):
+        reviews = ReviewFactory.create_batch(3, paper=paper, value=3)
+
+        assert Review.objects.filter(pk__in=[r.pk for r in reviews]).deactivate() == 3  # noqa: PLR2004
+        assert_reviews_data(paper, 0, 0)
+        assert Review.objects.filter(pk=reviews[0].pk).activate() == 1
+        assert Review.objects.filter(pk=reviews[0].pk).activate() == 0
+        assert_reviews_data(paper, 1, 3)
+
+    def it_recomputes_edited_reviews(self, paper: Paper):
+        review = ReviewFactory.create(paper=paper, value=4)
+        review.value = 2
+        review.save()
+
+        assert_reviews_data(paper, 1, 2)
+
+    def it_recomputes_counts_that_would_be_negative(self, paper: Paper):
+        kept, deleted = (ReviewFactory.create(paper=paper, value=4) for _ in range(2))
+        Paper.objects.filter(pk=paper.pk).update(reviews_count=0, score=0)
+
+        deleted.delete()
+
+        assert_reviews_data(paper, 1, kept.value)
@@ -1,5 +1,6 @@
 from typing import override
 
+from django.conf import settings
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_access_policy import AccessViewSetMixin
@@ -38,14 +39,10 @@ class ReviewViewSet(
         items_rated += 1
         self.request.session["items_rated"] = items_rated
 
-        start = self.request.session.get("total_new_suggestions", 0)
         if items_rated % 5 == 0:
             batch_create_papers_suggestions.delay(
+                settings.DEFAULT_MODEL_TYPE,
                 users_ids=[self.request.user.id],
-                start=start,
-                offset=25,
-                max=25,
-                use_suggestions_up_to_days=None,
             )
 
     @override
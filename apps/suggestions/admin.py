@@ -10,6 +10,7 @@ class SuggestionAdmin(admin.ModelAdmin):
         "user",
         "value",
         "created",
+        "updated",
         "did_rate",
         "active",
         "model",
@@ -18,4 +19,22 @@ class SuggestionAdmin(admin.ModelAdmin):
     search_fields = ("user__email", "paper__title", "paper__uuid", "model__id")
     ordering = ("created", "user__email", "value")
     date_hierarchy = "created"
-    readonly_fields = ("created", "model", "review", "user", "paper")
+    readonly_fields = ("created", "updated", "model", "review", "user", "paper")
+
+
+class SuggestionsShardInline(admin.TabularInline):
+    model = models.SuggestionsShard
+    fields = ("number", "created_suggestions", "seconds", "finished")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(models.SuggestionsRun)
+class SuggestionsRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "model", "created", "finished")
+    list_filter = ("created", "finished")
+    ordering = ("-created",)
+    date_hierarchy = "created"
+    readonly_fields = ("model", "params", "created", "finished")
+    inlines = (SuggestionsShardInline,)
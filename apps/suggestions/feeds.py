@@ -0,0 +1,142 @@
+"""Per-user feeds of the papers suggestions, kept in the default cache.
+
+A feed is the ranked IDs of the papers suggested to a user by the latest
+generation, stored as a single cache value along with the model that generated
+it, so a page of suggestions costs one cache read and one fetch of its papers. It
+is written when the suggestions are generated, dropped when the user reviews a
+suggested paper, and rebuilt from the suggestions table on the next read.
+"""
+
+import base64
+import binascii
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TypedDict
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.suggestions.models import Suggestion
+
+FEED_KEY = "suggestions:feed:{user_id}"
+
+
+class SuggestionsFeed(TypedDict):
+    """Papers suggested to a user, best first."""
+
+    model: str | None
+    papers: list[int]
+
+
+def get_feed_key(user_id: int) -> str:
+    """Return the cache key of the feed of a user."""
+    return FEED_KEY.format(user_id=user_id)
+
+
+def set_suggestions_feeds(
+    papers_ids: Mapping[int, Sequence[int]], model_id: UUID | None
+) -> None:
+    """Replace the feeds of some users, in a single cache write.
+
+    Args:
+        papers_ids (Mapping[int, Sequence[int]]): The suggested papers IDs of each
+        user, best first.
+        model_id (UUID | None): The ID of the model that suggested them.
+    """
+    model = None if model_id is None else str(model_id)
+    cache.set_many(
+        {
+            get_feed_key(user_id): SuggestionsFeed(model=model, papers=list(papers))
+            for user_id, papers in papers_ids.items()
+        },
+        timeout=settings.SUGGESTIONS_FEED_TIMEOUT,
+    )
+
+
+def delete_suggestions_feed(user_id: int) -> None:
+    """Drop the feed of a user, to be rebuilt on the next read."""
+    cache.delete(get_feed_key(user_id))
+
+
+def delete_suggestions_feeds(users_ids: Iterable[int]) -> None:
+    """Drop the feeds of some users, in a single cache write."""
+    cache.delete_many([get_feed_key(user_id) for user_id in users_ids])
+
+
+def get_suggestions_feed(user_id: int) -> SuggestionsFeed:
+    """Return the feed of a user, rebuilding it from its stored suggestions if needed.
+
+    Args:
+        user_id (int): The user ID.
+
+    Returns:
+        SuggestionsFeed: The feed, with the best `SUGGESTIONS_PER_USER` active
+        suggestions not reviewed yet when rebuilt.
+    """
+    if (feed := cache.get(get_feed_key(user_id))) is not None:
+        return feed
+
+    suggestions = list(
+        Suggestion.objects.filter(user_id=user_id, review__isnull=True, active=True)
+        .order_by("-value")
+        .values_list("paper_id", "model_id")[: settings.SUGGESTIONS_PER_USER]
+    )
+    feed = SuggestionsFeed(
+        model=str(suggestions[0][1]) if suggestions else None,
+        papers=[paper_id for paper_id, _ in suggestions],
+    )
+    cache.set(get_feed_key(user_id), feed, timeout=settings.SUGGESTIONS_FEED_TIMEOUT)
+    return feed
+
+
+def encode_cursor(feed: SuggestionsFeed, position: int) -> str:
+    """Return an opaque cursor to a position of a feed."""
+    return base64.urlsafe_b64encode(f"{feed['model']}:{position}".encode()).decode()
+
+
+def decode_cursor(feed: SuggestionsFeed, cursor: str | None) -> int:
+    """Return the position of a cursor in a feed.
+
+    A cursor of a previous feed, generated by another model, restarts at the top.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    if not cursor:
+        return 0
+    try:
+        model, position = base64.urlsafe_b64decode(cursor).decode().rsplit(":", 1)
+        position_number = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        msg = "Invalid cursor."
+        raise ValueError(msg) from e
+    if position_number < 0:
+        msg = "Invalid cursor."
+        raise ValueError(msg)
+    return position_number if model == str(feed["model"]) else 0
+
+
+def paginate_suggestions_feed(
+    feed: SuggestionsFeed, cursor: str | None, page_size: int
+) -> tuple[list[int], str | None, str | None]:
+    """Return a page of a feed.
+
+    Args:
+        feed (SuggestionsFeed): The feed.
+        cursor (str | None): The cursor of the page, None for the first one.
+        page_size (int): The number of papers of each page.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+
+    Returns:
+        tuple[list[int], str | None, str | None]: The papers IDs of the page, and
+        the cursors of the next and previous pages, if any.
+    """
+    start = decode_cursor(feed, cursor)
+    end = start + page_size
+    return (
+        feed["papers"][start:end],
+        encode_cursor(feed, end) if end < len(feed["papers"]) else None,
+        encode_cursor(feed, max(start - page_size, 0)) if start > 0 else None,
+    )
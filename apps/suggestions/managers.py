@@ -1,30 +1,126 @@
+from datetime import datetime
+
 from django.db import models
 from django.utils import timezone
 
+SUGGESTIONS_DATASET_FIELDNAMES = ["userId", "paperId", "modelId", "value", "createdAt"]
+
 
 class SuggestionManager(models.Manager):
     """Manager for the Suggestion model."""
 
     def recent(
         self,
-        papers_ids: list[int],
+        papers_ids: list[int] | None,
         users_ids: list[int],
         days: int = 7,
     ):
-        """Return recently created suggestions of the specified papers
+        """Return recently made suggestions of the specified papers
         for the given users.
 
+        A suggestion is made again each time it is refreshed by `upsert`.
+
         Args:
-            papers_ids (list[int]): The papers IDs.
+            papers_ids (list[int] | None): The papers IDs. If None, the
+            suggestions of every paper are returned.
             users_ids (list[int]): The users IDs.
             days (int, optional): The number of days to consider. Defaults to 7.
 
         Returns:
             QuerySet: The suggestions queryset.
         """
-        return self.get_queryset().filter(
-            paper_id__in=papers_ids,
+        queryset = self.get_queryset()
+        if papers_ids is not None:
+            queryset = queryset.filter(paper_id__in=papers_ids)
+        return queryset.filter(
             user_id__in=users_ids,
             active=True,
-            created__gte=timezone.now() - timezone.timedelta(days=days),
+            updated__gte=timezone.now() - timezone.timedelta(days=days),
+        )
+
+    def upsert(self, suggestions: list, batch_size: int | None = None) -> int:
+        """Create suggestions, refreshing in place the existing ones.
+
+        A suggestion of a paper already suggested to the user updates its value,
+        model and update date, and is activated again, so there is a single
+        suggestion per user and paper.
+
+        Args:
+            suggestions (list[Suggestion]): The suggestions, at most one for each
+            user and paper.
+            batch_size (int | None, optional): The number of suggestions written by
+            each query. Defaults to all at once.
+
+        Returns:
+            int: The number of suggestions created or refreshed.
+        """
+        return len(
+            self.bulk_create(
+                suggestions,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["user", "paper"],
+                update_fields=["value", "model", "active", "updated"],
+            )
+        )
+
+    def superseded(self) -> models.QuerySet:
+        """Return the active suggestions replaced by the ones of a newer model.
+
+        They are the suggestions not reviewed yet of models older than the newest
+        model of the user active suggestions.
+
+        Returns:
+            QuerySet: The superseded suggestions queryset.
+        """
+        newest_model = (
+            self.filter(user=models.OuterRef("user"), active=True, model__isnull=False)
+            .order_by("-model__created")
+            .values("model__created")[:1]
+        )
+        return self.filter(
+            active=True,
+            review__isnull=True,
+            model__created__lt=models.Subquery(newest_model),
         )
+
+    def expired(self, days: int, now: datetime | None = None) -> models.QuerySet:
+        """Return the inactive suggestions last made more than `days` days ago.
+
+        The reviewed suggestions are kept, as the record of what was suggested.
+
+        Args:
+            days (int): The number of days to retain the inactive suggestions.
+            now (datetime | None, optional): The date the days are counted from.
+            Defaults to the current date.
+
+        Returns:
+            QuerySet: The expired suggestions queryset.
+        """
+        return self.filter(
+            active=False,
+            review__isnull=True,
+            updated__lt=(now or timezone.now()) - timezone.timedelta(days=days),
+        )
+
+    def to_dataset(self, queryset: models.QuerySet | None = None) -> models.QuerySet:
+        """Generates a dataset with suggestions, to archive them.
+
+        The dataset is generated as a values queryset with the
+        `SUGGESTIONS_DATASET_FIELDNAMES` columns.
+
+        Args:
+            queryset (QuerySet | None, optional): The suggestions. Defaults to all.
+
+        Returns:
+            QuerySet: The suggestions dataset (as a values queryset).
+        """
+        queryset = self.get_queryset() if queryset is None else queryset
+        return queryset.annotate(
+            **{  # noqa: PIE804
+                "userId": models.F("user_id"),
+                "paperId": models.F("paper_id"),
+                "modelId": models.F("model_id"),
+                "createdAt": models.F("created"),
+            }
+        ).values(*SUGGESTIONS_DATASET_FIELDNAMES)
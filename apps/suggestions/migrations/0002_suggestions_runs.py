@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:40
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ml', '0006_model_related_file'),
+        ('suggestions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuggestionsRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('params', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Parameters of the suggestions generation')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('model', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='ml.model')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SuggestionsShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('users_ids', models.JSONField(default=list)),
+                ('created_suggestions', models.PositiveIntegerField(blank=True, null=True)),
+                ('seconds', models.FloatField(blank=True, help_text='Duration of the shard generation', null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='suggestions.suggestionsrun')),
+            ],
+            options={
+                'ordering': ['run', 'number'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='suggestionsshard',
+            constraint=models.UniqueConstraint(fields=('run', 'number'), name='unique_suggestions_shard'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def delete_duplicate_suggestions(apps, schema_editor):
+    """Keep a single suggestion per user and paper, the reviewed or latest one."""
+    Suggestion = apps.get_model("suggestions", "Suggestion")
+    duplicates = (
+        Suggestion.objects.values("user_id", "paper_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        suggestions_ids = list(
+            Suggestion.objects.filter(
+                user_id=duplicate["user_id"], paper_id=duplicate["paper_id"]
+            )
+            .order_by("review__isnull", "-created")
+            .values_list("id", flat=True)
+        )
+        Suggestion.objects.filter(id__in=suggestions_ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0002_suggestions_runs'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_suggestions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='suggestion',
+            constraint=models.UniqueConstraint(fields=('user', 'paper'), name='unique_user_paper_suggestion'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:40
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def set_updated_to_created(apps, schema_editor):
+    """Date the existing suggestions updates with their creation."""
+    Suggestion = apps.get_model("suggestions", "Suggestion")
+    Suggestion.objects.update(updated=F("created"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0003_unique_user_paper_suggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestion',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='When the paper was last suggested to the user'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_updated_to_created, migrations.RunPython.noop),
+    ]
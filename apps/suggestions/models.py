@@ -1,7 +1,9 @@
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 from apps.suggestions import managers
 
@@ -15,6 +17,9 @@ class Suggestion(models.Model):
     )
     value = models.FloatField(null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(
+        auto_now=True, help_text=_("When the paper was last suggested to the user")
+    )
     review = models.ForeignKey(
         "reviews.Review",
         on_delete=models.PROTECT,
@@ -30,6 +35,13 @@ class Suggestion(models.Model):
 
     objects: managers.SuggestionManager = managers.SuggestionManager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "paper"], name="unique_user_paper_suggestion"
+            )
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.paper}"
 
@@ -37,3 +49,53 @@ class Suggestion(models.Model):
     def did_rate(self):
         """Returns the date when the user rated the suggested content."""
         return self.review.created if self.review else None
+
+
+class SuggestionsRun(models.Model):
+    """Model to represent a generation of suggestions, split in shards of users."""
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    model = models.ForeignKey("ml.Model", on_delete=models.SET_NULL, null=True)
+    params = models.JSONField(
+        help_text=_("Parameters of the suggestions generation"),
+        encoder=DjangoJSONEncoder,
+        default=dict,
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+
+    def __str__(self):
+        return f"{self.model_id} - {self.created}"
+
+
+class SuggestionsShard(models.Model):
+    """Model to represent a block of users of a suggestions run.
+
+    It is a checkpoint: once finished, the suggestions of its users are stored and
+    it is skipped when the run is resumed.
+    """
+
+    run = models.ForeignKey(
+        SuggestionsRun, on_delete=models.CASCADE, related_name="shards"
+    )
+    number = models.PositiveIntegerField()
+    users_ids = models.JSONField(default=list)
+    created_suggestions = models.PositiveIntegerField(null=True, blank=True)
+    seconds = models.FloatField(
+        help_text=_("Duration of the shard generation"), null=True, blank=True
+    )
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run", "number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "number"], name="unique_suggestions_shard"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.run_id} - {self.number}"
@@ -0,0 +1,91 @@
+from collections.abc import Iterator
+from typing import TypedDict
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.exports.models import Export
+from apps.suggestions.feeds import delete_suggestions_feeds
+from apps.suggestions.managers import SUGGESTIONS_DATASET_FIELDNAMES
+from apps.suggestions.models import Suggestion
+
+
+class SuggestionsCleanUpReport(TypedDict):
+    """Results of a suggestions clean up."""
+
+    deactivated: int
+    archived: int
+    deleted: int
+
+
+def _in_chunks(queryset: QuerySet, batch_size: int) -> Iterator[list]:
+    """Yield the IDs of a queryset by chunks, until it matches no rows.
+
+    The caller must make the rows of each chunk stop matching the queryset.
+    """
+    while ids := list(queryset.values_list("pk", flat=True)[:batch_size]):
+        yield ids
+
+
+@shared_task(name="clean_up_suggestions")
+def clean_up_suggestions(
+    days: int | None = None,
+    *,
+    batch_size: int | None = None,
+    archive: bool | None = None,
+) -> SuggestionsCleanUpReport:
+    """Deactivates the superseded suggestions, and deletes the expired ones.
+
+    The suggestions are updated and deleted in chunks of `batch_size` rows, each
+    one a short query, so the table is never locked for long. The feeds of the
+    users whose suggestions are deactivated are dropped, and the expired
+    suggestions are counted from a single date, so the ones archived are the
+    ones deleted.
+
+    Args:
+        days (int | None, optional): The number of days to retain the inactive
+        suggestions. Defaults to the `SUGGESTIONS_RETENTION_DAYS` setting.
+        batch_size (int | None, optional): The number of suggestions updated or
+        deleted at a time. Defaults to the `SUGGESTIONS_RETENTION_BATCH_SIZE`
+        setting.
+        archive (bool | None, optional): If the expired suggestions are exported
+        before being deleted. Defaults to the `SUGGESTIONS_ARCHIVE` setting.
+
+    Returns:
+        SuggestionsCleanUpReport: The numbers of suggestions deactivated, archived
+        and deleted.
+    """
+    days = settings.SUGGESTIONS_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or settings.SUGGESTIONS_RETENTION_BATCH_SIZE
+    archive = settings.SUGGESTIONS_ARCHIVE if archive is None else archive
+
+    deactivated = 0
+    for ids in _in_chunks(Suggestion.objects.superseded(), batch_size):
+        chunk = Suggestion.objects.filter(pk__in=ids)
+        users_ids = set(chunk.values_list("user_id", flat=True))
+        deactivated += chunk.update(active=False)
+        delete_suggestions_feeds(users_ids)
+
+    expired = Suggestion.objects.expired(days, now=timezone.now())
+    archived = 0
+    if archive:
+        archived = (
+            Export.from_dataset(
+                Suggestion.objects.to_dataset(expired),
+                fieldnames=SUGGESTIONS_DATASET_FIELDNAMES,
+                filename="suggestions_archive",
+                content_type=ContentType.objects.get_for_model(Suggestion),
+            ).rows
+            or 0
+        )
+
+    deleted = 0
+    for ids in _in_chunks(expired, batch_size):
+        deleted += Suggestion.objects.filter(pk__in=ids).delete()[0]
+
+    return SuggestionsCleanUpReport(
+        deactivated=deactivated, archived=archived, deleted=deleted
+    )
@@ -0,0 +1,88 @@
+import pytest
+
+from apps.ml.models import Model
+from apps.papers.tests.factories import PaperFactory
+from apps.reviews.tests.factories import ReviewFactory
+from apps.suggestions.feeds import (
+    SuggestionsFeed,
+    encode_cursor,
+    get_suggestions_feed,
+    paginate_suggestions_feed,
+    set_suggestions_feeds,
+)
+from apps.suggestions.models import Suggestion
+from apps.users.models import User
+
+
+class DescribePaginateSuggestionsFeed:
+    feed = SuggestionsFeed(model="model", papers=[5, 4, 3, 2, 1])
+
+    def it_walks_the_feed_by_cursor(self):
+        first, next_cursor, previous_cursor = paginate_suggestions_feed(
+            self.feed, None, 2
+        )
+        second, last_cursor, first_cursor = paginate_suggestions_feed(
+            self.feed, next_cursor, 2
+        )
+        last, end_cursor, _ = paginate_suggestions_feed(self.feed, last_cursor, 2)
+
+        assert (first, second, last) == ([5, 4], [3, 2], [1])
+        assert previous_cursor is None
+        assert end_cursor is None
+        assert paginate_suggestions_feed(self.feed, first_cursor, 2)[0] == first
+
+    def it_restarts_the_cursors_of_other_models(self):
+        cursor = encode_cursor(SuggestionsFeed(model="old", papers=[]), 2)
+
+        assert paginate_suggestions_feed(self.feed, cursor, 2)[0] == [5, 4]
+
+    @pytest.mark.parametrize("cursor", ["invalid", encode_cursor(feed, -1)])
+    def it_rejects_invalid_cursors(self, cursor: str):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            paginate_suggestions_feed(self.feed, cursor, 2)
+
+
+@pytest.mark.django_db()
+class DescribeGetSuggestionsFeed:
+    def it_returns_the_stored_feed(self, user: User):
+        model = Model.objects.create(type=Model.TypeChoices.SVD)
+        set_suggestions_feeds({user.pk: [3, 2, 1]}, model.pk)
+
+        assert get_suggestions_feed(user.pk) == {
+            "model": str(model.pk),
+            "papers": [3, 2, 1],
+        }
+
+    def it_rebuilds_the_feed_once_a_suggestion_is_reviewed(self, user: User):
+        model = Model.objects.create(type=Model.TypeChoices.SVD)
+        best, reviewed, worst = (
+            Suggestion.objects.create(
+                user=user, paper=PaperFactory(), model=model, value=value
+            )
+            for value in (3, 2, 1)
+        )
+        set_suggestions_feeds(
+            {user.pk: [best.paper_id, reviewed.paper_id, worst.paper_id]}, model.pk
+        )
+
+        ReviewFactory.create(user=user, paper=reviewed.paper)
+
+        assert get_suggestions_feed(user.pk) == {
+            "model": str(model.pk),
+            "papers": [best.paper_id, worst.paper_id],
+        }
+
+    def it_rebuilds_the_feed_with_the_best_suggestions(self, user: User, settings):
+        settings.SUGGESTIONS_PER_USER = 2
+        model = Model.objects.create(type=Model.TypeChoices.SVD)
+        suggestions = [
+            Suggestion.objects.create(
+                user=user, paper=PaperFactory(), model=model, value=value
+            )
+            for value in (1, 3, 2)
+        ]
+
+        assert get_suggestions_feed(user.pk)["papers"] == [
+            suggestions[1].paper_id,
+            suggestions[2].paper_id,
+        ]
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.exports.models import Export
+from apps.ml.models import Model
+from apps.papers.tests.factories import PaperFactory
+from apps.reviews.tests.factories import ReviewFactory
+from apps.suggestions.feeds import get_feed_key, set_suggestions_feeds
+from apps.suggestions.models import Suggestion
+from apps.suggestions.tasks import clean_up_suggestions
+from apps.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db()
+class DescribeCleanUpSuggestions:
+    @pytest.fixture()
+    def models(self) -> tuple[Model, Model]:
+        """Create an old and a new model."""
+        old_model, new_model = (
+            Model.objects.create(type=Model.TypeChoices.SVD) for _ in range(2)
+        )
+        Model.objects.filter(pk=old_model.pk).update(
+            created=timezone.now() - timedelta(days=1)
+        )
+        return old_model, new_model
+
+    def it_deactivates_the_suggestions_of_older_models(
+        self, models: tuple[Model, Model]
+    ):
+        old_model, new_model = models
+        user, other_user = UserFactory.create_batch(2)
+        superseded, reviewed, current, other = (
+            Suggestion.objects.create(user=user, paper=PaperFactory(), model=old_model),
+            Suggestion.objects.create(user=user, paper=PaperFactory(), model=old_model),
+            Suggestion.objects.create(user=user, paper=PaperFactory(), model=new_model),
+            Suggestion.objects.create(
+                user=other_user, paper=PaperFactory(), model=old_model
+            ),
+        )
+        reviewed.review = ReviewFactory.create(user=user, paper=reviewed.paper)
+        reviewed.save()
+        set_suggestions_feeds(
+            {user.pk: [superseded.paper_id], other_user.pk: [other.paper_id]},
+            new_model.pk,
+        )
+
+        report = clean_up_suggestions(batch_size=1)
+
+        assert report["deactivated"] == 1
+        assert set(
+            Suggestion.objects.filter(active=True).values_list("pk", flat=True)
+        ) == {
+            reviewed.pk,
+            current.pk,
+            other.pk,
+        }
+        assert not Suggestion.objects.get(pk=superseded.pk).active
+        assert cache.get(get_feed_key(user.pk)) is None
+        assert cache.get(get_feed_key(other_user.pk)) is not None
+
+    def it_archives_and_deletes_the_expired_suggestions(self):
+        user = UserFactory.create()
+        expired, retained = (
+            Suggestion.objects.create(user=user, paper=PaperFactory(), active=False)
+            for _ in range(2)
+        )
+        Suggestion.objects.filter(pk=expired.pk).update(
+            updated=timezone.now() - timedelta(days=40)
+        )
+
+        report = clean_up_suggestions(30, batch_size=1, archive=True)
+
+        assert report == {"deactivated": 0, "archived": 1, "deleted": 1}
+        assert list(Suggestion.objects.values_list("pk", flat=True)) == [retained.pk]
+        assert Export.objects.get().rows == 1
+
+    def it_retains_the_suggestions_made_again(self):
+        user = UserFactory.create()
+        suggestion = Suggestion.objects.create(
+            user=user, paper=PaperFactory(), active=False
+        )
+        Suggestion.objects.filter(pk=suggestion.pk).update(
+            created=timezone.now() - timedelta(days=40),
+            updated=timezone.now() - timedelta(days=40),
+        )
+
+        Suggestion.objects.upsert(
+            [Suggestion(user=user, paper_id=suggestion.paper_id, value=1)]
+        )
+        assert Suggestion.objects.recent(None, [user.pk]).count() == 1
+        Suggestion.objects.filter(pk=suggestion.pk).update(active=False)
+
+        assert clean_up_suggestions(30)["deleted"] == 0
@@ -9,7 +9,7 @@ from apps.suggestions import models, permissions, serializers
 class SuggestionViewSet(AccessViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """List, and retrieve your paper suggestions."""
 
-    queryset = models.Suggestion.objects.all().prefetch_related("paper")
+    queryset = models.Suggestion.objects.filter(active=True).prefetch_related("paper")
     serializer_class = serializers.SuggestionSerializer
     access_policy = permissions.SuggestionAccessPolicy
     ordering = ["-created", "-value"]
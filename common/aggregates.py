@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class StringAgg(models.Aggregate):
+    """Concatenates the values of a group into a string, separated by a delimiter.
+
+    It is `STRING_AGG` on PostgreSQL and `GROUP_CONCAT` on SQLite.
+    """
+
+    function = "STRING_AGG"
+    output_field = models.TextField()
+
+    def __init__(self, expression, delimiter: str, **extra) -> None:
+        """Initializes the aggregate.
+
+        Args:
+            expression: The values to concatenate.
+            delimiter (str): The separator of the values.
+        """
+        super().__init__(expression, models.Value(delimiter), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function="GROUP_CONCAT", **extra_context
+        )
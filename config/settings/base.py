@@ -241,6 +241,66 @@ LOGGING = {
 # Machine Learning
 # ------------------------------------------------------------------------------
 DEFAULT_MODEL_TYPE = env("DEFAULT_MODEL_TYPE", default="svd")
+# Models covering less papers than that are searched exhaustively, with no index.
+ML_INDEX_MIN_PAPERS = env.int("ML_INDEX_MIN_PAPERS", default=100_000)
+# Number of index lists scanned by each search, more lists means better recall.
+ML_INDEX_N_PROBE = env.int("ML_INDEX_N_PROBE", default=8)
+# Number of loaded models kept in memory by each process.
+ML_MODELS_CACHE_SIZE = env.int("ML_MODELS_CACHE_SIZE", default=2)
+# Local directory where the models arrays are extracted to be memory-mapped.
+ML_MODELS_LOCAL_DIR = env("ML_MODELS_LOCAL_DIR", default="/tmp/ml-models")  # noqa: S108
+# Number of processes evaluating the cross-validation folds, -1 for all the cores.
+ML_TRAINING_N_JOBS = env.int("ML_TRAINING_N_JOBS", default=-1)
+# Type of the models whose latest one serves the related papers of each paper.
+RELATED_PAPERS_MODEL_TYPE = env("RELATED_PAPERS_MODEL_TYPE", default="tfidf")
+# Number of related papers precomputed for each paper when training these models.
+RELATED_PAPERS_COUNT = env.int("RELATED_PAPERS_COUNT", default=20)
+# Seconds the related papers of each paper are cached, for each model.
+RELATED_PAPERS_CACHE_TIMEOUT = env.int(
+    "RELATED_PAPERS_CACHE_TIMEOUT", default=60 * 60 * 24
+)
+
+# Suggestions
+# ------------------------------------------------------------------------------
+# Weights of the scores blended to re-rank the suggestions candidates: the model
+# scores, the papers popularity and recency, and the keywords diversity (MMR).
+SUGGESTIONS_RERANKING_WEIGHTS = {
+    "model": env.float("SUGGESTIONS_MODEL_WEIGHT", default=1.0),
+    "popularity": env.float("SUGGESTIONS_POPULARITY_WEIGHT", default=0.1),
+    "recency": env.float("SUGGESTIONS_RECENCY_WEIGHT", default=0.1),
+    "diversity": env.float("SUGGESTIONS_DIVERSITY_WEIGHT", default=0.2),
+}
+# Age in days halving the recency score of a paper.
+SUGGESTIONS_RECENCY_HALF_LIFE_DAYS = env.int(
+    "SUGGESTIONS_RECENCY_HALF_LIFE_DAYS", default=365
+)
+# Number of papers suggested to each user, and listed in their feeds.
+SUGGESTIONS_PER_USER = env.int("SUGGESTIONS_PER_USER", default=50)
+# Number of candidates scored for each suggestion, then re-ranked.
+SUGGESTIONS_CANDIDATES_FACTOR = env.int("SUGGESTIONS_CANDIDATES_FACTOR", default=3)
+# Number of users of each shard of the suggestions runs, each one a Celery task.
+SUGGESTIONS_SHARD_SIZE = env.int("SUGGESTIONS_SHARD_SIZE", default=1000)
+# Number of times a shard failing on database or storage errors is retried.
+SUGGESTIONS_SHARD_MAX_RETRIES = env.int("SUGGESTIONS_SHARD_MAX_RETRIES", default=3)
+# Number of days the inactive suggestions are retained before being deleted...
+SUGGESTIONS_RETENTION_DAYS = env.int("SUGGESTIONS_RETENTION_DAYS", default=30)
+# ...by chunks of this number of rows, each one a short query.
+SUGGESTIONS_RETENTION_BATCH_SIZE = env.int(
+    "SUGGESTIONS_RETENTION_BATCH_SIZE", default=5000
+)
+# If the deleted suggestions are exported first.
+SUGGESTIONS_ARCHIVE = env.bool("SUGGESTIONS_ARCHIVE", default=False)
+# Seconds the users feeds of suggestions are cached, rebuilt from the table after.
+SUGGESTIONS_FEED_TIMEOUT = env.int("SUGGESTIONS_FEED_TIMEOUT", default=60 * 60 * 48)
+
+# Papers
+# ------------------------------------------------------------------------------
+# Papers positions are reindexed once no paper was written for this long...
+PAPERS_REINDEX_QUIET_SECONDS = env.int("PAPERS_REINDEX_QUIET_SECONDS", default=60)
+# ...or at most this long after the first write.
+PAPERS_REINDEX_MAX_DELAY_SECONDS = env.int(
+    "PAPERS_REINDEX_MAX_DELAY_SECONDS", default=10 * 60
+)
 
 # Celery
 # ------------------------------------------------------------------------------
@@ -278,16 +338,16 @@ CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_TASK_SEND_SENT_EVENT = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-beat_schedule
 CELERY_BEAT_SCHEDULE = {
-    "update_outdated_papers_reviews_every_10_min": {
+    "update_outdated_papers_reviews_daily": {
         "task": "update_papers_reviews_outdated",
-        "schedule": 60 * 10,
+        "schedule": crontab(hour=0, minute=30),
     },
     "update_papers_indexes_daily": {
         "task": "update_papers_position_embeddings",
         "schedule": crontab(hour=1, minute=0),
     },
-    "export_movie_ratings_dataset_daily": {
-        "task": "export_movie_ratings_dataset",
+    "export_papers_dataset_daily": {
+        "task": "export_papers_dataset",
         "schedule": crontab(hour=1, minute=15),
     },
     "export_paper_reviews_dataset_daily": {
@@ -296,14 +356,29 @@ CELERY_BEAT_SCHEDULE = {
     },
     "train_and_export_paper_recommendation_model_daily": {
         "task": "train_and_export_new_model",
-        "schedule": crontab(hour=3, minute=0),
+        "schedule": crontab(hour=3, minute=0, day_of_week="1-6"),
+        "args": [DEFAULT_MODEL_TYPE],
+        "kwargs": {"warm_start": True},
+    },
+    "train_and_export_paper_recommendation_model_weekly": {
+        "task": "train_and_export_new_model",
+        "schedule": crontab(hour=3, minute=0, day_of_week=0),
         "args": [DEFAULT_MODEL_TYPE],
     },
-    "batch_create_papers_suggestions_daily": {
-        "task": "batch_create_papers_suggestions",
+    "train_and_export_related_papers_model_daily": {
+        "task": "train_and_export_new_model",
+        "schedule": crontab(hour=3, minute=45),
+        "args": [RELATED_PAPERS_MODEL_TYPE],
+    },
+    "create_papers_suggestions_daily": {
+        "task": "create_papers_suggestions",
         "schedule": crontab(hour=4, minute=30),
         "args": [DEFAULT_MODEL_TYPE],
-        "kwargs": {"max": 5000, "offset": 200},
+        "kwargs": {"k": SUGGESTIONS_PER_USER, "shard_size": SUGGESTIONS_SHARD_SIZE},
+    },
+    "clean_up_suggestions_daily": {
+        "task": "clean_up_suggestions",
+        "schedule": crontab(hour=5, minute=30),
     },
 }
 
@@ -48,3 +48,19 @@ DATABASES = {
 REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] += [  # type: ignore[operator]
     "rest_framework.authentication.SessionAuthentication",
 ]
+
+# CELERY
+# ------------------------------------------------------------------------------
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-always-eager
+CELERY_TASK_ALWAYS_EAGER = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-eager-propagates
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# MACHINE LEARNING
+# ------------------------------------------------------------------------------
+ML_TRAINING_N_JOBS = 1
+
+# PAPERS
+# ------------------------------------------------------------------------------
+PAPERS_REINDEX_QUIET_SECONDS = 0
+PAPERS_REINDEX_MAX_DELAY_SECONDS = 0